@@ -2,6 +2,10 @@
 import streamlit as st
 from rss_processor import RSSProcessor
 from tech_blog_summarizer import TechBlogSummarizer
+from summary_cache import SummaryCache
+from article_store import ArticleStore
+import metrics
+import os
 from datetime import datetime
 import time
 
@@ -19,7 +23,11 @@ st.markdown("유명 IT 회사들의 최신 기술 블로그를 자동으로 요
 # 인스턴스 생성 (캐싱)
 @st.cache_resource
 def load_processors():
-    return RSSProcessor(), TechBlogSummarizer()
+    store = ArticleStore()
+    # METRICS_PORT를 지정하면 Prometheus가 긁어갈 /metrics 엔드포인트를 함께 띄움
+    if os.getenv("METRICS_PORT"):
+        metrics.serve_metrics(int(os.getenv("METRICS_PORT")))
+    return RSSProcessor(store=store), TechBlogSummarizer(cache=SummaryCache(), store=store)
 
 rss_processor, summarizer = load_processors()
 
@@ -54,6 +62,41 @@ summary_style = st.sidebar.selectbox(
     }[x]
 )
 
+# 요약 방식 (추출 기반이면 기사당 한 번 핵심 정보를 뽑아 캐시하고 스타일은 그 결과로 만듦)
+extraction_mode = st.sidebar.selectbox(
+    "요약 방식",
+    [None, "llm", "template"],
+    format_func=lambda x: {
+        None: "📄 원문으로 요약",
+        "llm": "🔎 핵심 정보 추출 후 스타일 변환",
+        "template": "🧩 핵심 정보 추출 후 템플릿"
+    }[x],
+    help="추출 기반 방식은 스타일을 바꿔도 원문을 다시 읽지 않아 훨씬 빠릅니다 (템플릿은 LLM 호출 없음)"
+)
+
+# 원문 본문 수집
+fetch_full_text = st.sidebar.checkbox(
+    "🌐 원문 본문 가져오기",
+    value=False,
+    help="RSS 요약 대신 기사 페이지에서 본문 전체를 가져와 요약합니다"
+)
+
+# 긴 글 처리 방식
+long_document = st.sidebar.checkbox(
+    "📚 긴 글 전체 요약",
+    value=False,
+    help="긴 글을 자르지 않고 여러 조각으로 나눠 병렬 요약한 뒤 합칩니다"
+)
+
+# 동시 요약 수
+max_in_flight = st.sidebar.slider(
+    "동시 요약 수",
+    min_value=1,
+    max_value=5,
+    value=3,
+    help="여러 기사를 동시에 요약하고 끝나는 대로 표시합니다"
+)
+
 # 다이제스트 생성 옵션
 create_digest = st.sidebar.checkbox(
     "📰 전체 다이제스트 생성",
@@ -75,24 +118,7 @@ with col1:
         status_text = st.empty()
         
         try:
-            # 1단계: RSS 피드 가져오기
             status_text.text("📡 RSS 피드를 가져오는 중...")
-            progress_bar.progress(20)
-            
-            articles = rss_processor.fetch_rss_feed(
-                available_blogs[selected_blog], 
-                num_articles
-            )
-            
-            if not articles or "error" in articles[0]:
-                st.error(f"RSS 피드 처리 실패: {articles[0].get('error', '알 수 없는 오류')}")
-                st.stop()
-            
-            # 2단계: 기사 요약
-            status_text.text("🤖 AI가 기사를 요약하는 중...")
-            progress_bar.progress(60)
-            
-            summaries = summarizer.summarize_multiple_articles(articles, summary_style)
             
             # 3단계: 다이제스트 생성 (선택사항)
             # digest = None
@@ -101,14 +127,6 @@ with col1:
             #     progress_bar.progress(80)
             #     digest = summarizer.create_digest(summaries, selected_blog)
             
-            progress_bar.progress(100)
-            status_text.text("✅ 완료!")
-            time.sleep(1)
-            
-            # 결과 표시
-            progress_bar.empty()
-            status_text.empty()
-            
             # 다이제스트 먼저 표시
             # if digest:
             #     st.header("📰 오늘의 기술 다이제스트")
@@ -118,23 +136,72 @@ with col1:
             # 개별 기사 요약들
             st.header("📝 개별 기사 요약")
             
-            for i, summary in enumerate(summaries, 1):
-                if "error" in summary:
-                    st.error(f"기사 {i} 요약 실패: {summary['error']}")
-                    continue
-                
-                with st.expander(f"📄 {summary['title']}", expanded=True):
-                    col_a, col_b = st.columns([3, 1])
+            # 1-2단계: 피드 파싱 → (원문 수집) → 요약을 기사 단위로 흘려보내 끝나는 대로 표시
+            events = summarizer.iter_summaries(
+                rss_processor.iter_rss_feed(available_blogs[selected_blog], num_articles),
+                summary_style, max_in_flight=max_in_flight, long_document=long_document,
+                stream_tokens=True,
+                prepare=rss_processor.fetch_full_article if fetch_full_text else None,
+                extraction_mode=extraction_mode
+            )
+            
+            placeholders = {}
+            streamed_tokens = {}
+            summaries = []
+            for event in events:
+                index = event["index"]
+                if event["type"] == "article":
+                    article = event["article"]
+                    if "error" in article:
+                        st.error(f"RSS 피드 처리 실패: {article['error']}")
+                        st.stop()
                     
-                    with col_a:
-                        st.markdown(f"**작성자:** {summary['author']}")
-                        st.markdown(f"**발행일:** {summary['published']}")
-                        st.markdown("**요약:**")
-                        st.markdown(summary['summary'])
+                    with st.expander(f"📄 {article['title']}", expanded=True):
+                        col_a, col_b = st.columns([3, 1])
+                        
+                        with col_a:
+                            st.markdown(f"**작성자:** {article['author']}")
+                            st.markdown(f"**발행일:** {article['published']}")
+                            st.markdown("**요약:**")
+                            summary_placeholder = st.empty()
+                            summary_placeholder.caption("⏳ 요약 대기 중...")
+                    placeholders[index] = (summary_placeholder, col_b)
+                
+                elif event["type"] == "token":
+                    tokens = streamed_tokens.setdefault(index, [])
+                    tokens.append(event["token"])
+                    placeholders[index][0].markdown("".join(tokens) + "▌")
+                
+                else:
+                    summary = event["summary"]
+                    streamed_tokens.pop(index, None)
+                    summary_placeholder, col_b = placeholders[index]
+                    if "error" in summary:
+                        summary_placeholder.error(f"기사 {index + 1} 요약 실패: {summary['error']}")
+                    else:
+                        summary_placeholder.markdown(summary['summary'])
+                        with col_b:
+                            st.markdown(f"[🔗 원문 보기]({summary['link']})")
+                            st.markdown(f"**스타일:** {summary['summary_style']}")
+                            if "time_to_first_token" in summary:
+                                st.markdown(f"**첫 토큰:** {summary['time_to_first_token']}")
+                            if "tokens_per_sec" in summary:
+                                st.markdown(f"**생성 속도:** {summary['tokens_per_sec']} 토큰/초")
+                            if summary.get("extraction_cached"):
+                                st.markdown("**핵심 정보:** 이전 추출 재사용")
                     
-                    with col_b:
-                        st.markdown(f"[🔗 원문 보기]({summary['link']})")
-                        st.markdown(f"**스타일:** {summary['summary_style']}")
+                    summaries.append(summary)
+                    # 입력을 다 읽기 전에는 요청한 기사 수를 전체로 보고 진행률 계산
+                    total = event["total"] or max(num_articles, event["completed"])
+                    progress_bar.progress(int(100 * event["completed"] / total))
+                    status_text.text(f"🤖 AI가 기사를 요약하는 중... ({event['completed']}/{total})")
+            
+            status_text.text("✅ 완료!")
+            time.sleep(1)
+            
+            # 진행 표시 정리
+            progress_bar.empty()
+            status_text.empty()
             
         except Exception as e:
             st.error(f"처리 중 오류가 발생했습니다: {str(e)}")
@@ -169,4 +236,21 @@ st.markdown("🤖 Powered by Claude AI & LangChain | 📡 RSS Technology")
 
 # 현재 시간 표시
 st.sidebar.markdown("---")
+cache_stats = summarizer.cache.stats()
+st.sidebar.markdown(f"⚡ 요약 캐시: {cache_stats['hits']} 히트 / {cache_stats['misses']} 미스 ({cache_stats['size']}개 저장)")
+
+# 파이프라인 단계별 지표 (프로세스 전체 누적)
+with st.sidebar.expander("📈 파이프라인 지표"):
+    stage_rows = metrics.registry.stage_summary()
+    if stage_rows:
+        st.table(stage_rows)
+    else:
+        st.caption("아직 기록된 지표가 없습니다")
+    prompt_tokens = int(metrics.registry.counter_total("llm_prompt_tokens_total"))
+    completion_tokens = int(metrics.registry.counter_total("llm_completion_tokens_total"))
+    st.markdown(f"🔢 토큰: 입력 {prompt_tokens:,} / 출력 {completion_tokens:,}")
+    st.markdown(f"❌ LLM 오류: {int(metrics.registry.counter_total('llm_errors_total'))}건")
+    st.download_button("📥 JSON 내려받기", metrics.registry.to_json(), file_name="metrics.json",
+                       mime="application/json")
+
 st.sidebar.markdown(f"⏰ 현재 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
\ No newline at end of file
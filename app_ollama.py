@@ -1,9 +1,20 @@
 # app_ollama.py
 import streamlit as st
 from rss_processor import RSSProcessor  # 이전에 만든 RSS 처리기
-from ollama_summarizer import OllamaSummarizer
+from dedup import DuplicateIndex
+from summarizer_pool import get_summarizer, warm_up
+from summary_cache import SummaryCache
+from article_store import ArticleStore
+import metrics
+import os
+import threading
+import batch_cli
 from datetime import datetime
-import subprocess
+from functools import partial
+from ollama_models import list_models
+from ollama_pool import all_pools, configured_hosts
+from ranking import RelevanceRanker, select_within_budget, estimate_llm_seconds
+from llm_scheduler import DIGEST, INTERACTIVE, all_schedulers, job_context
 
 # 페이지 설정
 st.set_page_config(
@@ -13,24 +24,87 @@ st.set_page_config(
 )
 
 def check_ollama_status():
-    """Ollama 서버 상태 확인"""
-    try:
-        result = subprocess.run(['ollama', 'list'], capture_output=True, text=True, timeout=5)
-        return result.returncode == 0
-    except:
-        return False
+    """Ollama 서버 상태 확인 (캐시된 /api/tags 조회, 프로세스 실행 없음). OLLAMA_HOSTS 중 하나만 살아 있어도 통과"""
+    return any(list_models(base_url) is not None for base_url in configured_hosts())
 
 def get_installed_models():
-    """설치된 모델 목록 가져오기"""
-    try:
-        result = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
-        if result.returncode == 0:
-            lines = result.stdout.strip().split('\n')[1:]
-            models = [line.split()[0] for line in lines if line.strip()]
-            return models
-    except:
-        pass
-    return []
+    """설치된 모델 목록 가져오기 (check_ollama_status와 같은 캐시된 조회를 공유, 여러 호스트면 합집합)"""
+    models = []
+    for base_url in configured_hosts():
+        models.extend(name for name in list_models(base_url) or [] if name not in models)
+    return models
+
+def current_session_id():
+    """지금 스크립트를 실행 중인 Streamlit 세션 ID (LLM 작업 소유자로 사용)"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+@st.cache_resource
+def session_owners():
+    """LLM 작업 소유자로 등록한 Streamlit 세션 ID 집합 (재실행 사이에도 같은 객체)"""
+    return set()
+
+def is_session_active(owners, owner):
+    """브라우저 연결이 남아 있는 세션인지 확인 (스케줄러 감시 스레드에서 호출)
+
+    세션으로 등록하지 않은 소유자(백그라운드 배치, batch_cli 등)는 세션이 아니므로 항상 살아 있는 것으로 본다.
+    """
+    if owner not in owners:
+        return True
+    from streamlit import runtime
+    active = runtime.exists() and runtime.get_instance().is_active_session(owner)
+    if not active:
+        owners.discard(owner)
+    return active
+
+def cancel_session_jobs(session_id):
+    """이 세션이 모든 LLM 엔드포인트에 걸어 둔 대기/실행 작업 취소"""
+    if session_id is None:
+        return
+    for scheduler in all_schedulers():
+        scheduler.cancel_owner(session_id)
+
+BACKGROUND_BATCH_THREAD = "background-batch"
+
+def is_background_batch_running():
+    return any(thread.name == BACKGROUND_BATCH_THREAD for thread in threading.enumerate())
+
+def start_background_batch(model_name, summary_style, workers):
+    """batch_cli와 같은 일괄 요약을 데몬 스레드로 실행 (작업은 batch_cli가 BACKGROUND 우선순위로 보냄)"""
+    argv = ["--backend", "ollama", "--model", model_name, "--style", summary_style,
+            "--workers", str(workers), "--new-only", "--job-owner", BACKGROUND_BATCH_THREAD]
+    threading.Thread(target=batch_cli.main, args=(argv,), name=BACKGROUND_BATCH_THREAD, daemon=True).start()
+
+def show_summary_stats(summary, model_name):
+    """요약 결과 옆에 원문 링크와 처리 지표 표시"""
+    st.markdown(f"[🔗 원문]({summary['link']})")
+    st.markdown(f"**처리시간:** {summary.get('processing_time', 'N/A')}")
+    if "time_to_first_token" in summary:
+        st.markdown(f"**첫 토큰:** {summary['time_to_first_token']}")
+    if "tokens_per_sec" in summary:
+        st.markdown(f"**생성 속도:** {summary['tokens_per_sec']} 토큰/초")
+    if summary.get("extraction_cached"):
+        st.markdown("**핵심 정보:** 이전 추출 재사용")
+    st.markdown(f"**모델:** {model_name}")
+
+def show_ranking(ranked, chosen):
+    """관련도 순위표 (요약 대상으로 고른 기사는 ✅)"""
+    chosen_ids = {id(item) for item in chosen}
+    st.dataframe([
+        {
+            "선택": "✅" if id(item) in chosen_ids else "",
+            "제목": item["article"]["title"],
+            "블로그": item["article"].get("blog", ""),
+            "주제": item["topic"],
+            "점수": item["score"],
+            "관련도": item["relevance"],
+            "최신성": item["recency"],
+            "키워드": ", ".join(item["matched"][:5]),
+            "중복": "🔁" if item["article"].get("duplicate_of") else "",
+        }
+        for item in ranked
+    ], use_container_width=True, hide_index=True)
 
 # 메인 타이틀
 st.title("🦙 Ollama 기술 블로그 요약 봇")
@@ -64,9 +138,14 @@ if not installed_models:
 # 성공적으로 로드되면 캐시된 인스턴스 생성
 @st.cache_resource
 def load_ollama_processor():
-    return RSSProcessor(), None  # summarizer는 나중에 모델 선택 후 생성
+    store = ArticleStore()
+    # METRICS_PORT를 지정하면 Prometheus가 긁어갈 /metrics 엔드포인트를 함께 띄움
+    if os.getenv("METRICS_PORT"):
+        metrics.serve_metrics(int(os.getenv("METRICS_PORT")))
+    # summarizer는 나중에 모델 선택 후 생성
+    return RSSProcessor(store=store), SummaryCache(), store, RelevanceRanker()
 
-rss_processor, _ = load_ollama_processor()
+rss_processor, summary_cache, article_store, ranker = load_ollama_processor()
 
 # 탭 생성
 tab1, tab2 = st.tabs(["🦙 요약 서비스", "🛠️ RSS 어드민"])
@@ -88,6 +167,9 @@ with tab1:
         help="더 큰 모델일수록 성능이 좋지만 느려집니다"
     )
 
+    # 선택한 모델을 미리 메모리에 올려 첫 요약의 로딩 지연을 줄임
+    warm_up(selected_model, summary_cache, article_store)
+
     # 블로그 선택
     available_blogs = rss_processor.get_available_blogs()
     selected_blog = st.sidebar.selectbox(
@@ -95,6 +177,28 @@ with tab1:
         list(available_blogs.keys())
     )
 
+    # 관심 주제 우선 선택 (LLM에 보내기 전에 전체 피드 기사를 로컬에서 점수화)
+    rank_by_topic = st.sidebar.checkbox(
+        "🎯 관심 주제 우선 선택",
+        value=False,
+        help="등록된 모든 블로그에서 관심 주제와 관련 있고 최근인 기사를 골라 요약합니다"
+    )
+    if rank_by_topic:
+        selected_topics = st.sidebar.multiselect(
+            "관심 주제",
+            list(ranker.profiles.keys()),
+            default=list(ranker.profiles.keys())[:2],
+            help="주제별 키워드는 topic_profiles.json으로 바꿀 수 있습니다"
+        )
+        candidates_per_feed = st.sidebar.slider("피드당 후보 기사 수", min_value=5, max_value=50, value=20)
+        time_budget_min = st.sidebar.slider(
+            "LLM 시간 예산 (분)",
+            min_value=1,
+            max_value=30,
+            value=5,
+            help="기사당 예상 요약 시간(지금까지의 평균)으로 계산해 예산 안에서만 고릅니다"
+        )
+
     # 기사 개수 (Ollama는 느리므로 적게 권장)
     num_articles = st.sidebar.slider(
         "요약할 기사 수",
@@ -104,6 +208,36 @@ with tab1:
         help="로컬 AI는 클라우드보다 느리므로 적은 수를 권장합니다"
     )
 
+    # 동시 요약 수 (Ollama 서버의 OLLAMA_NUM_PARALLEL 값에 맞추면 좋음)
+    max_workers = st.sidebar.slider(
+        "최대 동시 요약 수",
+        min_value=1,
+        max_value=8,
+        value=1,
+        help="동시에 요약할 기사 수입니다. Ollama 서버의 OLLAMA_NUM_PARALLEL 이하로 설정하세요"
+    )
+
+    # 원문 본문 수집
+    fetch_full_text = st.sidebar.checkbox(
+        "🌐 원문 본문 가져오기",
+        value=False,
+        help="RSS 요약 대신 기사 페이지에서 본문 전체를 가져와 요약합니다"
+    )
+
+    # 긴 글 처리 방식
+    long_document = st.sidebar.checkbox(
+        "📚 긴 글 전체 요약",
+        value=False,
+        help="긴 글을 자르지 않고 여러 조각으로 나눠 병렬 요약한 뒤 합칩니다"
+    )
+
+    # 스트리밍 표시
+    stream_output = st.sidebar.checkbox(
+        "⚡ 실시간 스트리밍 표시",
+        value=True,
+        help="요약이 생성되는 대로 토큰 단위로 바로 보여줍니다"
+    )
+
     # 요약 스타일
     summary_style = st.sidebar.selectbox(
         "요약 스타일",
@@ -115,6 +249,18 @@ with tab1:
         }[x]
     )
 
+    # 요약 방식 (추출 기반이면 기사당 한 번 핵심 정보를 뽑아 캐시하고 스타일은 그 결과로 만듦)
+    extraction_mode = st.sidebar.selectbox(
+        "요약 방식",
+        [None, "llm", "template"],
+        format_func=lambda x: {
+            None: "📄 원문으로 요약",
+            "llm": "🔎 핵심 정보 추출 후 스타일 변환",
+            "template": "🧩 핵심 정보 추출 후 템플릿"
+        }[x],
+        help="추출 기반 방식은 스타일을 바꿔도 원문을 다시 읽지 않아 훨씬 빠릅니다 (템플릿은 LLM 호출 없음)"
+    )
+
     # 다이제스트 옵션
     create_digest = st.sidebar.checkbox(
         "📰 전체 다이제스트 생성",
@@ -122,93 +268,156 @@ with tab1:
         help="모든 기사를 종합한 다이제스트 (시간이 더 걸립니다)"
     )
 
+    # 전체 피드 일괄 요약을 이 프로세스 안에서 배경 우선순위로 실행
+    with st.sidebar.expander("🌙 백그라운드 일괄 요약"):
+        st.caption("모든 피드의 새 기사를 낮은 우선순위로 요약해 summaries.jsonl과 저장소에 쌓습니다. "
+                   "실행 중에도 '요약하기' 요청이 먼저 처리됩니다.")
+        if is_background_batch_running():
+            st.info("⏳ 일괄 요약 실행 중")
+        elif st.button("🌙 일괄 요약 시작"):
+            start_background_batch(selected_model, summary_style, max_workers)
+            st.success("일괄 요약을 시작했습니다")
+
     # 메인 컨텐츠
     col1, col2 = st.columns([2, 1])
 
     with col1:
-        st.header(f"📡 {selected_blog}")
+        st.header("🎯 관심 주제 기사" if rank_by_topic else f"📡 {selected_blog}")
         st.info(f"🦙 사용 모델: **{selected_model}** (로컬 실행)")
         
         if st.button("🚀 무료 AI로 요약하기", type="primary"):
-            # Ollama summarizer 생성
-            try:
-                with st.spinner(f"🦙 {selected_model} 모델 로딩 중..."):
-                    summarizer = OllamaSummarizer(selected_model)
-                
-                # 진행상황 표시
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                # RSS 피드 가져오기
-                status_text.text("📡 RSS 피드 수집 중...")
-                progress_bar.progress(20)
-                
-                # RSS만 사용하는 안전한 버전
-                articles = rss_processor.fetch_rss_feed(
-                    available_blogs[selected_blog], 
-                    num_articles
-                )
-                
-                if not articles or "error" in articles[0]:
-                    st.error(f"RSS 피드 처리 실패: {articles[0].get('error', '알 수 없는 오류')}")
-                    st.stop()
-                
-                # AI 요약 시작
-                status_text.text(f"🤖 {selected_model}이 요약 생성 중... (시간이 좀 걸려요)")
-                progress_bar.progress(40)
-                
-                summaries = summarizer.summarize_multiple_articles(articles, summary_style)
-                progress_bar.progress(80)
-                
-                # 다이제스트 생성
-                digest = None
-                if create_digest:
-                    status_text.text("📰 전체 다이제스트 생성 중...")
-                    digest = summarizer.create_digest(summaries, selected_blog)
+            session_id = current_session_id()
+            if session_id is not None:
+                session_owners().add(session_id)
+            # 이 세션이 이전 실행에서 남긴 LLM 작업은 더 볼 사람이 없으므로 정리
+            cancel_session_jobs(session_id)
+            # 이 실행에서 나가는 LLM 호출은 배치보다 먼저, 다른 세션과는 번갈아 처리
+            with job_context(INTERACTIVE, owner=session_id, fair_key=session_id):
+                try:
+                    # 프로세스 공유 풀에서 Ollama summarizer 가져오기 (최초 1회만 생성)
+                    with st.spinner(f"🦙 {selected_model} 모델 로딩 중..."):
+                        summarizer = get_summarizer(selected_model, cache=summary_cache, store=article_store)
+                    # 브라우저 탭을 닫아 사라진 세션의 작업은 감시 스레드가 취소
+                    summarizer.backend.scheduler.watch_owners(partial(is_session_active, session_owners()))
                 
-                progress_bar.progress(100)
-                status_text.text("✅ 모든 작업 완료!")
+                    # 진행상황 표시
+                    progress_bar = st.progress(0)
+                    status_text = st.empty()
+                    status_text.text("📡 RSS 피드 수집 중...")
                 
-                # 결과 표시
-                progress_bar.empty()
-                status_text.empty()
+                    # 다이제스트는 개별 요약이 끝난 뒤 만들어지지만 화면에서는 위쪽에 표시
+                    digest_container = st.container()
+
+                    if rank_by_topic:
+                        # 전체 피드를 모아 관련도/최신성 순으로 정렬하고 LLM 시간 예산 안에서 상위 기사만 요약
+                        candidates = []
+                        for result in rss_processor.iter_all_feeds(max_entries=candidates_per_feed, dedupe=True):
+                            if result["articles"] and "error" in result["articles"][0]:
+                                continue
+                            for article in result["articles"]:
+                                article["blog"] = result["name"]
+                                candidates.append(article)
+                        ranked = ranker.rank(candidates, selected_topics)
+                        per_article = estimate_llm_seconds()
+                        chosen = select_within_budget(ranked, num_articles, time_budget_min * 60,
+                                                      lambda article: per_article)
+                        with st.expander(f"🎯 관련도 순위 (후보 {len(ranked)}개 중 {len(chosen)}개 선택, "
+                                         f"기사당 약 {per_article:.0f}초 예상)", expanded=True):
+                            show_ranking(ranked, chosen)
+                        source = [item["article"] for item in chosen]
+                        duplicate_index = None  # 중복은 순위 단계에서 이미 제외
+                    else:
+                        source = rss_processor.iter_rss_feed(available_blogs[selected_blog], num_articles)
+                        # 이번 실행에서 겹치는 기사는 대표 기사 요약을 재사용
+                        # (rss_processor는 프로세스 공유라 인덱스를 두면 다시 수집한 같은 기사를 중복으로 봄)
+                        duplicate_index = DuplicateIndex()
+
+                    # 개별 요약 표시
+                    st.header("📝 개별 기사 요약")
+
+                    # 피드 파싱 → (원문 수집) → 요약을 기사 단위로 흘려보내 끝나는 대로 바로 표시
+                    events = summarizer.iter_summaries(
+                        source, summary_style, max_in_flight=max_workers, long_document=long_document,
+                        stream_tokens=stream_output,
+                        prepare=rss_processor.fetch_full_article if fetch_full_text else None,
+                        duplicate_index=duplicate_index, extraction_mode=extraction_mode
+                    )
+
+                    placeholders = {}
+                    streamed_tokens = {}
+                    summaries_by_index = {}
+                    for event in events:
+                        index = event["index"]
+                        if event["type"] == "article":
+                            article = event["article"]
+                            if "error" in article:
+                                st.error(f"RSS 피드 처리 실패: {article['error']}")
+                                st.stop()
+                            status_text.text(f"🤖 {selected_model}이 '{article['title'][:30]}' 요약 중...")
+                            with st.expander(f"📄 {article['title']}", expanded=True):
+                                col_a, col_b = st.columns([3, 1])
+
+                                with col_a:
+                                    st.markdown(f"**작성자:** {article['author']}")
+                                    st.markdown(f"**발행일:** {article['published'] or article['updated']}")
+                                    st.markdown("**AI 요약:**")
+                                    summary_placeholder = st.empty()
+                                    summary_placeholder.caption("⏳ 요약 대기 중...")
+                            placeholders[index] = (summary_placeholder, col_b)
+
+                        elif event["type"] == "token":
+                            tokens = streamed_tokens.setdefault(index, [])
+                            tokens.append(event["token"])
+                            placeholders[index][0].markdown("".join(tokens) + "▌")
+
+                        else:
+                            summary = summaries_by_index[index] = event["summary"]
+                            streamed_tokens.pop(index, None)
+                            summary_placeholder, col_b = placeholders[index]
+                            if "error" in summary:
+                                summary_placeholder.error(f"기사 {index + 1} 요약 실패: {summary['error']}")
+                            else:
+                                summary_placeholder.markdown(summary['summary'])
+                                with col_b:
+                                    show_summary_stats(summary, selected_model)
+
+                            # 입력을 다 읽기 전에는 요청한 기사 수를 전체로 보고 진행률 계산
+                            total = event["total"] or max(num_articles, event["completed"])
+                            progress_bar.progress(int(90 * event["completed"] / total))
+                            status_text.text(f"🤖 {selected_model} 요약 {event['completed']}/{total} 완료")
+
+                    if not summaries_by_index:
+                        st.info("새로 요약할 기사가 없습니다.")
+                    summaries = [summaries_by_index[index] for index in sorted(summaries_by_index)]
                 
-                # 다이제스트 표시
-                if digest:
-                    st.header("📰 기술 트렌드 다이제스트")
-                    st.markdown(digest)
-                    st.markdown("---")
+                    # 다이제스트 생성
+                    if create_digest:
+                        status_text.text("📰 전체 다이제스트 생성 중...")
+                        with job_context(DIGEST, owner=session_id, fair_key=session_id):
+                            digest = summarizer.create_digest(summaries, "관심 주제" if rank_by_topic else selected_blog)
+                        with digest_container:
+                            st.header("📰 기술 트렌드 다이제스트")
+                            st.markdown(digest)
+                            st.markdown("---")
                 
-                # 개별 요약 표시
-                st.header("📝 개별 기사 요약")
+                    progress_bar.progress(100)
+                    status_text.text("✅ 모든 작업 완료!")
                 
-                for i, summary in enumerate(summaries, 1):
-                    if "error" in summary:
-                        st.error(f"기사 {i} 요약 실패: {summary['error']}")
-                        continue
-                    
-                    with st.expander(f"📄 {summary['title']}", expanded=True):
-                        col_a, col_b = st.columns([3, 1])
-                        
-                        with col_a:
-                            st.markdown(f"**작성자:** {summary['author']}")
-                            st.markdown(f"**발행일:** {summary['published']}")
-                            st.markdown("**AI 요약:**")
-                            st.markdown(summary['summary'])
-                        
-                        with col_b:
-                            st.markdown(f"[🔗 원문]({summary['link']})")
-                            st.markdown(f"**처리시간:** {summary.get('processing_time', 'N/A')}")
-                            st.markdown(f"**모델:** {selected_model}")
+                    # 진행 표시 정리
+                    progress_bar.empty()
+                    status_text.empty()
                 
-            except Exception as e:
-                st.error(f"오류 발생: {str(e)}")
-                st.markdown("""
-                ### 🔧 문제 해결:
-                1. `ollama serve` 가 실행 중인지 확인
-                2. 선택한 모델이 설치되어 있는지 확인
-                3. 컴퓨터 메모리가 충분한지 확인
-                """)
+                except Exception as e:
+                    st.error(f"오류 발생: {str(e)}")
+                    st.markdown("""
+                    ### 🔧 문제 해결:
+                    1. `ollama serve` 가 실행 중인지 확인
+                    2. 선택한 모델이 설치되어 있는지 확인
+                    3. 컴퓨터 메모리가 충분한지 확인
+                    """)
+                finally:
+                    # 재실행/중지로 스크립트가 끊기면 남은 요약 작업이 GPU를 계속 쓰지 않도록 취소
+                    cancel_session_jobs(session_id)
 
     with col2:
         st.header("🦙 Ollama 가이드")
@@ -237,6 +446,32 @@ with tab1:
         ```
         """)
         
+        # 요약 캐시 상태
+        cache_stats = summary_cache.stats()
+        st.markdown(f"⚡ 요약 캐시: {cache_stats['hits']} 히트 / {cache_stats['misses']} 미스 ({cache_stats['size']}개 저장)")
+
+        # 파이프라인 단계별 지표 (프로세스 전체 누적)
+        with st.sidebar.expander("📈 파이프라인 지표"):
+            stage_rows = metrics.registry.stage_summary()
+            if stage_rows:
+                st.table(stage_rows)
+            else:
+                st.caption("아직 기록된 지표가 없습니다")
+            prompt_tokens = int(metrics.registry.counter_total("llm_prompt_tokens_total"))
+            completion_tokens = int(metrics.registry.counter_total("llm_completion_tokens_total"))
+            st.markdown(f"🔢 토큰: 입력 {prompt_tokens:,} / 출력 {completion_tokens:,}")
+            st.markdown(f"❌ LLM 오류: {int(metrics.registry.counter_total('llm_errors_total'))}건")
+            for scheduler in all_schedulers():
+                scheduler_stats = scheduler.stats()
+                st.markdown(f"🚦 LLM 대기열 ({scheduler_stats['endpoint']}): {scheduler_stats['queue_depth']}개 대기, "
+                            f"동시 실행 {scheduler_stats['max_concurrent']}개")
+                st.table(scheduler_stats["classes"])
+            for pool in all_pools():
+                st.markdown(f"🖧 Ollama 호스트 풀 ({len(pool.hosts)}대)")
+                st.table(pool.stats())
+            st.download_button("📥 JSON 내려받기", metrics.registry.to_json(), file_name="metrics.json",
+                               mime="application/json")
+
         # 현재 시간
         st.markdown("---")
         st.markdown(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
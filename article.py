@@ -0,0 +1,110 @@
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+# 본문 안의 위치 (시작, 끝) 또는 본문에 없는 경우 문자열 그대로
+Span = Union[Tuple[int, int], str]
+
+class Article(MutableMapping):
+    """RSS 기사 한 건을 담는 가벼운 레코드 (dict처럼 article["title"], get, in 으로 사용)
+
+    RSS의 summary/description/content는 같은 글이거나 한쪽이 다른 쪽에 포함된 경우가 많은데,
+    content는 merge_unique로 세 조각을 합친 것이라 정제된 summary/description은 항상 content 안에 있다.
+    그래서 본문은 content 하나만 저장하고 summary/description은 위치만 기억했다가 읽을 때 잘라 만든다.
+    목록에 없는 키(duplicate_of, fetch_error 등)는 필요할 때만 만드는 별도 dict에 저장한다.
+    """
+    FIELDS = ("guid", "title", "link", "published", "summary", "content", "description",
+              "author", "updated", "tags")
+    _ATTRIBUTES = frozenset(("guid", "title", "link", "published", "author", "updated", "tags"))
+
+    __slots__ = ("guid", "title", "link", "published", "author", "updated", "tags",
+                 "_content", "_summary", "_description", "_extra")
+
+    def __init__(self, guid: str = "", title: str = "", link: str = "", published: str = "",
+                 summary: str = "", content: str = "", description: str = "", author: str = "",
+                 updated: str = "", tags: Optional[List[str]] = None):
+        self.guid = guid
+        self.title = title
+        self.link = link
+        self.published = published
+        self.author = author
+        self.updated = updated
+        self.tags = tags if tags is not None else []
+        self._content = content
+        self._summary = self._span(summary)
+        self._description = self._span(description)
+        self._extra: Optional[Dict[str, Any]] = None
+
+    def _span(self, text: str) -> Span:
+        if not text:
+            return (0, 0)
+        start = self._content.find(text)
+        if start < 0:
+            return text
+        return (start, start + len(text))
+
+    def _slice(self, span: Span) -> str:
+        if isinstance(span, str):
+            return span
+        return self._content[span[0]:span[1]]
+
+    def __getitem__(self, key: str) -> Any:
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        if key in self._ATTRIBUTES:
+            return getattr(self, key)
+        if key == "content":
+            return self._content
+        if key == "summary":
+            return self._slice(self._summary)
+        if key == "description":
+            return self._slice(self._description)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self._ATTRIBUTES:
+            setattr(self, key, value)
+        elif key == "content":
+            # 본문이 바뀌면(원문 수집 등) 기존 위치가 무효가 되므로 summary/description을 먼저 꺼내 둠
+            self._summary = self._slice(self._summary)
+            self._description = self._slice(self._description)
+            self._content = value
+        elif key == "summary":
+            self._summary = value
+        elif key == "description":
+            self._description = value
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.FIELDS or (self._extra is not None and key in self._extra)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.FIELDS
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return len(self.FIELDS) + (len(self._extra) if self._extra is not None else 0)
+
+    def __repr__(self) -> str:
+        return f"Article(title={self.title!r}, link={self.link!r}, content={len(self._content)}자)"
+
+    def copy(self) -> "Article":
+        """본문 문자열은 공유하는 얕은 복사본 (dict.copy와 같은 용도)"""
+        copied = Article.__new__(Article)
+        for name in self.__slots__:
+            setattr(copied, name, getattr(self, name))
+        copied.tags = list(self.tags)
+        if self._extra is not None:
+            copied._extra = dict(self._extra)
+        return copied
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self)
@@ -0,0 +1,202 @@
+import json
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+class ArticleStore:
+    """피드/기사/요약을 저장하는 SQLite 저장소
+
+    기사는 (피드 URL, GUID)로 유일하며 피드·링크·발행 시각으로 인덱싱된다.
+    이미 본 기사와 이미 요약한 기사를 빠르게 걸러내 새 글만 처리할 수 있게 한다.
+    """
+    def __init__(self, db_path: str = "articles.db"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS feeds (
+                name TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                feed_url TEXT NOT NULL,
+                guid TEXT NOT NULL,
+                link TEXT,
+                title TEXT,
+                published_at REAL,
+                data TEXT NOT NULL,
+                first_seen_at REAL NOT NULL,
+                UNIQUE (feed_url, guid)
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_feed_published ON articles (feed_url, published_at);
+            CREATE INDEX IF NOT EXISTS idx_articles_link ON articles (link);
+            CREATE TABLE IF NOT EXISTS summaries (
+                link TEXT NOT NULL,
+                model TEXT NOT NULL,
+                summary_style TEXT NOT NULL,
+                data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (link, model, summary_style)
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    # ---------- 메타 ----------
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+            self._conn.commit()
+
+    # ---------- 피드 ----------
+
+    def get_feeds(self) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT name, url FROM feeds ORDER BY created_at").fetchall()
+        return {row["name"]: row["url"] for row in rows}
+
+    def upsert_feed(self, name: str, url: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO feeds (name, url, created_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET url = excluded.url",
+                (name, url, time.time())
+            )
+            self._conn.commit()
+
+    def delete_feed(self, name: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM feeds WHERE name = ?", (name,))
+            self._conn.commit()
+
+    # ---------- 기사 ----------
+
+    def unseen_ids(self, feed_url: str, guids: Iterable[str]) -> Set[str]:
+        """저장된 적 없는 GUID만 반환"""
+        guids = list(dict.fromkeys(guid for guid in guids if guid))
+        if not guids:
+            return set()
+        seen = set()
+        with self._lock:
+            # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+            for start in range(0, len(guids), 500):
+                batch = guids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT guid FROM articles WHERE feed_url = ? AND guid IN ({placeholders})",
+                    [feed_url, *batch]
+                ).fetchall()
+                seen.update(row["guid"] for row in rows)
+        return set(guids) - seen
+
+    def save_articles(self, feed_url: str, articles: List[Dict]):
+        """기사 저장 (이미 있으면 내용만 갱신, 처음 본 시각은 유지)"""
+        now = time.time()
+        rows = [
+            (
+                feed_url, article.get("guid") or article.get("link", ""), article.get("link", ""),
+                article.get("title", ""), self._parse_time(article.get("published") or article.get("updated")),
+                json.dumps(dict(article), ensure_ascii=False), now
+            )
+            for article in articles if "error" not in article
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO articles (feed_url, guid, link, title, published_at, data, first_seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(feed_url, guid) DO UPDATE SET "
+                "link = excluded.link, title = excluded.title, "
+                "published_at = excluded.published_at, data = excluded.data",
+                rows
+            )
+            self._conn.commit()
+
+    def get_articles(self, feed_url: Optional[str] = None, since: Optional[float] = None,
+                     limit: int = 100) -> List[Dict]:
+        """최신순 기사 조회 (피드/발행 시각 조건은 선택)"""
+        query = "SELECT data FROM articles WHERE 1 = 1"
+        params = []
+        if feed_url is not None:
+            query += " AND feed_url = ?"
+            params.append(feed_url)
+        if since is not None:
+            query += " AND published_at >= ?"
+            params.append(since)
+        query += " ORDER BY published_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    # ---------- 요약 ----------
+
+    def unsummarized(self, articles: List[Dict], model: str, summary_style: str) -> List[Dict]:
+        """아직 해당 모델/스타일로 요약하지 않은 기사만 반환"""
+        links = [article.get("link", "") for article in articles if "error" not in article]
+        done = set()
+        with self._lock:
+            for start in range(0, len(links), 500):
+                batch = links[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT link FROM summaries WHERE model = ? AND summary_style = ? AND link IN ({placeholders})",
+                    [model, summary_style, *batch]
+                ).fetchall()
+                done.update(row["link"] for row in rows)
+        return [article for article in articles if "error" not in article and article.get("link", "") not in done]
+
+    def save_summary(self, summary: Dict, model: str):
+        """성공한 요약 결과 저장 (오류 결과는 저장하지 않음)"""
+        if "error" in summary or not summary.get("link"):
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (link, model, summary_style, data, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (summary["link"], model, summary.get("summary_style", ""),
+                 json.dumps(summary, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+    def get_summary(self, link: str, model: str, summary_style: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM summaries WHERE link = ? AND model = ? AND summary_style = ?",
+                (link, model, summary_style)
+            ).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    @staticmethod
+    def _parse_time(value: Optional[str]) -> Optional[float]:
+        """RSS(RFC 822)/Atom(ISO 8601) 날짜 문자열을 타임스탬프로 변환"""
+        if not value:
+            return None
+        try:
+            return parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError):
+            pass
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
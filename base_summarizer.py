@@ -0,0 +1,398 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from summary_cache import SummaryCache
+from article_store import ArticleStore
+from dedup import DuplicateIndex, summarize_deduplicated
+from batch_prompt import is_short_article, summarize_packed
+from extraction import EXTRACTION_PROMPT, EXTRACTION_VERSION, build_style_prompt, parse_extraction, render_template
+from prompt_builder import PromptBuilder
+from llm_backend import LLMBackend
+from pipeline import stream_summaries
+from concurrency import propagate_context
+import metrics
+
+# 긴 글을 나눈 청크 하나를 요약할 때 쓰는 프롬프트 (map 단계)
+CHUNK_PROMPT = """
+다음은 긴 기술 블로그 글의 일부입니다.
+이 부분에 나온 기술, 문제, 해결 방법, 수치를 빠짐없이 3-5개 항목으로 간결하게 요약해주세요.
+"""
+
+class BaseSummarizer:
+    """Ollama/Anthropic 요약기가 공유하는 프롬프트, 캐시, 결과 형식
+
+    하위 클래스는 backend(LLMBackend), prompt_builder, text_splitter를 만들고
+    본문 라벨과 메타데이터 등 모델별 차이만 지정한다.
+    """
+    # 프롬프트를 바꾸면 올려서 이전 캐시를 무효화
+    PROMPT_VERSION = "2"
+
+    # 스타일별 프롬프트 (한국어/영어 혼용)
+    PROMPTS = {
+        "technical": """
+        다음 기술 블로그 글을 기술적 관점에서 요약해주세요:
+        - 사용된 기술/도구
+        - 해결한 문제
+        - 핵심 솔루션
+        - 중요한 인사이트
+        """,
+        "business": """
+        다음 기술 블로그 글을 비즈니스 관점에서 요약해주세요:
+        - 비즈니스 임팩트
+        - 성능 개선 사항
+        - 비용 절감 효과
+        - 사용자 경험 개선
+        """,
+        "brief": """
+        다음 기술 블로그 글을 3-4줄로 간단히 요약해주세요:
+        - 핵심 내용만 추출
+        - 기술적 용어는 간단히 설명
+        """
+    }
+
+    # 프롬프트에서 본문 앞에 붙는 이름과 오류 메시지 앞머리
+    content_label = "내용"
+    error_prefix = "요약 실패"
+
+    backend: LLMBackend
+    prompt_builder: PromptBuilder
+
+    def __init__(self, model_name: str, cache: Optional[SummaryCache] = None,
+                 store: Optional[ArticleStore] = None, chunk_size: int = 2000, chunk_overlap: int = 100):
+        self.model_name = model_name
+        self.cache = cache
+        self.store = store
+        self.last_digest_budget = None
+        # langchain은 임포트만 1초 가까이 걸리므로 실제로 요약기를 만들 때 불러옴
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        self.chunk_size = chunk_size
+        self.text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len
+        )
+
+    def summarize_single_article(self, article: Dict, summary_style: str = "technical",
+                                 on_token: Optional[Callable[[str], None]] = None,
+                                 long_document: bool = False, extraction_mode: Optional[str] = None) -> Dict:
+        """단일 기사 요약
+
+        on_token을 주면 토큰이 생성되는 즉시 스트리밍으로 전달하고,
+        결과에 첫 토큰까지 걸린 시간과 초당 토큰 수를 함께 기록한다.
+        long_document=True면 긴 글을 자르지 않고 청크별로 요약(map)한 뒤 합친다(reduce).
+        extraction_mode를 주면 원문 대신 기사당 한 번 캐시되는 구조화 추출 결과로 스타일 요약을 만든다
+        ("llm": 추출 정보만 넣은 짧은 프롬프트, "template": LLM 호출 없이 템플릿).
+        추출 응답을 읽지 못하면 원문으로 요약한다.
+        """
+        try:
+            return self._summarize_article(article, summary_style, on_token, long_document, extraction_mode)
+        except Exception as e:
+            print(f"❌ 요약 실패: {str(e)}")
+            return self._error_result(article, e)
+
+    def _summarize_article(self, article: Dict, summary_style: str = "technical",
+                           on_token: Optional[Callable[[str], None]] = None,
+                           long_document: bool = False, extraction_mode: Optional[str] = None) -> Dict:
+        """summarize_single_article과 같지만 실패하면 오류 결과 대신 예외를 그대로 올림"""
+        if "error" in article:
+            return article
+
+        content = article.get('content', article.get('summary', ''))
+        use_map_reduce = long_document and len(content) > self.chunk_size
+
+        if extraction_mode:
+            result = self._summarize_from_extraction(
+                article, content, summary_style, on_token, use_map_reduce, extraction_mode
+            )
+            if result is not None:
+                return result
+
+        # 캐시 확인 (같은 글/모델/스타일이면 LLM 호출 생략)
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(article, content, summary_style, use_map_reduce)
+            cached_summary = self.cache.get(cache_key)
+            if cached_summary is not None:
+                print(f"⚡ 캐시 사용: '{article['title'][:30]}...'")
+                if on_token is not None:
+                    on_token(cached_summary)
+                return self._result(article, cached_summary, summary_style, "0.0초 (캐시)", cached=True)
+
+        chunk_count = 1
+        if use_map_reduce:
+            content, chunk_count = self._map_chunks(content)
+
+        prompt = self.PROMPTS.get(summary_style, self.PROMPTS["technical"])
+
+        # 모델 컨텍스트에 맞춰 본문을 줄임 (넘치면 앞/뒤 문장을 남기고 가운데 생략)
+        with metrics.timer("pipeline_stage_seconds", stage="prompt_build"):
+            full_prompt, prompt_budget = self.prompt_builder.build(
+                prompt, article['title'], content,
+                metadata=self._metadata(article),
+                content_label=self._content_label(use_map_reduce)
+            )
+
+        print(f"🤖 '{article['title'][:30]}...' 요약 중...")
+
+        start_time = time.time()
+        generation = self.backend.generate(full_prompt, on_token)
+        elapsed_time = time.time() - start_time
+
+        print(f"✅ 요약 완료 ({elapsed_time:.1f}초)")
+
+        summary = generation["text"]
+        if cache_key is not None:
+            self.cache.set(cache_key, summary)
+
+        result = self._result(
+            article, summary, summary_style, f"{elapsed_time:.1f}초",
+            chunk_count=chunk_count, prompt_budget=prompt_budget,
+            **self._stream_fields(generation)
+        )
+        if self.store is not None:
+            self.store.save_summary(result, self.model_name)
+        return result
+
+    def iter_summaries(self, articles: Iterable[Dict], summary_style: str = "technical",
+                       max_in_flight: int = 1, long_document: bool = False, stream_tokens: bool = False,
+                       prepare: Optional[Callable[[Dict], Dict]] = None,
+                       duplicate_index: Optional[DuplicateIndex] = None,
+                       extraction_mode: Optional[str] = None) -> Iterator[Dict]:
+        """기사가 들어오는 대로 요약하며 기사/토큰/요약 이벤트를 yield (pipeline.stream_summaries 참고)
+
+        iter_rss_feed처럼 기사를 하나씩 내는 이터레이터를 넘기면 피드 파싱, 원문 수집(prepare),
+        요약이 기사 단위로 겹쳐 진행되어 끝난 요약부터 바로 화면에 그릴 수 있다.
+        """
+        return stream_summaries(
+            articles,
+            lambda article, on_token: self.summarize_single_article(
+                article, summary_style, on_token=on_token, long_document=long_document,
+                extraction_mode=extraction_mode
+            ),
+            max_in_flight=max_in_flight, prepare=prepare, stream_tokens=stream_tokens,
+            duplicate_index=duplicate_index
+        )
+
+    def extract(self, article: Dict, content: Optional[str] = None,
+                use_map_reduce: bool = False) -> Tuple[Optional[Dict], bool, int]:
+        """기사에서 기술/문제/해결 방법/결과/핵심 내용을 구조화 추출
+
+        (추출 결과, 캐시 사용 여부, 청크 수)를 반환한다. 스타일과 무관하게 기사당 한 번만 LLM을 호출하고
+        응답 원문을 캐시하므로, 읽을 수 없는 응답(None)도 다시 추출하지 않는다.
+        """
+        content = content if content is not None else article.get('content', article.get('summary', ''))
+        cache_key = None
+        if self.cache is not None:
+            key_parts = ["extract", article.get('link', ''), content, self.model_name, EXTRACTION_VERSION]
+            if use_map_reduce:
+                key_parts.append("map-reduce")
+            cache_key = SummaryCache.make_key(*key_parts)
+            cached_text = self.cache.get(cache_key)
+            if cached_text is not None:
+                return parse_extraction(cached_text), True, 1
+
+        chunk_count = 1
+        if use_map_reduce:
+            content, chunk_count = self._map_chunks(content)
+        with metrics.timer("pipeline_stage_seconds", stage="prompt_build"):
+            prompt, _ = self.prompt_builder.build(
+                EXTRACTION_PROMPT, article['title'], content,
+                metadata=self._metadata(article), content_label=self._content_label(use_map_reduce)
+            )
+
+        print(f"🔎 '{article['title'][:30]}...' 핵심 정보 추출 중...")
+        with metrics.timer("pipeline_stage_seconds", stage="extract"):
+            text = self.backend.complete(prompt)
+        if cache_key is not None:
+            self.cache.set(cache_key, text)
+        return parse_extraction(text), False, chunk_count
+
+    def _summarize_from_extraction(self, article: Dict, content: str, summary_style: str,
+                                   on_token: Optional[Callable[[str], None]], use_map_reduce: bool,
+                                   extraction_mode: str) -> Optional[Dict]:
+        """추출 결과로 스타일 요약 (추출 응답을 읽지 못하면 None)"""
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(article, content, summary_style, use_map_reduce,
+                                        variant=f"extract-{extraction_mode}-{EXTRACTION_VERSION}")
+            cached_summary = self.cache.get(cache_key)
+            if cached_summary is not None:
+                print(f"⚡ 캐시 사용: '{article['title'][:30]}...'")
+                if on_token is not None:
+                    on_token(cached_summary)
+                return self._result(article, cached_summary, summary_style, "0.0초 (캐시)",
+                                    cached=True, extraction=extraction_mode)
+
+        start_time = time.time()
+        extraction, extraction_cached, chunk_count = self.extract(article, content, use_map_reduce)
+        if extraction is None:
+            print(f"⚠️ '{article['title'][:30]}...' 추출 결과를 읽지 못해 원문으로 요약합니다")
+            return None
+
+        stream_fields = {}
+        if extraction_mode == "template":
+            summary = render_template(summary_style, extraction)
+            if on_token is not None:
+                on_token(summary)
+        else:
+            print(f"🤖 '{article['title'][:30]}...' 추출 정보로 요약 중...")
+            generation = self.backend.generate(build_style_prompt(summary_style, article['title'], extraction), on_token)
+            summary = generation["text"]
+            stream_fields = self._stream_fields(generation)
+        elapsed_time = time.time() - start_time
+        print(f"✅ 요약 완료 ({elapsed_time:.1f}초, 추출 {'캐시' if extraction_cached else '새로 실행'})")
+
+        if cache_key is not None:
+            self.cache.set(cache_key, summary)
+        result = self._result(
+            article, summary, summary_style, f"{elapsed_time:.1f}초", chunk_count=chunk_count,
+            extraction=extraction_mode, extraction_cached=extraction_cached, **stream_fields
+        )
+        if self.store is not None:
+            self.store.save_summary(result, self.model_name)
+        return result
+
+    def _metadata(self, article: Dict) -> Dict[str, str]:
+        """프롬프트에 제목과 함께 넣을 메타데이터"""
+        return {"작성자": article['author']}
+
+    def _result(self, article: Dict, summary: str, summary_style: str,
+                processing_time: str, **extra) -> Dict:
+        return {
+            "title": article["title"],
+            "link": article["link"],
+            "author": article["author"],
+            "published": article.get("published") or article.get("updated") or '',
+            "summary": summary,
+            "summary_style": summary_style,
+            "processing_time": processing_time,
+            **extra
+        }
+
+    def _error_result(self, article: Dict, error) -> Dict:
+        return {
+            "title": article.get("title", "알 수 없는 제목"),
+            "error": f"{self.error_prefix}: {str(error)}"
+        }
+
+    @staticmethod
+    def _stream_fields(generation: Dict) -> Dict:
+        """백엔드 생성 지표를 결과 표시용 문자열로 변환"""
+        fields = {}
+        if generation.get("time_to_first_token") is not None:
+            fields["time_to_first_token"] = f"{generation['time_to_first_token']:.1f}초"
+        generation_time = generation.get("generation_time")
+        if generation_time:
+            fields["tokens_per_sec"] = f"{generation['completion_tokens'] / generation_time:.1f}"
+        if generation.get("coalesced"):
+            fields["coalesced"] = True
+        return fields
+
+    def _cache_key(self, article: Dict, content: str, summary_style: str, use_map_reduce: bool = False,
+                   variant: Optional[str] = None) -> str:
+        """요약 캐시 키 (묶음 요약과 개별 요약이 같은 키를 공유, 추출 기반 요약은 variant로 구분)"""
+        key_parts = [
+            article.get('link', ''), content, self.model_name,
+            summary_style, self.PROMPT_VERSION
+        ]
+        if use_map_reduce:
+            key_parts.append("map-reduce")
+        if variant:
+            key_parts.append(variant)
+        return SummaryCache.make_key(*key_parts)
+
+    def _content_label(self, use_map_reduce: bool) -> str:
+        if use_map_reduce:
+            return f"{self.content_label} (긴 글을 나눠 요약한 부분별 요약)"
+        return self.content_label
+
+    def _map_chunks(self, content: str) -> Tuple[str, int]:
+        """map: 청크별 부분 요약을 병렬로 만들어 본문 대신 쓸 텍스트와 청크 수 반환"""
+        chunk_summaries = self._summarize_chunks(content)
+        mapped = "\n".join(
+            f"[부분 {i}] {chunk_summary}" for i, chunk_summary in enumerate(chunk_summaries, 1)
+        )
+        return mapped, len(chunk_summaries)
+
+    def _summarize_chunks(self, content: str, max_workers: int = 4) -> List[str]:
+        """긴 본문을 text_splitter로 나눠 청크별로 병렬 요약 (청크 단위로 캐시)
+
+        글이 조금만 바뀌어도 바뀐 청크만 다시 요약하게 된다.
+        """
+        chunks = self.text_splitter.split_text(content)
+
+        def summarize_chunk(chunk: str) -> str:
+            cache_key = None
+            if self.cache is not None:
+                cache_key = SummaryCache.make_key("chunk", chunk, self.model_name, self.PROMPT_VERSION)
+                cached_summary = self.cache.get(cache_key)
+                if cached_summary is not None:
+                    return cached_summary
+
+            with metrics.timer("pipeline_stage_seconds", stage="map_chunk"):
+                chunk_summary = self.backend.complete(f"{CHUNK_PROMPT}\n\n{chunk}")
+            if cache_key is not None:
+                self.cache.set(cache_key, chunk_summary)
+            return chunk_summary
+
+        print(f"✂️ 긴 글을 {len(chunks)}개 청크로 나눠 요약 중...")
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+            return list(executor.map(propagate_context(summarize_chunk), chunks))
+
+    def _summarize_many(self, articles: List[Dict], summary_style: str, new_only: bool,
+                        on_complete: Optional[Callable[[int, Dict], None]],
+                        summarize_batch: Callable) -> List[Dict]:
+        """저장소 기준 새 글 거르기와 중복 기사 처리를 거쳐 summarize_batch로 요약"""
+        if new_only and self.store is not None:
+            articles = self.store.unsummarized(articles, self.model_name, summary_style)
+
+        lookup_summary = None
+        if self.store is not None:
+            lookup_summary = lambda link: self.store.get_summary(link, self.model_name, summary_style)
+
+        return summarize_deduplicated(
+            articles, summarize_batch, on_complete=on_complete, lookup_summary=lookup_summary
+        )
+
+    def _summarize_packed(self, articles: List[Dict], summary_style: str,
+                          max_workers: int = 1) -> Dict[int, Dict]:
+        """본문이 짧은 기사들을 묶음 프롬프트로 요약해 {입력 인덱스: 결과} 반환
+
+        긴 기사와 묶음 응답에서 요약을 찾지 못한 기사는 결과에 없으므로 개별 요약으로 넘긴다.
+        """
+        results = {}
+        short_indexes = []
+        for index, article in enumerate(articles):
+            if "error" in article:
+                continue
+            content = article.get('content', article.get('summary', ''))
+            if not is_short_article(content):
+                continue
+            if self.cache is not None:
+                cached_summary = self.cache.get(self._cache_key(article, content, summary_style))
+                if cached_summary is not None:
+                    results[index] = self._result(article, cached_summary, summary_style,
+                                                  "0.0초 (캐시)", chunk_count=1, cached=True)
+                    continue
+            short_indexes.append(index)
+
+        # 하나뿐이면 묶어도 이득이 없음
+        if len(short_indexes) < 2:
+            return results
+
+        instruction = self.PROMPTS.get(summary_style, self.PROMPTS["technical"])
+        packed = summarize_packed(
+            [articles[index] for index in short_indexes], instruction,
+            self.prompt_builder, self.backend.complete, max_workers=max_workers
+        )
+        for position, (summary, per_article_time) in packed.items():
+            article = articles[short_indexes[position]]
+            if self.cache is not None:
+                content = article.get('content', article.get('summary', ''))
+                self.cache.set(self._cache_key(article, content, summary_style), summary)
+            result = self._result(article, summary, summary_style, f"{per_article_time:.1f}초",
+                                  chunk_count=1, batched=True)
+            if self.store is not None:
+                self.store.save_summary(result, self.model_name)
+            results[short_indexes[position]] = result
+        return results
@@ -0,0 +1,165 @@
+"""Streamlit 없이 모든 RSS 피드를 요약해 JSONL로 저장하는 배치 CLI
+
+    python batch_cli.py --backend ollama --model llama3.2 --style brief --output summaries.jsonl
+
+결과는 요약이 끝나는 대로 한 줄씩 기록되며, 중단 후 같은 명령을 다시 실행하면
+이미 성공한 기사(링크 + 스타일 + 모델 기준)는 건너뛰고 이어서 진행한다.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Optional, Set, Tuple
+from article_store import ArticleStore
+from llm_scheduler import BACKGROUND, job_context
+from rss_processor import RSSProcessor
+from summary_cache import SummaryCache
+import metrics
+
+def load_checkpoint(output_path: str) -> Set[Tuple[str, str, str]]:
+    """기존 JSONL에서 이미 성공한 (링크, 스타일, 모델) 집합 읽기"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 강제 종료로 마지막 줄이 잘린 경우
+                continue
+            if "error" not in record:
+                done.add((record.get("link", ""), record.get("summary_style", ""), record.get("model", "")))
+    return done
+
+def create_summarizer(backend: str, model: str, cache: SummaryCache, store: ArticleStore,
+                      ollama_hosts: Optional[str] = None):
+    if backend == "ollama":
+        from ollama_pool import configured_hosts
+        from summarizer_pool import get_summarizer
+        return get_summarizer(model, cache=cache, store=store, hosts=configured_hosts(ollama_hosts))
+
+    from tech_blog_summarizer import TechBlogSummarizer
+    return TechBlogSummarizer(model, cache=cache, store=store)
+
+def write_record(f, record: Dict):
+    # 한 줄씩 바로 디스크에 반영해 중단되어도 완료분이 남도록 함
+    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="RSS 피드 전체를 요약해 JSONL로 저장")
+    parser.add_argument("--backend", choices=["ollama", "anthropic"], default="ollama")
+    parser.add_argument("--model", default=None, help="모델명 (기본: ollama=llama3.2, anthropic=claude-3-haiku-20240307)")
+    parser.add_argument("--style", choices=["technical", "business", "brief"], default="technical")
+    parser.add_argument("--output", default="summaries.jsonl")
+    parser.add_argument("--rss-file", default="rss_blogs.json")
+    parser.add_argument("--max-entries", type=int, default=5, help="피드당 최대 기사 수")
+    parser.add_argument("--workers", type=int, default=1, help="Ollama 최대 동시 요약 수")
+    parser.add_argument("--ollama-hosts", default=None,
+                        help="쉼표로 구분한 Ollama 주소 목록 (여러 개면 모델이 있는 호스트 중 한가한 곳으로 분산, "
+                             "기본: OLLAMA_HOSTS 환경 변수 또는 localhost)")
+    parser.add_argument("--full-text", action="store_true", help="기사 원문 본문을 가져와 요약")
+    parser.add_argument("--long-document", action="store_true", help="긴 글을 청크로 나눠 map-reduce 요약")
+    parser.add_argument("--new-only", action="store_true",
+                        help="조건부 GET으로 바뀐 피드만 받고, 저장소에 요약이 없는 기사만 처리")
+    parser.add_argument("--pack-short", action="store_true",
+                        help="본문이 짧은 기사 여러 개를 한 프롬프트로 묶어 요약 (LLM 호출 수 감소)")
+    parser.add_argument("--extraction", choices=["llm", "template"], default=None,
+                        help="기사당 한 번 핵심 정보를 추출(캐시)하고 스타일 요약은 추출 결과로 생성 "
+                             "(나중에 다른 --style로 다시 실행할 때 원문을 다시 읽지 않음)")
+    parser.add_argument("--db", default="articles.db", help="기사/요약 저장소(SQLite) 경로")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="실행 중 /metrics(Prometheus), /metrics.json 엔드포인트를 띄울 포트")
+    parser.add_argument("--metrics-json", default=None, help="종료 시 단계별 지표를 JSON으로 저장할 경로")
+    parser.add_argument("--job-owner", default="batch",
+                        help="LLM 스케줄러 작업 소유자 이름 (같은 프로세스에서 cancel_owner로 중단할 때 사용)")
+    args = parser.parse_args(argv)
+
+    if args.metrics_port is not None:
+        metrics.serve_metrics(args.metrics_port)
+
+    model = args.model or ("llama3.2" if args.backend == "ollama" else "claude-3-haiku-20240307")
+    store = ArticleStore(args.db)
+    processor = RSSProcessor(args.rss_file, store=store)
+    summarizer = create_summarizer(args.backend, model, SummaryCache(), store, args.ollama_hosts)
+
+    done = load_checkpoint(args.output)
+    if done:
+        print(f"♻️ 이전 실행에서 완료된 {len(done)}개 기사는 건너뜁니다")
+
+    start_time = time.time()
+    written = failed = skipped = 0
+
+    with open(args.output, "a", encoding="utf-8") as f:
+        # 피드는 동시에 수집하고, 먼저 도착한 피드부터 요약
+        for result in processor.iter_all_feeds(max_entries=args.max_entries, new_only=args.new_only, dedupe=True):
+            articles = result["articles"]
+            if articles and "error" in articles[0]:
+                print(f"❌ {result['name']}: {articles[0]['error']}")
+                continue
+
+            if args.new_only:
+                # 지난 실행에서 수집만 되고 요약 전에 중단된 기사도 다시 후보에 포함
+                stored = store.get_articles(feed_url=result["url"], limit=args.max_entries)
+                articles = list({article["link"]: article for article in stored + articles}.values())
+                articles = store.unsummarized(articles, model, args.style)
+
+            pending = [
+                article for article in articles
+                if (article.get("link", ""), args.style, model) not in done
+            ]
+            skipped += len(articles) - len(pending)
+            if not pending:
+                continue
+
+            if args.full_text:
+                pending = processor.fetch_full_articles(pending)
+
+            print(f"📡 {result['name']}: {len(pending)}개 기사 요약 ({result['elapsed']:.1f}초 수집)")
+
+            def save_result(index: int, summary: Dict, blog_name=result["name"], batch=pending):
+                nonlocal written, failed
+                record = {
+                    "blog": blog_name,
+                    "model": model,
+                    "summary_style": args.style,
+                    "link": batch[index].get("link", ""),
+                    **summary
+                }
+                write_record(f, record)
+                if "error" in summary:
+                    failed += 1
+                else:
+                    written += 1
+                    done.add((record["link"], args.style, model))
+
+            # 배치 요약은 가장 낮은 우선순위로 보내 같은 프로세스의 사용자 요청이 먼저 슬롯을 받게 하고,
+            # 피드별로 번갈아 처리 (기사 하나가 끝날 때마다 바로 기록, 동시 요약 시 완료 순서대로)
+            with job_context(BACKGROUND, owner=args.job_owner, fair_key=result["name"]):
+                if args.backend == "ollama":
+                    summarizer.summarize_multiple_articles(
+                        pending, args.style, args.workers,
+                        long_document=args.long_document, on_complete=save_result,
+                        pack_short=args.pack_short, extraction_mode=args.extraction
+                    )
+                else:
+                    summarizer.summarize_multiple_articles(
+                        pending, args.style, long_document=args.long_document, on_complete=save_result,
+                        pack_short=args.pack_short, extraction_mode=args.extraction
+                    )
+
+    elapsed_time = time.time() - start_time
+    print(f"🎉 완료: {written}개 저장, {failed}개 실패, {skipped}개 건너뜀 ({elapsed_time:.1f}초)")
+    for row in metrics.registry.stage_summary():
+        print(f"   ⏱️ {row['stage']:<24} {row['count']:>5}회 {row['total_sec']:>9.2f}초 (평균 {row['avg_sec']:.3f}초)")
+    if args.metrics_json:
+        with open(args.metrics_json, "w", encoding="utf-8") as f:
+            f.write(metrics.registry.to_json())
+    return 1 if failed and not written else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from prompt_builder import PromptBuilder, estimate_tokens
+from concurrency import propagate_context
+import metrics
+
+# 본문이 이 토큰 수 이하인 기사만 여러 개를 한 프롬프트로 묶어 요약
+SHORT_ARTICLE_TOKENS = 400
+# 묶음 하나에서 기사 하나당 응답에 잡아두는 토큰 수 (출력 예산으로 묶음 크기를 제한)
+OUTPUT_TOKENS_PER_ARTICLE = 200
+
+BATCH_PROMPT = """
+아래에 [번호]가 붙은 기술 블로그 글 {count}개가 있습니다.
+각 글을 서로 섞지 말고 따로 요약해주세요. 요약 지시는 다음과 같습니다:
+{instruction}
+
+다른 설명 없이 JSON 객체 하나로만 답하세요. 키는 글 번호(문자열), 값은 그 글의 요약(문자열)입니다.
+예: {{"1": "첫 번째 글 요약", "2": "두 번째 글 요약"}}
+
+"""
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.MULTILINE)
+# JSON 전체 파싱이 실패했을 때 "번호": "요약" 쌍만이라도 건지기 위한 패턴
+_PAIR_PATTERN = re.compile(r'"\[?(\d+)\]?"\s*:\s*"((?:[^"\\]|\\.)*)"', re.DOTALL)
+
+def is_short_article(content: str, max_tokens: int = SHORT_ARTICLE_TOKENS) -> bool:
+    """묶음 요약 대상이 될 만큼 짧은 본문인지"""
+    return bool(content) and estimate_tokens(content) <= max_tokens
+
+def build_batch_prompt(instruction: str, items: List[str]) -> str:
+    """번호 붙은 기사 블록들을 하나의 묶음 프롬프트로 결합"""
+    return BATCH_PROMPT.format(count=len(items), instruction=instruction.strip()) + "\n\n".join(items)
+
+def pack_articles(articles: List[Dict], instruction: str, builder: PromptBuilder,
+                  max_items: Optional[int] = None) -> List[List[int]]:
+    """짧은 기사 인덱스들을 입력/출력 토큰 예산 안에서 묶음으로 나눔
+
+    입력은 지시문을 뺀 컨텍스트 예산, 출력은 기사당 OUTPUT_TOKENS_PER_ARTICLE 기준으로
+    max_output_tokens를 넘지 않도록 묶음 크기를 정한다.
+    """
+    output_limit = max(1, builder.max_output_tokens // OUTPUT_TOKENS_PER_ARTICLE)
+    max_items = min(max_items or output_limit, output_limit)
+    budget = builder.input_budget - estimate_tokens(build_batch_prompt(instruction, []))
+
+    batches, current, used = [], [], 0
+    for index, article in enumerate(articles):
+        item_tokens = estimate_tokens(_format_item(len(current) + 1, article)) + 1
+        if current and (len(current) >= max_items or used + item_tokens > budget):
+            batches.append(current)
+            current, used = [], 0
+            item_tokens = estimate_tokens(_format_item(1, article)) + 1
+        current.append(index)
+        used += item_tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def parse_batch_output(text: str, count: int) -> Dict[int, str]:
+    """묶음 응답에서 {1-based 번호: 요약} 추출 (형식이 틀린 항목은 빠짐)
+
+    코드 펜스, 앞뒤 잡담, 배열 형식 응답을 허용하고, JSON 전체가 깨졌으면
+    "번호": "요약" 쌍만이라도 골라낸다.
+    """
+    cleaned = _CODE_FENCE.sub("", text or "").strip()
+    parsed = None
+    for opener, closer in (("{", "}"), ("[", "]")):
+        start, end = cleaned.find(opener), cleaned.rfind(closer)
+        if start == -1 or end <= start:
+            continue
+        try:
+            parsed = json.loads(cleaned[start:end + 1])
+            break
+        except ValueError:
+            continue
+
+    pairs: List[Tuple[object, object]] = []
+    if isinstance(parsed, dict):
+        pairs = list(parsed.items())
+    elif isinstance(parsed, list):
+        for position, item in enumerate(parsed, 1):
+            if isinstance(item, dict):
+                key = item.get("id", item.get("index", position))
+                pairs.append((key, item.get("summary", "")))
+            else:
+                pairs.append((position, item))
+    else:
+        for key, value in _PAIR_PATTERN.findall(cleaned):
+            try:
+                pairs.append((key, json.loads(f'"{value}"', strict=False)))
+            except ValueError:
+                continue
+
+    results = {}
+    for key, value in pairs:
+        try:
+            number = int(str(key).strip("[] "))
+        except ValueError:
+            continue
+        if 1 <= number <= count and isinstance(value, str) and value.strip():
+            results[number] = value.strip()
+    return results
+
+def summarize_packed(articles: List[Dict], instruction: str, builder: PromptBuilder,
+                     generate: Callable[[str], str], max_items: Optional[int] = None,
+                     max_workers: int = 1) -> Dict[int, Tuple[str, float]]:
+    """짧은 기사들을 묶음 프롬프트로 요약해 {인덱스: (요약, 기사당 소요 시간)} 반환
+
+    응답에서 찾지 못한 기사나 LLM 호출이 실패한 묶음의 기사는 결과에서 빠지므로
+    호출하는 쪽에서 개별 요약으로 다시 처리하면 된다.
+    """
+    batches = pack_articles(articles, instruction, builder, max_items)
+
+    def run(batch: List[int]) -> Dict[int, Tuple[str, float]]:
+        items = [_format_item(number, articles[index]) for number, index in enumerate(batch, 1)]
+        start_time = time.time()
+        try:
+            with metrics.timer("pipeline_stage_seconds", stage="llm_batch"):
+                output = generate(build_batch_prompt(instruction, items))
+        except Exception as e:
+            print(f"⚠️ 묶음 요약 실패 ({len(batch)}개 기사는 개별 요약): {str(e)}")
+            return {}
+        per_article_time = (time.time() - start_time) / len(batch)
+
+        parsed = parse_batch_output(output, len(batch))
+        if len(parsed) < len(batch):
+            print(f"⚠️ 묶음 응답에서 {len(batch) - len(parsed)}개 기사 요약을 찾지 못해 개별 요약합니다")
+        return {batch[number - 1]: (summary, per_article_time) for number, summary in parsed.items()}
+
+    print(f"📦 짧은 기사 {len(articles)}개를 {len(batches)}개 묶음으로 요약 중...")
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches) or 1))) as executor:
+        for batch_results in executor.map(propagate_context(run), batches):
+            results.update(batch_results)
+    return results
+
+def _format_item(number: int, article: Dict) -> str:
+    content = article.get('content', article.get('summary', ''))
+    return f"[{number}] 제목: {article.get('title', '')}\n{content}"
@@ -0,0 +1,98 @@
+"""조건부 GET 확인 벤치마크: 바뀌지 않은 피드를 다시 가져올 때 다운로드/파싱을 건너뛰는지
+
+같은 피드를 fetch_rss_feed(new_only=True)로 연달아 가져오며 서버 응답 코드, 받은 본문 바이트,
+파싱 횟수(feed_fetch_total status=ok), 걸린 시간을 비교한다.
+- 검증자 서버: ETag/Last-Modified를 보내므로 두 번째 요청은 304로 끝나야 한다
+- 검증자 없는 서버: 전체 본문을 다시 받지만 본문 해시가 같아 파싱은 건너뛰어야 한다
+- 피드 변경 후: 다시 200을 받고 새로 생긴 엔트리만 돌려줘야 한다
+기대와 다르면 종료 코드 1로 끝난다.
+
+실행: python benchmarks/bench_conditional_get.py --entries 30 --paragraphs 40
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_servers import make_feed, start_conditional_feed_server
+from rss_processor import RSSProcessor
+import metrics
+
+def parse_count() -> int:
+    return int(metrics.registry.counter_total("feed_fetch_total", status="ok"))
+
+def fetch(processor: RSSProcessor, url: str, stats, max_entries: int) -> Dict:
+    """한 번 가져오고 이번 요청의 응답 코드/받은 바이트/파싱 여부/결과 수 반환"""
+    before = dict(stats)
+    parsed_before = parse_count()
+    start_time = time.perf_counter()
+    articles = processor.fetch_rss_feed(url, max_entries=max_entries, new_only=True)
+    elapsed = time.perf_counter() - start_time
+    errors = [article["error"] for article in articles if isinstance(article, dict) and "error" in article]
+    return {
+        "status": next((code for code in (200, 304) if stats[code] > before.get(code, 0)), None),
+        "bytes": stats["bytes"] - before.get("bytes", 0),
+        "parsed": parse_count() - parsed_before,
+        "articles": len(articles) - len(errors),
+        "errors": errors,
+        "ms": round(elapsed * 1000, 1),
+    }
+
+def run_scenario(label: str, validators: bool, args, failures: List[str]):
+    name = "conditional" if validators else "plain"
+    feeds = {name: make_feed(name, args.entries, args.paragraphs, full_content=True)}
+    server, urls = start_conditional_feed_server(feeds, validators=validators)
+    stats = server.RequestHandlerClass.stats
+    max_entries = args.entries + 1
+
+    with tempfile.TemporaryDirectory() as workdir:
+        processor = RSSProcessor(os.path.join(workdir, "rss_blogs.json"))
+        first = fetch(processor, urls[name], stats, max_entries)
+        second = fetch(processor, urls[name], stats, max_entries)
+        # 엔트리 하나가 늘어난 피드로 교체
+        feeds[name] = make_feed(name, args.entries + 1, args.paragraphs, full_content=True)
+        changed = fetch(processor, urls[name], stats, max_entries)
+    server.shutdown()
+
+    print(f"\n[{label}]")
+    for step, row in (("첫 요청", first), ("다시 요청", second), ("피드 변경 후", changed)):
+        print(f"   {step:<8} HTTP {row['status']}  본문 {row['bytes']:>9,} B  파싱 {row['parsed']}회  "
+              f"기사 {row['articles']:>3}개  {row['ms']:>7.1f}ms"
+              f"{'  오류 ' + '; '.join(row['errors']) if row['errors'] else ''}")
+
+    expected_second = {"status": 304 if validators else 200, "parsed": 0, "articles": 0}
+    if validators:
+        expected_second["bytes"] = 0
+    checks = [
+        ("첫 요청", first, {"status": 200, "parsed": 1, "articles": args.entries}),
+        ("다시 요청", second, expected_second),
+        ("피드 변경 후", changed, {"status": 200, "parsed": 1, "articles": 1}),
+    ]
+    for step, row, expected in checks:
+        for key, value in expected.items():
+            if row[key] != value:
+                failures.append(f"{label} {step}: {key}={row[key]} (기대값 {value})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="조건부 GET/본문 해시로 바뀌지 않은 피드를 건너뛰는지 확인")
+    parser.add_argument("--entries", type=int, default=30)
+    parser.add_argument("--paragraphs", type=int, default=40, help="엔트리당 본문 문단 수")
+    args = parser.parse_args(argv)
+
+    failures: List[str] = []
+    run_scenario("ETag/Last-Modified 지원 서버", True, args, failures)
+    run_scenario("검증자 없는 서버 (본문 해시 비교)", False, args, failures)
+
+    if failures:
+        print("\n❌ 기대와 다른 결과:")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+    print("\n✅ 바뀌지 않은 피드는 다운로드(304) 또는 파싱(본문 해시)을 건너뜀")
+
+if __name__ == "__main__":
+    main()
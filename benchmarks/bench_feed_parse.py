@@ -0,0 +1,113 @@
+"""피드 파싱 벤치마크: 기존 방식(feedparser 전체 파싱 + dict) vs 스트리밍 파서 + Article
+
+전체 본문 아카이브 피드(엔트리 수백 개, 수 MB)에서 max_entries별로
+파싱 시간 중앙값, 파싱 중 최대 메모리(tracemalloc), 파싱 후 기사 목록이 차지하는 메모리를 비교한다.
+
+실행: python benchmarks/bench_feed_parse.py --output feed_parse.json
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_pipeline import git_commit
+from fake_servers import make_feed
+from feed_parser import iter_entries
+from html_cleaner import clean_html
+from rss_processor import RSSProcessor
+
+# 픽스처 피드 (엔트리 수, 엔트리당 문단 수)
+ARCHIVE_FEEDS = {
+    "archive_200x40": (200, 40),
+    "archive_500x20": (500, 20),
+}
+
+CHUNK_SIZE = 64 * 1024
+
+def legacy_articles(processor: RSSProcessor, xml: bytes, max_entries: Optional[int]) -> List[Dict]:
+    """기존 fetch_rss_feed: 문서 전체를 feedparser로 파싱한 뒤 앞에서 자르고 필드마다 문자열을 따로 보관"""
+    import feedparser
+    feed = feedparser.parse(xml)
+    articles = []
+    for entry in feed.entries[:max_entries]:
+        articles.append({
+            "guid": processor._entry_id(entry),
+            "title": getattr(entry, "title", ""),
+            "link": getattr(entry, "link", ""),
+            "published": getattr(entry, "published", ""),
+            "summary": clean_html(getattr(entry, "summary", "")),
+            "content": processor._extract_rss_content(entry),
+            "description": clean_html(getattr(entry, "description", "")),
+            "author": getattr(entry, "author", ""),
+            "updated": getattr(entry, "updated", ""),
+            "tags": processor._extract_tags(entry),
+        })
+    return articles
+
+def streaming_articles(processor: RSSProcessor, xml: bytes, max_entries: Optional[int]) -> List:
+    chunks = (xml[i:i + CHUNK_SIZE] for i in range(0, len(xml), CHUNK_SIZE))
+    return [processor._build_article(entry) for entry in iter_entries(chunks, max_entries)]
+
+def measure(parse: Callable[[], List], repeat: int) -> Dict:
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        parse()
+        times.append(time.perf_counter() - start_time)
+
+    # 메모리는 시간 측정과 따로 (tracemalloc이 파싱을 느리게 함)
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    articles = parse()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "articles": len(articles),
+        "parse_ms_p50": round(statistics.median(times) * 1000, 2),
+        "peak_kb": round((peak - baseline) / 1024, 1),
+        "retained_kb": round((current - baseline) / 1024, 1),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="피드 파싱 시간/메모리 비교 (feedparser + dict vs 스트리밍 + Article)")
+    parser.add_argument("--repeat", type=int, default=3, help="시간 측정 반복 횟수")
+    parser.add_argument("--max-entries", type=int, nargs="+", default=[3, 10, 0],
+                        help="가져올 엔트리 수 목록 (0은 전체)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        processor = RSSProcessor(os.path.join(workdir, "rss_blogs.json"))
+    results = []
+    for name, (entries, paragraphs) in ARCHIVE_FEEDS.items():
+        xml = make_feed(name, entries, paragraphs, full_content=True)
+        for max_entries in args.max_entries:
+            limit = max_entries or None
+            legacy = measure(lambda: legacy_articles(processor, xml, limit), args.repeat)
+            streaming = measure(lambda: streaming_articles(processor, xml, limit), args.repeat)
+            results.append({
+                "feed": name, "feed_kb": round(len(xml) / 1024, 1), "max_entries": max_entries or "all",
+                "legacy": legacy, "streaming": streaming,
+            })
+            print(f"[{name} {len(xml) / 1024 / 1024:.1f}MB, {f'{max_entries}개' if max_entries else '전체'}] "
+                  f"시간 {legacy['parse_ms_p50']:.1f}ms → {streaming['parse_ms_p50']:.1f}ms | "
+                  f"최대 메모리 {legacy['peak_kb']:.0f}KB → {streaming['peak_kb']:.0f}KB | "
+                  f"기사 목록 {legacy['retained_kb']:.0f}KB → {streaming['retained_kb']:.0f}KB")
+
+    report = {"commit": git_commit(), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Ollama 호스트 풀 벤치마크: 호스트 수별 요약 처리량
+
+호스트마다 가짜 Ollama 서버(동시 생성 --parallel개)를 하나씩 띄우고, 호스트 1대, 2대, ... 구성으로
+같은 기사들을 OllamaSummarizer(hosts=...)로 요약해 분당 처리 기사 수를 비교한다.
+모델이 없는 호스트 하나를 풀에 함께 넣어 요청이 가지 않는지(모델 인식 배치) 확인하고,
+--fail-host를 주면 마지막 호스트가 도중에 503만 돌려주게 만들어 빠지는지(drain) 확인한다.
+
+실행: python benchmarks/bench_hosts.py --hosts 1 2 4 --articles 48
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_servers import FakeOllamaConfig, start_fake_ollama
+from ollama_summarizer import OllamaSummarizer
+
+def make_articles(count: int, run: str) -> List[Dict]:
+    # 실행마다 다른 본문을 써서 같은 프롬프트 합치기(single-flight)가 끼어들지 않게 함
+    return [
+        {"title": f"호스트 벤치 {run}-{i}", "link": f"https://blog.example.com/{run}/{i}", "author": "벤치",
+         "content": f"분산 요약 테스트 본문 {run}-{i} " * 30}
+        for i in range(count)
+    ]
+
+def run_hosts(host_count: int, args) -> Dict:
+    configs = [FakeOllamaConfig(latency=0.05, tokens_per_sec=args.tokens_per_sec, output_tokens=args.output_tokens,
+                                parallel=args.parallel) for _ in range(host_count)]
+    urls = [start_fake_ollama(config)[1] for config in configs]
+    # 모델을 받지 않은 호스트 (요청이 가면 안 됨)
+    other = FakeOllamaConfig(models=["mistral:latest"], parallel=args.parallel)
+    hosts = urls + [start_fake_ollama(other)[1]]
+
+    summarizer = OllamaSummarizer("llama3.2", base_url=urls[0], keep_alive=None, hosts=hosts)
+    # 풀 전체 슬롯만큼 동시에 요청 (summarize_multiple_articles의 적응형 한도는 1부터 늘어나 측정을 흐리므로 쓰지 않음)
+    workers = args.parallel * host_count
+    articles = make_articles(args.articles, f"h{host_count}")
+
+    if args.fail_host and host_count > 1:
+        # 첫 요약들이 진행된 뒤 마지막 호스트가 503만 돌려주도록 바꿈
+        threading.Timer(0.5, lambda: setattr(configs[-1], "error_rate", 1.0)).start()
+
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        summaries = list(executor.map(
+            lambda article: summarizer.summarize_single_article(article, "brief"), articles
+        ))
+    elapsed = time.time() - start_time
+    return {
+        "hosts": host_count,
+        "articles_per_min": round(len(articles) / elapsed * 60, 1),
+        "errors": sum(1 for summary in summaries if "error" in summary),
+        "requests_per_host": [config.requests for config in configs],
+        "requests_without_model": other.requests,
+        "pool": summarizer.pool.stats(),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="호스트 수별 Ollama 풀 처리량 비교")
+    parser.add_argument("--hosts", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--articles", type=int, default=48)
+    parser.add_argument("--parallel", type=int, default=2, help="호스트당 동시 생성 수 (OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--tokens-per-sec", type=float, default=100.0)
+    parser.add_argument("--output-tokens", type=int, default=40)
+    parser.add_argument("--fail-host", action="store_true", help="도중에 마지막 호스트를 503만 돌려주게 만듦")
+    args = parser.parse_args(argv)
+    os.environ["OLLAMA_NUM_PARALLEL"] = str(args.parallel)
+
+    baseline = None
+    for host_count in args.hosts:
+        result = run_hosts(host_count, args)
+        baseline = baseline or result["articles_per_min"]
+        print(f"\n[호스트 {host_count}대] {result['articles_per_min']}건/분 "
+              f"(첫 구성 대비 {result['articles_per_min'] / baseline:.1f}배)"
+              f"{'  오류 ' + str(result['errors']) if result['errors'] else ''}")
+        print(f"   호스트별 요청 {result['requests_per_host']}, 모델 없는 호스트 요청 {result['requests_without_model']}")
+        for row in result["pool"]:
+            print(f"   {row['host']:<24} {row['state']:<9} 요청 {row['requests']:>3} 연속 실패 {row['failures']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""HTML 정제 마이크로 벤치마크: 기존 방식(원문 3번 정제) vs 1회 정제 + 중복 제거
+
+실행: python benchmarks/bench_html_cleaner.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_cleaner import clean_html, merge_unique
+
+def legacy_clean(text: str) -> str:
+    """기존 RSSProcessor._clean_html_tags 구현"""
+    clean_text = re.sub(r'<[^>]+>', '', text)
+    clean_text = re.sub(r'\s+', ' ', clean_text)
+    return clean_text.strip()
+
+def legacy_entry(summary: str, contents: list, description: str):
+    """기존 fetch_rss_feed의 엔트리 처리: summary/description 따로 + 전체 결합본 정제"""
+    return (
+        legacy_clean(summary),
+        legacy_clean(" ".join([summary] + contents + [description])),
+        legacy_clean(description),
+    )
+
+def new_entry(summary: str, contents: list, description: str):
+    cleaned = {}
+    def clean(raw):
+        if raw not in cleaned:
+            cleaned[raw] = clean_html(raw)
+        return cleaned[raw]
+    return (
+        clean(summary),
+        merge_unique([clean(summary)] + [clean(c) for c in contents] + [clean(description)]),
+        clean(description),
+    )
+
+def make_entry(paragraphs: int):
+    body = "".join(
+        f"<p>Paragraph {i}: we migrated the <b>cache</b> layer &amp; cut p99 latency by {i}%.</p>"
+        f"<pre><code>SELECT * FROM t{i};</code></pre>"
+        for i in range(paragraphs)
+    )
+    body += "<script>trackPageView();</script><style>.x{color:red}</style>"
+    summary = body[:400]
+    # 전체 본문 피드에서는 summary == description, content는 전체 본문인 경우가 흔함
+    return summary, [body], summary
+
+def main():
+    for paragraphs in (10, 200, 2000):
+        summary, contents, description = make_entry(paragraphs)
+        raw_size = len(summary) + sum(map(len, contents)) + len(description)
+        number = max(1, 2000 // paragraphs)
+
+        legacy_time = timeit.timeit(lambda: legacy_entry(summary, contents, description), number=number) / number
+        new_time = timeit.timeit(lambda: new_entry(summary, contents, description), number=number) / number
+        legacy_content = legacy_entry(summary, contents, description)[1]
+        new_content = new_entry(summary, contents, description)[1]
+
+        print(f"[{paragraphs:>4} 문단, 원문 {raw_size / 1024:8.1f}KB] "
+              f"기존 {legacy_time * 1000:8.2f}ms → 신규 {new_time * 1000:8.2f}ms "
+              f"(x{legacy_time / new_time:.2f}) | content {len(legacy_content):>7}자 → {len(new_content):>7}자")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""RSS 수집 + Ollama 요약 파이프라인 end-to-end 벤치마크
+
+로컬 고정 피드와 가짜 Ollama 서버로 RSSProcessor → OllamaSummarizer 전체를 돌리고
+분당 처리 기사 수, 요약 지연 p50/p95, 최대 메모리(RSS)를 JSON으로 출력한다.
+tracemalloc은 피드 파싱을 크게 느리게 하므로 --trace-malloc을 줄 때만 켠다.
+결과 파일을 --compare로 넘기면 이전 실행(예: 다른 커밋)과의 차이를 함께 보여준다.
+
+실행: python benchmarks/bench_pipeline.py --workers 4 --output bench.json
+     python benchmarks/bench_pipeline.py --workers 4 --compare bench.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_servers import FakeOllamaConfig, make_fixture_feeds, start_fake_ollama, start_feed_server
+from ollama_summarizer import OllamaSummarizer
+from rss_processor import RSSProcessor
+
+# 값이 클수록 좋은 지표 (나머지는 작을수록 좋음)
+HIGHER_IS_BETTER = {"articles_per_min", "success_rate"}
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """최근접 순위 방식 백분위수"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+def run_pipeline(args) -> Dict:
+    config = FakeOllamaConfig(
+        latency=args.latency, tokens_per_sec=args.tokens_per_sec, output_tokens=args.output_tokens,
+        error_rate=args.error_rate, parallel=args.parallel, models=[f"{args.model}:latest"], seed=args.seed
+    )
+    ollama_server, ollama_url = start_fake_ollama(config)
+    feed_server, feeds = start_feed_server(make_fixture_feeds(args.feeds_per_size))
+
+    # 요약기 생성(모델 확인, langchain 임포트)은 두 방식 모두 측정 구간 밖에서
+    summarizer = OllamaSummarizer(args.model, base_url=ollama_url, keep_alive=None)
+    latencies = []
+    packed_latencies = []
+    latency_lock = threading.Lock()
+    summarize_single = summarizer._summarize_article
+    summarize_packed = summarizer._summarize_packed
+    complete = summarizer.backend.complete
+
+    # 기사별 지연을 재기 위해 인스턴스의 단일 요약 메서드를 감쌈
+    # (일괄 요약의 개별 기사와 스트리밍 모두 _summarize_article을 거치며, 실패한 요약도 지연에 포함.
+    #  --pack-short로 묶어 요약한 기사는 여기를 거치지 않으므로 묶음별 지연을 따로 잰다)
+    def timed_summarize(*call_args, **call_kwargs):
+        call_start = time.time()
+        try:
+            return summarize_single(*call_args, **call_kwargs)
+        finally:
+            with latency_lock:
+                latencies.append(time.time() - call_start)
+
+    def timed_complete(prompt):
+        call_start = time.time()
+        try:
+            return complete(prompt)
+        finally:
+            with latency_lock:
+                packed_latencies.append(time.time() - call_start)
+
+    # 묶음 요약은 개별 요약을 시작하기 전에 끝나므로 그동안만 LLM 호출(묶음 하나당 한 번)을 잼
+    def timed_packed(*call_args, **call_kwargs):
+        summarizer.backend.complete = timed_complete
+        try:
+            return summarize_packed(*call_args, **call_kwargs)
+        finally:
+            summarizer.backend.complete = complete
+
+    summarizer._summarize_article = timed_summarize
+    summarizer._summarize_packed = timed_packed
+    first_summary_time = None
+
+    if args.trace_malloc:
+        tracemalloc.start()
+    start_time = time.time()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            processor = RSSProcessor(os.path.join(workdir, "rss_blogs.json"))
+            feed_times = []
+            fetch_done = []
+
+            def feed_articles():
+                for result in processor.iter_all_feeds(feeds, max_entries=args.max_entries, per_host=args.per_host):
+                    feed_times.append(result["elapsed"])
+                    yield from (article for article in result["articles"] if "error" not in article)
+                fetch_done.append(time.time())
+
+            if args.streaming:
+                # 수집과 요약을 겹쳐 진행: 피드가 도착하는 대로 기사를 흘려보냄
+                articles, summaries = [], []
+                summarize_start = start_time
+                for event in summarizer.iter_summaries(feed_articles(), args.style, max_in_flight=args.workers,
+                                                       long_document=args.long_document):
+                    if event["type"] == "article":
+                        articles.append(event["index"])
+                    elif event["type"] == "summary":
+                        if first_summary_time is None:
+                            first_summary_time = time.time() - start_time
+                        summaries.append(event["summary"])
+                fetch_time = fetch_done[0] - start_time
+            else:
+                # 1단계: 피드 수집
+                articles = list(feed_articles())
+                fetch_time = fetch_done[0] - start_time
+
+                # 2단계: 요약
+                def on_complete(index, summary):
+                    nonlocal first_summary_time
+                    if first_summary_time is None:
+                        first_summary_time = time.time() - start_time
+
+                summarize_start = time.time()
+                summaries = summarizer.summarize_multiple_articles(
+                    articles, args.style, max_workers=args.workers,
+                    long_document=args.long_document, pack_short=args.pack_short, on_complete=on_complete
+                )
+            summarize_time = time.time() - summarize_start
+    finally:
+        total_time = time.time() - start_time
+        peak_bytes = None
+        if args.trace_malloc:
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        ollama_server.shutdown()
+        feed_server.shutdown()
+
+    succeeded = sum(1 for summary in summaries if "error" not in summary)
+    return {
+        "articles": len(articles),
+        "succeeded": succeeded,
+        "success_rate": round(succeeded / len(articles), 4) if articles else 0.0,
+        "llm_requests": config.requests,
+        "injected_errors": config.errors,
+        "articles_per_min": round(succeeded / total_time * 60, 2) if total_time else 0.0,
+        "total_sec": round(total_time, 3),
+        "fetch_sec": round(fetch_time, 3),
+        "summarize_sec": round(summarize_time, 3),
+        "first_summary_sec": round(first_summary_time, 3) if first_summary_time is not None else None,
+        "feed_p50_sec": round(percentile(feed_times, 50) or 0.0, 4),
+        "feed_p95_sec": round(percentile(feed_times, 95) or 0.0, 4),
+        # 개별 요약한 기사만의 지연 (묶음 요약 기사는 아래 packed_* 에서 묶음 단위로)
+        "summary_p50_sec": round(percentile(latencies, 50) or 0.0, 4),
+        "summary_p95_sec": round(percentile(latencies, 95) or 0.0, 4),
+        "packed_articles": sum(1 for summary in summaries if summary.get("batched")),
+        "packed_groups": len(packed_latencies),
+        "packed_p50_sec": round(percentile(packed_latencies, 50), 4) if packed_latencies else None,
+        "packed_p95_sec": round(percentile(packed_latencies, 95), 4) if packed_latencies else None,
+        "peak_traced_mb": round(peak_bytes / 1024 / 1024, 2) if peak_bytes is not None else None,
+        # 리눅스는 KB 단위, macOS는 바이트 단위
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                            / (1024 * 1024 if sys.platform == "darwin" else 1024), 2),
+    }
+
+def compare(current: Dict, previous: Dict):
+    """이전 결과 대비 지표 변화를 사람이 읽기 쉽게 출력 (stderr)"""
+    print(f"\n📊 {previous.get('commit')} → {current.get('commit')}", file=sys.stderr)
+    for key, value in current["metrics"].items():
+        old = previous.get("metrics", {}).get(key)
+        if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or old == 0:
+            continue
+        change = (value - old) / old * 100
+        better = change > 0 if key in HIGHER_IS_BETTER else change < 0
+        marker = "✅" if better else ("⚠️" if abs(change) >= 10 else "  ")
+        print(f"{marker} {key:<18} {old:>10} → {value:>10} ({change:+.1f}%)", file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가짜 Ollama/고정 피드로 요약 파이프라인 성능 측정")
+    parser.add_argument("--model", default="llama3.2")
+    parser.add_argument("--style", choices=["technical", "business", "brief"], default="brief")
+    parser.add_argument("--feeds-per-size", type=int, default=2, help="small/medium/large 피드를 각각 몇 개씩")
+    parser.add_argument("--max-entries", type=int, default=10, help="피드당 최대 기사 수")
+    parser.add_argument("--per-host", type=int, default=8, help="피드 서버 동시 요청 수 (모두 같은 호스트)")
+    parser.add_argument("--workers", type=int, default=4, help="최대 동시 요약 수")
+    parser.add_argument("--long-document", action="store_true")
+    parser.add_argument("--pack-short", action="store_true")
+    parser.add_argument("--streaming", action="store_true",
+                        help="수집이 끝나길 기다리지 않고 기사 단위 스트리밍 파이프라인(iter_summaries)으로 실행")
+    parser.add_argument("--latency", type=float, default=0.2, help="가짜 Ollama 첫 토큰 지연(초)")
+    parser.add_argument("--tokens-per-sec", type=float, default=200.0)
+    parser.add_argument("--output-tokens", type=int, default=40, help="응답당 생성 토큰 수")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 응답 비율 (0~1)")
+    parser.add_argument("--parallel", type=int, default=4, help="가짜 Ollama 동시 생성 슬롯 (OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--trace-malloc", action="store_true", help="tracemalloc으로 파이썬 힙 최대치 측정 (느려짐)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 저장 경로 (없으면 stdout)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 경로")
+    args = parser.parse_args(argv)
+
+    settings = {key: value for key, value in vars(args).items() if key not in ("output", "compare")}
+    result = {
+        "benchmark": "pipeline",
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "config": settings,
+    }
+    # 파이프라인의 진행 로그가 stdout의 JSON과 섞이지 않도록 stderr로 돌림
+    with contextlib.redirect_stdout(sys.stderr):
+        result["metrics"] = run_pipeline(args)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"💾 결과 저장: {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(result, json.load(f))
+
+if __name__ == "__main__":
+    main()
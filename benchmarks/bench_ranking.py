@@ -0,0 +1,65 @@
+"""관련도 랭킹 벤치마크: 후보 기사 수별 RelevanceRanker.rank 소요 시간
+
+실행: python benchmarks/bench_ranking.py --candidates 1000 5000 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from email.utils import formatdate
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ranking import RelevanceRanker, select_within_budget
+
+# 주제와 상관없는 일반 문장 단어
+FILLER = ("서비스를 개선하고 사용자의 경험과 팀의 문제를 해결한 방법과 구조, 설계, 운영, 성능, 개발, "
+          "코드 리뷰, 회고, 채용, 문화에 대해 이야기합니다. We share lessons from building the product.").split()
+TOPIC_WORDS = {
+    "AI": "LLM으로 모델을 추론 임베딩 RAG 에이전트가".split(),
+    "DB": "MySQL 인덱스를 쿼리 샤딩 Redis의 트랜잭션".split(),
+    "Cloud": "AWS에서 쿠버네티스를 EKS 컨테이너 Terraform으로".split(),
+}
+
+def make_candidates(count: int, words_per_article: int, seed: int = 0) -> List[Dict]:
+    """본문 일부에 주제 단어를 섞은 후보 기사 (절반 정도는 주제와 무관)"""
+    rng = random.Random(seed)
+    now = time.time()
+    candidates = []
+    for i in range(count):
+        topic = rng.choice(list(TOPIC_WORDS) + [None, None])
+        words = [rng.choice(FILLER) for _ in range(words_per_article)]
+        if topic:
+            words += [rng.choice(TOPIC_WORDS[topic]) for _ in range(rng.randint(1, 15))]
+        candidates.append({
+            "title": f"기술 글 {i}",
+            "link": f"https://blog.example.com/posts/{i}",
+            "content": " ".join(words),
+            "published": formatdate(now - rng.randint(0, 30 * 86400)),
+        })
+    return candidates
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="후보 기사 수별 관련도 랭킹 시간 측정")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--words", type=int, default=300, help="기사당 본문 단어 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    ranker = RelevanceRanker()
+    for count in args.candidates:
+        candidates = make_candidates(count, args.words)
+        times = []
+        for _ in range(args.repeat):
+            start_time = time.perf_counter()
+            ranked = ranker.rank(candidates, ["AI", "DB"])
+            times.append(time.perf_counter() - start_time)
+        chosen = select_within_budget(ranked, 10, time_budget=300, estimate_seconds=lambda article: 30)
+        print(f"[후보 {count:>6}개] 랭킹 {statistics.median(times) * 1000:8.1f}ms | "
+              f"상위 {len(chosen)}개 주제: {', '.join(item['topic'] for item in chosen)}")
+
+if __name__ == "__main__":
+    main()
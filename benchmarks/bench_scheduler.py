@@ -0,0 +1,100 @@
+"""LLM 우선순위 스케줄러 벤치마크: 배치로 포화된 Ollama에서 사용자 요청 지연
+
+가짜 Ollama 서버(동시 생성 --parallel개)를 배경 작업 --background개 스레드로 계속 채워 두고,
+그 사이에 사용자 요약 요청(INTERACTIVE)을 --interactive번 보내 요청부터 완료까지 걸린 시간을 잰다.
+스케줄러 없이 서버 대기열에 그대로 쌓일 때와 LLMScheduler를 거칠 때를 비교한다.
+
+실행: python benchmarks/bench_scheduler.py --parallel 2 --background 8 --interactive 8
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_pipeline import percentile
+from fake_servers import FakeOllamaConfig, start_fake_ollama
+from llm_scheduler import BACKGROUND, INTERACTIVE, LLMScheduler, job_context
+from ollama_summarizer import OllamaSummarizer
+
+def saturate(summarizer: OllamaSummarizer, worker: int, stop: threading.Event, done: List[int]):
+    """배치 작업 흉내: 멈출 때까지 서로 다른 프롬프트를 BACKGROUND 우선순위로 계속 생성"""
+    with job_context(BACKGROUND, owner="batch", fair_key=f"feed-{worker % 3}"):
+        count = 0
+        while not stop.is_set():
+            summarizer.backend.generate(f"배치 요약 {worker}-{count}")
+            count += 1
+            done.append(1)
+
+def run_mode(summarizer: OllamaSummarizer, args) -> Dict:
+    stop = threading.Event()
+    background_done: List[int] = []
+    threads = [
+        threading.Thread(target=saturate, args=(summarizer, worker, stop, background_done), daemon=True)
+        for worker in range(args.background)
+    ]
+    for thread in threads:
+        thread.start()
+    # 서버 대기열이 찰 때까지 잠시 기다림
+    time.sleep(1.0)
+
+    latencies = []
+    errors = 0
+    start_time = time.time()
+    with job_context(INTERACTIVE, owner="user", fair_key="user"):
+        for i in range(args.interactive):
+            article = {"title": f"사용자 요청 기사 {i}", "link": f"https://blog.example.com/user/{i}",
+                       "author": "벤치", "content": f"사용자가 지금 기다리는 기사 본문 {i} " * 20}
+            request_time = time.time()
+            summary = summarizer.summarize_single_article(article, "brief")
+            latencies.append(time.time() - request_time)
+            errors += "error" in summary
+            time.sleep(args.gap)
+    elapsed = time.time() - start_time
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {
+        "interactive_p50": percentile(latencies, 50),
+        "interactive_p95": percentile(latencies, 95),
+        "interactive_errors": errors,
+        "background_per_min": round(len(background_done) / elapsed * 60, 1),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="배치 포화 상태에서 사용자 요청 지연 비교")
+    parser.add_argument("--parallel", type=int, default=2, help="가짜 서버 동시 생성 수 (OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--background", type=int, default=8, help="배경 작업 스레드 수")
+    parser.add_argument("--interactive", type=int, default=8, help="사용자 요청 횟수")
+    parser.add_argument("--gap", type=float, default=0.2, help="사용자 요청 사이 간격 (초)")
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0)
+    parser.add_argument("--output-tokens", type=int, default=40)
+    args = parser.parse_args(argv)
+
+    config = FakeOllamaConfig(latency=0.05, tokens_per_sec=args.tokens_per_sec,
+                              output_tokens=args.output_tokens, parallel=args.parallel)
+    _, ollama_url = start_fake_ollama(config)
+    summarizer = OllamaSummarizer("llama3.2", base_url=ollama_url, keep_alive=None)
+
+    modes = {
+        "스케줄러 없음 (서버 대기열)": None,
+        "우선순위 스케줄러": LLMScheduler(args.parallel, name=ollama_url),
+    }
+    for label, scheduler in modes.items():
+        summarizer.backend.scheduler = scheduler
+        result = run_mode(summarizer, args)
+        print(f"\n[{label}]")
+        print(f"   사용자 요청 p50 {result['interactive_p50']:.2f}초 / p95 {result['interactive_p95']:.2f}초"
+              f"{'  오류 ' + str(result['interactive_errors']) if result['interactive_errors'] else ''}")
+        print(f"   배치 처리량 {result['background_per_min']}건/분")
+        if scheduler is not None:
+            for row in scheduler.stats()["classes"]:
+                print(f"   {row['priority']:<12} 완료 {row['completed']:>4} 대기 p50 {row['wait_p50_sec']}초 "
+                      f"p95 {row['wait_p95_sec']}초")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""앱 시작 비용 벤치마크: 모듈 임포트 시간 + Ollama 상태/모델 조회 시간
+
+임포트 시간은 매번 새 파이썬 프로세스에서 재고(중앙값), 모델 조회는 가짜 Ollama 서버를 상대로
+캐시 없는 첫 조회와 Streamlit 재실행 때처럼 캐시된 조회를 비교한다.
+`ollama` 명령이 설치되어 있으면 기존 방식(`ollama list` 프로세스 실행)도 함께 잰다.
+
+실행: python benchmarks/bench_startup.py [--repeat 5] [--output startup.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_pipeline import git_commit
+from fake_servers import FakeOllamaConfig, start_fake_ollama
+import ollama_models
+
+# Streamlit 앱과 CLI가 시작할 때 불러오는 모듈들
+MODULES = ["rss_processor", "summarizer_pool", "ollama_summarizer", "tech_blog_summarizer", "batch_cli"]
+
+IMPORT_SNIPPET = """
+import sys, time, warnings
+warnings.simplefilter("ignore")
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in ("langchain", "langchain_community", "langchain_anthropic", "feedparser", "bs4")
+         if name in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+def measure_import(module: str, repeat: int):
+    times = []
+    heavy = ""
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+                                capture_output=True, text=True, cwd=ROOT)
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1] if result.stderr else "import failed"}
+        fields = result.stdout.split()
+        times.append(float(fields[0]))
+        heavy = fields[1] if len(fields) > 1 else ""
+    return {
+        "median_ms": round(statistics.median(times) * 1000, 1),
+        "min_ms": round(min(times) * 1000, 1),
+        "heavy_modules_loaded": [name for name in heavy.split(",") if name],
+    }
+
+def measure_probe(repeat: int):
+    server, base_url = start_fake_ollama(FakeOllamaConfig(latency=0))
+    try:
+        ollama_models.invalidate()
+        start = time.perf_counter()
+        ollama_models.list_models(base_url)
+        first_ms = (time.perf_counter() - start) * 1000
+
+        # 재실행 한 번에 상태 확인 + 모델 목록 조회를 하던 것과 같은 호출 수
+        start = time.perf_counter()
+        for _ in range(repeat):
+            running = ollama_models.list_models(base_url) is not None
+            models = ollama_models.list_models(base_url) if running else []
+        cached_ms = (time.perf_counter() - start) * 1000 / repeat
+    finally:
+        server.shutdown()
+
+    result = {"http_first_ms": round(first_ms, 2), "http_cached_per_rerun_ms": round(cached_ms, 4)}
+    if shutil.which("ollama"):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for _ in range(2):
+                subprocess.run(["ollama", "list"], capture_output=True, text=True, timeout=10)
+        result["subprocess_per_rerun_ms"] = round((time.perf_counter() - start) * 1000 / repeat, 1)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="모듈 임포트/Ollama 조회 시작 비용 측정")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="결과 JSON 저장 경로 (없으면 stdout)")
+    args = parser.parse_args(argv)
+
+    result = {
+        "benchmark": "startup",
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "imports": {module: measure_import(module, args.repeat) for module in MODULES},
+        "ollama_probe": measure_probe(args.repeat),
+    }
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"💾 결과 저장: {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""요약 스타일 전환 비용 벤치마크: 원문 요약 vs 구조화 추출 1회 + 스타일 변환
+
+가짜 Ollama 서버(입력 처리 속도 포함)로 같은 기사들을 technical → business → brief 순서로 요약하고,
+방식별로 스타일마다 걸린 시간과 LLM에 보낸 입력 토큰 수를 비교한다.
+첫 스타일에는 추출 비용이 포함되고, 이후 스타일 전환 비용이 이 기능의 대상이다.
+
+실행: python benchmarks/bench_styles.py --articles 6 --paragraphs 40
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_servers import FakeOllamaConfig, make_feed, start_fake_ollama
+from feed_parser import iter_entries
+from ollama_summarizer import OllamaSummarizer
+from rss_processor import RSSProcessor
+from summary_cache import SummaryCache
+import metrics
+
+STYLES = ("technical", "business", "brief")
+MODES = {"원문 요약": None, "추출 + LLM 변환": "llm", "추출 + 템플릿": "template"}
+
+def prompt_tokens() -> int:
+    return int(metrics.registry.counter_total("llm_prompt_tokens_total"))
+
+def run_mode(summarizer: OllamaSummarizer, articles: List[Dict], extraction_mode, workers: int) -> List[Dict]:
+    rows = []
+    for style in STYLES:
+        tokens_before = prompt_tokens()
+        start_time = time.time()
+        summaries = summarizer.summarize_multiple_articles(
+            articles, style, max_workers=workers, extraction_mode=extraction_mode
+        )
+        rows.append({
+            "style": style,
+            "seconds": round(time.time() - start_time, 2),
+            "prompt_tokens": prompt_tokens() - tokens_before,
+            "errors": sum(1 for summary in summaries if "error" in summary),
+        })
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="스타일 전환 비용 비교 (원문 요약 vs 추출 기반)")
+    parser.add_argument("--articles", type=int, default=6)
+    parser.add_argument("--paragraphs", type=int, default=40, help="기사당 본문 문단 수")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--prompt-tokens-per-sec", type=float, default=2000.0, help="가짜 서버 입력 처리 속도")
+    parser.add_argument("--tokens-per-sec", type=float, default=200.0, help="가짜 서버 출력 속도")
+    parser.add_argument("--output-tokens", type=int, default=80)
+    args = parser.parse_args(argv)
+
+    config = FakeOllamaConfig(latency=0.05, tokens_per_sec=args.tokens_per_sec, output_tokens=args.output_tokens,
+                              parallel=args.workers, prompt_tokens_per_sec=args.prompt_tokens_per_sec)
+    _, ollama_url = start_fake_ollama(config)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        processor = RSSProcessor(os.path.join(workdir, "rss_blogs.json"))
+        xml = make_feed("styles", args.articles, args.paragraphs, full_content=True)
+        articles = [processor._build_article(entry) for entry in iter_entries([xml])]
+
+        for label, extraction_mode in MODES.items():
+            # 방식마다 빈 캐시로 시작 (스타일 전환 사이에는 캐시 공유)
+            cache = SummaryCache(os.path.join(workdir, f"cache_{extraction_mode}.db"))
+            summarizer = OllamaSummarizer("llama3.2", cache=cache, base_url=ollama_url, keep_alive=None)
+            rows = run_mode(summarizer, articles, extraction_mode, args.workers)
+            switch_seconds = sum(row["seconds"] for row in rows[1:])
+            switch_tokens = sum(row["prompt_tokens"] for row in rows[1:])
+            print(f"\n[{label}] 스타일 전환 2회: {switch_seconds:.2f}초, 입력 {switch_tokens:,} 토큰")
+            for row in rows:
+                print(f"   {row['style']:<10} {row['seconds']:>6.2f}초  입력 {row['prompt_tokens']:>7,} 토큰"
+                      f"{'  오류 ' + str(row['errors']) if row['errors'] else ''}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""벤치마크용 로컬 가짜 서버: Ollama API 대역 + 고정 RSS 피드
+
+실제 모델/네트워크 없이 파이프라인 전체를 돌리기 위한 것으로,
+Ollama 대역은 첫 토큰 지연, 입력/출력 초당 토큰 수, 오류율, 동시 처리 슬롯 수를 설정할 수 있다.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+from prompt_builder import estimate_tokens
+
+# 묶음 요약 프롬프트의 기사 번호 ("[1] 제목: ...")
+_BATCH_ITEM = re.compile(r"^\[(\d+)\] 제목:", re.MULTILINE)
+
+# 피드 크기별 (엔트리 수, 엔트리당 문단 수)
+FEED_SIZES = {
+    "small": (5, 1),
+    "medium": (10, 6),
+    "large": (30, 40),
+}
+
+class FakeOllamaConfig:
+    """가짜 Ollama 서버 동작 설정 (실행 중에 바꿔도 다음 요청부터 반영)"""
+    def __init__(self, latency: float = 0.2, tokens_per_sec: float = 50.0, output_tokens: int = 40,
+                 error_rate: float = 0.0, parallel: int = 4, models: Optional[List[str]] = None,
+                 seed: Optional[int] = None, prompt_tokens_per_sec: float = 0.0):
+        self.latency = latency
+        self.tokens_per_sec = tokens_per_sec
+        # 0보다 크면 프롬프트 길이에 비례하는 입력 처리(prefill) 시간을 첫 토큰 지연에 더함
+        self.prompt_tokens_per_sec = prompt_tokens_per_sec
+        self.output_tokens = output_tokens
+        self.error_rate = error_rate
+        # OLLAMA_NUM_PARALLEL처럼 동시에 생성하는 요청 수 제한 (넘치면 대기)
+        self.parallel = parallel
+        self.models = models or ["llama3.2:latest"]
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+        self.slots = threading.Semaphore(parallel)
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """/api/tags, /api/generate만 흉내 내는 핸들러 (generate는 NDJSON 스트리밍)"""
+    config: FakeOllamaConfig = None
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/api/tags":
+            self._send_json(404, {"error": "not found"})
+            return
+        self._send_json(200, {"models": [{"name": name, "model": name} for name in self.config.models]})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.rstrip("/") != "/api/generate":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        config = self.config
+        with config.lock:
+            config.requests += 1
+            failed = config.random.random() < config.error_rate
+            if failed:
+                config.errors += 1
+
+        prompt = payload.get("prompt")
+        if not prompt:
+            # 프롬프트 없는 요청은 모델 로딩(preload)
+            self._send_json(200, {"model": payload.get("model"), "response": "", "done": True})
+            return
+        if failed:
+            self._send_json(503, {"error": "server overloaded"})
+            return
+
+        with config.slots:
+            time.sleep(config.latency)
+            if config.prompt_tokens_per_sec > 0:
+                time.sleep(estimate_tokens(prompt) / config.prompt_tokens_per_sec)
+            tokens = self._make_tokens(prompt)
+            if payload.get("stream") is False:
+                time.sleep(len(tokens) / config.tokens_per_sec)
+                self._send_json(200, {"model": payload.get("model"), "response": "".join(tokens),
+                                      "done": True, "eval_count": len(tokens)})
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            interval = 1.0 / config.tokens_per_sec
+            for token in tokens:
+                time.sleep(interval)
+                self._write_chunk({"model": payload.get("model"), "response": token, "done": False})
+            self._write_chunk({"model": payload.get("model"), "response": "", "done": True,
+                               "eval_count": len(tokens)})
+            self.wfile.write(b"0\r\n\r\n")
+
+    def _make_tokens(self, prompt: str) -> List[str]:
+        """응답 토큰 생성 (묶음 요약/구조화 추출 프롬프트면 JSON으로 응답)"""
+        count = self.config.output_tokens
+        if '"key_points"' in prompt:
+            body = json.dumps({
+                "technologies": ["Kafka", "Redis"], "problem": "문제 " * (count // 8 + 1),
+                "solution": "해결 " * (count // 8 + 1), "impact": "p99 지연 30% 감소",
+                "key_points": ["핵심 " * (count // 16 + 1)] * 3,
+            }, ensure_ascii=False)
+            return [body[i:i + 4] for i in range(0, len(body), 4)]
+        numbers = _BATCH_ITEM.findall(prompt)
+        if numbers and "JSON" in prompt:
+            body = json.dumps({number: "요약 " * max(1, count // len(numbers)) for number in numbers},
+                              ensure_ascii=False)
+            return [body[i:i + 4] for i in range(0, len(body), 4)]
+        return [f"토큰{i} " for i in range(count)]
+
+    def _write_chunk(self, data: Dict):
+        line = (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status: int, data: Dict):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_feed(name: str, entries: int, paragraphs: int, full_content: bool = False) -> bytes:
+    """엔트리 수와 본문 길이를 정한 RSS 2.0 피드 생성
+
+    full_content=True면 전체 본문 아카이브 피드처럼 description에는 첫 문단을,
+    content:encoded에는 전체 본문을 넣는다.
+    """
+    items = []
+    for i in range(entries):
+        body = "".join(
+            f"<p>{name} 글 {i}의 {p}번째 문단: 캐시 계층을 바꿔 p99 지연을 {p + i}% 줄였습니다. "
+            f"We migrated service {i} to a new <b>queue</b> &amp; measured throughput.</p>"
+            for p in range(paragraphs)
+        )
+        items.append(
+            "<item>"
+            f"<title>{escape(f'{name} 기술 글 {i}')}</title>"
+            f"<link>https://{name}.example.com/posts/{i}</link>"
+            f"<guid>{name}-{i}</guid>"
+            f"<author>dev{i}@{name}.example.com</author>"
+            f"<pubDate>{formatdate(time.time() - i * 3600)}</pubDate>"
+            + (f"<description>{escape(body[:body.find('</p>') + 4])}</description>"
+               f"<content:encoded>{escape(body)}</content:encoded>"
+               if full_content else f"<description>{escape(body)}</description>")
+            + "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel>'
+        f"<title>{escape(name)}</title><link>https://{name}.example.com</link>"
+        + "".join(items) + "</channel></rss>"
+    ).encode("utf-8")
+
+def make_fixture_feeds(count_per_size: int = 2) -> Dict[str, bytes]:
+    """크기별 고정 피드 묶음 ({경로 이름: XML})"""
+    feeds = {}
+    for size, (entries, paragraphs) in FEED_SIZES.items():
+        for i in range(count_per_size):
+            feeds[f"{size}{i}"] = make_feed(f"{size}{i}", entries, paragraphs)
+    return feeds
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """/feeds/<이름>.xml 경로로 고정 피드를 제공하는 핸들러"""
+    feeds: Dict[str, bytes] = {}
+
+    def do_GET(self):
+        name = self.path.rsplit("/", 1)[-1].removesuffix(".xml")
+        body = self.feeds.get(name)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class ConditionalFeedHandler(FeedHandler):
+    """ETag/Last-Modified를 보내고 If-None-Match/If-Modified-Since가 맞으면 304로 답하는 피드 핸들러
+
+    validators=False면 검증자 없이 항상 전체 본문을 보낸다 (본문 해시 비교 확인용).
+    응답 코드별 횟수와 보낸 본문 바이트 수를 stats에 기록한다.
+    피드 내용이 바뀌면(feeds 값 교체) ETag와 Last-Modified도 함께 바뀐다.
+    """
+    validators = True
+    stats: Counter = Counter()
+    # 피드 이름 → (ETag, 마지막 변경 시각)
+    versions: Dict[str, Tuple[str, float]] = {}
+
+    def do_GET(self):
+        name = self.path.rsplit("/", 1)[-1].removesuffix(".xml")
+        body = self.feeds.get(name)
+        if body is None:
+            self._respond(404)
+            return
+        if not self.validators:
+            self._respond(200, body)
+            return
+
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if self.versions.get(name, ("",))[0] != etag:
+            # Last-Modified는 초 단위라 이전 버전과 같은 초에 바뀌어도 구분되도록 1초 뒤로 둠
+            previous = self.versions.get(name, ("", 0.0))[1]
+            self.versions[name] = (etag, max(float(int(time.time())), previous + 1))
+        modified = self.versions[name][1]
+        headers = {"ETag": etag, "Last-Modified": formatdate(modified, usegmt=True)}
+
+        if_none_match = self.headers.get("If-None-Match")
+        if_modified_since = self.headers.get("If-Modified-Since")
+        # If-None-Match가 있으면 If-Modified-Since는 보지 않음 (RFC 9110)
+        if if_none_match is not None:
+            not_modified = etag in (tag.strip() for tag in if_none_match.split(","))
+        elif if_modified_since is not None:
+            try:
+                not_modified = modified <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                not_modified = False
+        else:
+            not_modified = False
+        if not_modified:
+            self._respond(304, headers=headers)
+        else:
+            self._respond(200, body, headers)
+
+    def _respond(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+        self.stats[status] += 1
+        self.stats["bytes"] += len(body)
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if status != 304:
+            self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def start_server(handler_class) -> Tuple[ThreadingHTTPServer, str]:
+    """임의 포트에서 백그라운드로 서버를 띄우고 (서버, 기본 URL) 반환"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def start_fake_ollama(config: FakeOllamaConfig) -> Tuple[ThreadingHTTPServer, str]:
+    handler = type("ConfiguredOllamaHandler", (FakeOllamaHandler,), {"config": config})
+    return start_server(handler)
+
+def start_feed_server(feeds: Dict[str, bytes]) -> Tuple[ThreadingHTTPServer, Dict[str, str]]:
+    """피드 서버를 띄우고 (서버, {피드 이름: URL}) 반환"""
+    handler = type("ConfiguredFeedHandler", (FeedHandler,), {"feeds": feeds})
+    server, base_url = start_server(handler)
+    return server, {name: f"{base_url}/feeds/{name}.xml" for name in feeds}
+
+def start_conditional_feed_server(feeds: Dict[str, bytes],
+                                  validators: bool = True) -> Tuple[ThreadingHTTPServer, Dict[str, str]]:
+    """조건부 GET을 지원하는 피드 서버를 띄우고 (서버, {피드 이름: URL}) 반환
+
+    응답 통계는 server.RequestHandlerClass.stats, 피드 내용은 .feeds로 실행 중에 바꿀 수 있다.
+    """
+    handler = type("ConfiguredConditionalFeedHandler", (ConditionalFeedHandler,), {
+        "feeds": feeds, "validators": validators, "stats": Counter(), "versions": {},
+    })
+    server, base_url = start_server(handler)
+    return server, {name: f"{base_url}/feeds/{name}.xml" for name in feeds}
@@ -0,0 +1,131 @@
+import contextvars
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+def propagate_context(fn: Callable) -> Callable:
+    """지금 스레드의 contextvars(LLM 작업 우선순위/소유자 등)를 작업 스레드에서도 보이게 감싼 함수
+
+    스레드 풀의 작업은 제출한 스레드의 컨텍스트를 물려받지 않으므로 executor에 넘기기 전에 감싼다.
+    호출마다 복사본에서 실행해 여러 스레드가 동시에 호출해도 된다.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+def run_bounded(tasks: Iterable[Tuple[str, Callable[[], Any]]], max_workers: int = 8,
+                per_key: int = 2) -> Iterator[Tuple[int, Any, float]]:
+    """(키, 함수) 작업들을 전체/키별 동시 실행 수를 제한하며 실행
+
+    키는 보통 호스트명이다. 완료되는 순서대로 (입력 인덱스, 결과, 소요 시간)을
+    yield 하며, 함수가 예외를 던지면 결과 자리에 예외 객체가 들어간다.
+    한 키에 작업이 몰려도 다른 키의 작업이 워커 슬롯을 기다리지 않도록
+    여유가 있는 키의 작업만 제출한다.
+    """
+    pending = defaultdict(deque)
+    key_order = deque()
+    for index, (key, fn) in enumerate(tasks):
+        if not pending[key]:
+            key_order.append(key)
+        pending[key].append((index, fn))
+
+    running = {}
+    active_per_key = defaultdict(int)
+
+    def timed_call(fn):
+        start_time = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            result = e
+        return result, time.monotonic() - start_time
+
+    def submit_ready(executor):
+        # 키를 돌아가며 하나씩 제출해 특정 키가 앞자리를 독점하지 않게 함
+        progressed = True
+        while progressed and len(running) < max_workers:
+            progressed = False
+            for _ in range(len(key_order)):
+                if len(running) >= max_workers:
+                    break
+                key = key_order[0]
+                key_order.rotate(-1)
+                if pending[key] and active_per_key[key] < per_key:
+                    index, fn = pending[key].popleft()
+                    future = executor.submit(timed_call, fn)
+                    running[future] = (index, key)
+                    active_per_key[key] += 1
+                    progressed = True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        submit_ready(executor)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, key = running.pop(future)
+                active_per_key[key] -= 1
+                result, elapsed = future.result()
+                yield index, result, elapsed
+            submit_ready(executor)
+
+class AdaptiveLimiter:
+    """관측된 지연/오류에 따라 동시 실행 수를 조절하는 AIMD 리미터
+
+    - 지연이 기준치(가장 빨랐던 평균 지연 × tolerance) 안에 머물면 한 칸씩 늘리고
+    - 지연이 늘어나면 한 칸 줄이며
+    - 타임아웃/503 같은 과부하 신호가 오면 절반으로 줄인다.
+    """
+    def __init__(self, max_limit: int, initial_limit: int = 1, min_limit: int = 1,
+                 latency_tolerance: float = 1.5, smoothing: float = 0.3):
+        self.max_limit = max(max_limit, min_limit)
+        self.min_limit = min_limit
+        self.limit = max(min(initial_limit, self.max_limit), min_limit)
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.baseline_latency = None
+        self.smoothed_latency = None
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency: Optional[float] = None, overloaded: bool = False):
+        """작업 종료 보고 (latency가 None이면 한도 조절 없이 슬롯만 반환)"""
+        with self._condition:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(self.min_limit, self.limit // 2)
+                self._successes = 0
+            elif latency is not None:
+                self._observe(latency)
+            self._condition.notify_all()
+
+    def _observe(self, latency: float):
+        if self.smoothed_latency is None:
+            self.smoothed_latency = latency
+        else:
+            self.smoothed_latency += self.smoothing * (latency - self.smoothed_latency)
+        if self.baseline_latency is None or self.smoothed_latency < self.baseline_latency:
+            self.baseline_latency = self.smoothed_latency
+
+        if self.smoothed_latency > self.baseline_latency * self.latency_tolerance:
+            # 서버가 밀리기 시작함 → 한 칸 줄이고 기준치도 현재 쪽으로 조금 끌어올림
+            self.limit = max(self.min_limit, self.limit - 1)
+            self.baseline_latency += self.smoothing * (self.smoothed_latency - self.baseline_latency)
+            self._successes = 0
+            return
+
+        # 현재 한도만큼 연속으로 안정적이면 한 칸 늘림
+        self._successes += 1
+        if self._successes >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1)
+            self._successes = 0
@@ -0,0 +1,215 @@
+import hashlib
+import re
+from array import array
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 추적용 쿼리 파라미터 (utm_* 는 접두사로 처리)
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "source", "igshid", "yclid"}
+
+_WORD_PATTERN = re.compile(r"\w+")
+# 바이트 값 → 해당 비트 값(0/1) 변환표 (비트 0~7)
+_BIT_TABLES = [bytes(value >> bit & 1 for value in range(256)) for bit in range(8)]
+
+def canonicalize_url(url: str) -> str:
+    """추적 파라미터/프래그먼트/끝 슬래시/www/기본 포트를 제거한 정규화 URL"""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "http"
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and not (scheme == "http" and parts.port == 80 or scheme == "https" and parts.port == 443):
+        host = f"{host}:{parts.port}"
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/")
+    # http/https 차이는 같은 글로 취급
+    return urlunsplit(("https" if scheme in ("http", "https") else scheme, host, path, urlencode(sorted(query)), ""))
+
+def simhash(text: str, shingle_size: int = 2, max_words: int = 1000) -> Optional[int]:
+    """단어 shingle 기반 64비트 SimHash (단어가 너무 적으면 None)
+
+    비트별 합산을 해시마다 파이썬 반복문으로 하지 않고, 모든 해시를 한 번에 바이트열로
+    바꾼 뒤 자리별 바이트 열을 비트 변환표로 translate 해서 세는 C 레벨 연산으로 처리한다.
+    긴 본문은 앞쪽 max_words 단어만 사용한다.
+    """
+    words = _WORD_PATTERN.findall(text.lower())[:max_words]
+    if len(words) < shingle_size * 4:
+        return None
+
+    shingles = set(zip(*(words[i:] for i in range(shingle_size))))
+    # 지문은 프로세스 메모리에만 두므로 (PYTHONHASHSEED로 달라지는) 내장 hash를 써도 됨
+    raw = array("q", map(hash, shingles)).tobytes()
+    half = len(shingles) / 2
+
+    fingerprint = 0
+    for position in range(8):
+        column = raw[position::8]
+        for bit, table in enumerate(_BIT_TABLES):
+            if column.translate(table).count(1) > half:
+                fingerprint |= 1 << (position * 8 + bit)
+    return fingerprint
+
+class DuplicateIndex:
+    """정규화 URL과 SimHash 지문으로 중복/유사 중복 기사를 찾는 메모리 인덱스
+
+    지문은 array('Q')에 8바이트씩 저장하고, 64비트를 8비트 8개 밴드로 나눈
+    해시 테이블로 후보를 찾는다. 해밍 거리가 밴드 수보다 작으면 적어도 한 밴드는
+    반드시 일치하므로(비둘기집 원리) 전체를 비교하지 않고도 빠짐없이 찾을 수 있다.
+    """
+    BANDS = 8
+    BAND_BITS = 8
+    BAND_MASK = (1 << BAND_BITS) - 1
+
+    def __init__(self, max_distance: int = 7):
+        if max_distance >= self.BANDS:
+            raise ValueError(f"max_distance는 {self.BANDS - 1} 이하여야 합니다")
+        self.max_distance = max_distance
+        self._fingerprints = array("Q")
+        self._keys: List[str] = []
+        self._bands = [defaultdict(list) for _ in range(self.BANDS)]
+        self._by_url: Dict[str, str] = {}
+        self._by_text: Dict[bytes, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_url)
+
+    def check_and_add(self, key: str, url: str, text: str) -> Optional[str]:
+        """이미 본 글의 중복이면 원본 키를 반환하고, 처음 보는 글이면 등록 후 None 반환"""
+        canonical_url = canonicalize_url(url)
+        if canonical_url and canonical_url in self._by_url:
+            return self._by_url[canonical_url]
+
+        normalized = " ".join(text.lower().split())
+        text_digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest() if normalized else None
+        if text_digest is not None and text_digest in self._by_text:
+            original = self._by_text[text_digest]
+        else:
+            fingerprint = simhash(normalized)
+            original = self._find_similar(fingerprint) if fingerprint is not None else None
+            if original is None and fingerprint is not None:
+                self._add_fingerprint(key, fingerprint)
+
+        if original is None and text_digest is not None:
+            self._by_text[text_digest] = key
+        if canonical_url:
+            self._by_url[canonical_url] = original or key
+        return original
+
+    def _find_similar(self, fingerprint: int) -> Optional[str]:
+        checked = set()
+        for band_index, band in enumerate(self._bands):
+            band_value = (fingerprint >> (band_index * self.BAND_BITS)) & self.BAND_MASK
+            for position in band.get(band_value, ()):
+                if position in checked:
+                    continue
+                checked.add(position)
+                if bin(self._fingerprints[position] ^ fingerprint).count("1") <= self.max_distance:
+                    return self._keys[position]
+        return None
+
+    def _add_fingerprint(self, key: str, fingerprint: int):
+        position = len(self._fingerprints)
+        self._fingerprints.append(fingerprint)
+        self._keys.append(key)
+        for band_index, band in enumerate(self._bands):
+            band[(fingerprint >> (band_index * self.BAND_BITS)) & self.BAND_MASK].append(position)
+
+def mark_duplicates(articles: List[Dict], index: Optional[DuplicateIndex] = None) -> List[Dict]:
+    """기사마다 canonical_link를 붙이고, 앞서 본 글의 중복이면 duplicate_of(원본 링크)를 붙임
+
+    index를 넘기면 여러 피드/호출에 걸쳐 중복을 찾는다.
+    """
+    index = index if index is not None else DuplicateIndex()
+    marked = []
+    for article in articles:
+        if "error" in article:
+            marked.append(article)
+            continue
+        article = article.copy()
+        article["canonical_link"] = canonicalize_url(article.get("link", ""))
+        text = article.get("content") or article.get("summary", "")
+        original = index.check_and_add(article.get("link", ""), article.get("link", ""), f"{article.get('title', '')} {text}")
+        if original is not None and original != article.get("link", ""):
+            article["duplicate_of"] = original
+        marked.append(article)
+    return marked
+
+def copy_summary(summary: Dict, article: Dict, original_link: str) -> Dict:
+    """대표 기사의 요약을 중복 기사 결과로 복사 (제목/링크 등은 중복 기사 것 사용)"""
+    if "error" in summary:
+        return {"title": article.get("title", "알 수 없는 제목"), "error": summary["error"]}
+    copied = dict(summary)
+    copied.update({
+        "title": article.get("title", summary.get("title", "")),
+        "link": article.get("link", ""),
+        "author": article.get("author", summary.get("author", "")),
+        "duplicate_of": original_link
+    })
+    return copied
+
+def summarize_deduplicated(articles: List[Dict],
+                           summarize_batch: Callable[[List[Dict], Optional[Callable[[int, Dict], None]]], List[Dict]],
+                           on_complete: Optional[Callable[[int, Dict], None]] = None,
+                           lookup_summary: Optional[Callable[[str], Optional[Dict]]] = None) -> List[Dict]:
+    """중복 기사는 대표 기사 하나만 요약하고 결과를 나눠 쓰는 래퍼 (입력 순서 유지)
+
+    같은 정규화 URL이거나 mark_duplicates가 붙인 duplicate_of가 배치 안의 다른 기사를
+    가리키면 그 기사의 요약을 복사한다. 원본이 배치 밖에 있으면 lookup_summary로
+    이전 요약을 찾아 쓰고, 없으면 일반 기사처럼 요약한다.
+    """
+    results: List[Optional[Dict]] = [None] * len(articles)
+    index_by_link: Dict[str, int] = {}
+    representative_of: Dict[int, int] = {}
+    unique_indexes: List[int] = []
+
+    for index, article in enumerate(articles):
+        if "error" in article:
+            unique_indexes.append(index)
+            continue
+        link = article.get("link", "")
+        canonical = article.get("canonical_link") or canonicalize_url(link)
+        original = article.get("duplicate_of")
+        target = index_by_link.get(canonical)
+        if target is None and original:
+            target = index_by_link.get(original, index_by_link.get(canonicalize_url(original)))
+
+        if target is not None:
+            representative_of[index] = target
+            continue
+
+        if original and lookup_summary is not None:
+            previous = lookup_summary(original)
+            if previous is not None:
+                results[index] = copy_summary(previous, article, original)
+                if on_complete is not None:
+                    on_complete(index, results[index])
+                continue
+
+        unique_indexes.append(index)
+        for key in (link, canonical):
+            if key:
+                index_by_link.setdefault(key, index)
+
+    if representative_of:
+        print(f"🔁 중복 기사 {len(representative_of)}개는 대표 기사 요약을 재사용합니다")
+
+    def deliver(batch_index: int, summary: Dict):
+        if on_complete is not None:
+            on_complete(unique_indexes[batch_index], summary)
+
+    batch_results = summarize_batch([articles[i] for i in unique_indexes], deliver if on_complete else None)
+    for batch_index, summary in enumerate(batch_results):
+        results[unique_indexes[batch_index]] = summary
+
+    for index, target in representative_of.items():
+        results[index] = copy_summary(results[target], articles[index], articles[target].get("link", ""))
+        if on_complete is not None:
+            on_complete(index, results[index])
+    return results
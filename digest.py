@@ -0,0 +1,103 @@
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from prompt_builder import PromptBuilder, estimate_tokens
+from summary_cache import SummaryCache
+from concurrency import propagate_context
+import metrics
+
+# 중간 단계: 요약 묶음 하나를 중간 다이제스트 하나로 합치는 프롬프트
+GROUP_DIGEST_PROMPT = """아래는 여러 기술 블로그 글의 요약 묶음입니다.
+각 글의 핵심 기술, 해결한 문제, 해결 방법, 수치를 빠뜨리지 말고
+하나의 중간 요약(5-8개 항목)으로 합쳐주세요. 글 제목은 괄호로 남겨주세요.
+
+요약들:
+"""
+
+# 묶음 경계를 정하는 평균 묶음 크기 (실제 크기는 토큰 예산과 내용 해시에 따라 달라짐)
+DEFAULT_FAN_IN = 4
+SEPARATOR = "\n\n"
+
+def tree_digest(items: List[str], root_instruction: str, builder: PromptBuilder,
+                generate: Callable[[str], str], cache: Optional[SummaryCache] = None,
+                cache_parts: Sequence[str] = (), fan_in: int = DEFAULT_FAN_IN,
+                max_workers: int = 4) -> Tuple[str, Dict]:
+    """요약이 몇 개든 전부 반영하는 계층형 다이제스트 (결과, 예산/통계 정보) 반환
+
+    한 프롬프트에 다 들어가면 바로 최종 다이제스트를 만들고, 넘치면 요약들을 예산에 맞는
+    묶음으로 나눠 묶음별 중간 다이제스트를 병렬로 만든 뒤 그 결과로 같은 과정을 반복한다.
+    묶음 경계는 입력 순서가 아니라 각 항목의 내용 해시로 정해지므로, 기사 하나가 추가되면
+    그 기사가 속한 묶음과 그 위 단계만 바뀌고 나머지 중간 다이제스트는 캐시에서 재사용된다.
+    """
+    stats = {"levels": 0, "group_calls": 0, "cached_calls": 0}
+    stats_lock = threading.Lock()
+
+    def cached_generate(kind: str, prompt: str) -> str:
+        cache_key = None
+        if cache is not None:
+            cache_key = SummaryCache.make_key("digest", kind, *cache_parts, prompt)
+            cached_digest = cache.get(cache_key)
+            if cached_digest is not None:
+                with stats_lock:
+                    stats["cached_calls"] += 1
+                return cached_digest
+        result = generate(prompt)
+        if cache_key is not None:
+            cache.set(cache_key, result)
+        return result
+
+    # 입력 순서와 무관하게 같은 기사 집합이면 같은 트리가 되도록 내용 해시 순으로 정렬
+    level_items = sorted(items, key=_content_hash)
+    while True:
+        selected, budget = builder.fit_items(root_instruction, level_items, SEPARATOR)
+        if len(selected) == len(level_items) or len(level_items) == 1:
+            if not selected:
+                # 항목 하나가 예산보다 크면 잘라서 포함
+                selected = [builder.fit_text(level_items[0], budget["content_budget_tokens"])[0]]
+            digest = cached_generate("root", root_instruction + SEPARATOR.join(selected))
+            return digest, {**budget, **stats, "items": len(items)}
+
+        groups = _group_items(level_items, builder, fan_in)
+        stats["levels"] += 1
+        print(f"🌲 다이제스트 {stats['levels']}단계: {len(level_items)}개 → {len(groups)}개 묶음")
+
+        def reduce_group(group: List[str]) -> str:
+            if len(group) == 1:
+                # 짝이 없는 마지막 항목은 그대로 다음 단계로
+                return group[0]
+            with metrics.timer("pipeline_stage_seconds", stage="digest_group"):
+                return cached_generate("group", GROUP_DIGEST_PROMPT + SEPARATOR.join(group))
+
+        stats["group_calls"] += sum(1 for group in groups if len(group) > 1)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(groups)))) as executor:
+            level_items = list(executor.map(propagate_context(reduce_group), groups))
+
+def _group_items(items: List[str], builder: PromptBuilder, fan_in: int) -> List[List[str]]:
+    """항목들을 중간 다이제스트 프롬프트 예산 안의 묶음으로 나눔
+
+    어떤 두 항목이든 한 묶음에 들어가도록 항목을 예산 절반으로 잘라 두므로, 묶음은 마지막 것을
+    빼면 항상 2개 이상이고 단계마다 항목 수가 절반 이하로 줄어든다.
+    """
+    budget = builder.input_budget - estimate_tokens(GROUP_DIGEST_PROMPT)
+    item_budget = max(1, budget // 2 - estimate_tokens(SEPARATOR) - 1)
+    fitted = [builder.fit_text(item, item_budget)[0] for item in items]
+
+    groups, current, used = [], [], 0
+    for item in fitted:
+        item_tokens = estimate_tokens(item + SEPARATOR)
+        if current and used + item_tokens > budget:
+            groups.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += item_tokens
+        # 내용 해시로 경계를 정해 앞쪽 항목이 바뀌어도 뒤쪽 묶음 구성이 밀리지 않게 함
+        if len(current) >= 2 and (_content_hash(item) % fan_in == 0 or len(current) >= 2 * fan_in):
+            groups.append(current)
+            current, used = [], 0
+    if current:
+        groups.append(current)
+    return groups
+
+def _content_hash(text: str) -> int:
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
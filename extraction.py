@@ -0,0 +1,113 @@
+import json
+import re
+from typing import Dict, List, Optional
+
+# 추출 형식을 바꾸면 올려서 이전 추출 캐시를 무효화
+EXTRACTION_VERSION = "1"
+
+# 기사당 한 번만 실행하는 구조화 추출 프롬프트 (스타일과 무관)
+EXTRACTION_PROMPT = """
+다음 기술 블로그 글에서 핵심 정보를 추출해주세요.
+다른 설명 없이 아래 키를 가진 JSON 객체 하나로만 한국어로 답하세요.
+- "technologies": 사용된 기술/도구 이름 목록
+- "problem": 해결하려던 문제 (1-2문장)
+- "solution": 핵심 해결 방법 (1-3문장)
+- "impact": 성능/비용/사용자 경험 등 결과와 수치 (1-2문장, 없으면 빈 문자열)
+- "key_points": 중요한 인사이트 3-5개 목록
+"""
+
+# 추출 결과만 보고 스타일별 요약을 쓰는 짧은 프롬프트 (원문은 다시 읽지 않음)
+STYLE_PROMPTS = {
+    "technical": "아래 기술 블로그 글의 추출 정보로 기술적 관점 요약을 작성해주세요. "
+                 "사용된 기술/도구, 해결한 문제, 핵심 솔루션, 중요한 인사이트 순으로 항목을 나눠 쓰세요.",
+    "business": "아래 기술 블로그 글의 추출 정보로 비즈니스 관점 요약을 작성해주세요. "
+                "비즈니스 임팩트, 성능 개선, 비용 절감, 사용자 경험 개선 위주로 쓰고 정보가 없는 항목은 생략하세요.",
+    "brief": "아래 기술 블로그 글의 추출 정보로 3-4줄 요약을 작성해주세요. "
+             "핵심 내용만 쓰고 기술 용어는 간단히 설명하세요.",
+}
+
+EXTRACTION_FIELDS = ("technologies", "problem", "solution", "impact", "key_points")
+_LIST_FIELDS = ("technologies", "key_points")
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.MULTILINE)
+
+def parse_extraction(text: str) -> Optional[Dict]:
+    """추출 응답에서 JSON 객체를 읽어 필드 형식을 맞춤 (문제/해결/핵심 내용이 모두 없으면 None)
+
+    코드 펜스와 앞뒤 잡담을 허용하고, 목록 필드가 문자열이면 줄 단위로 나누며 목록도 문자열도 아니면 빈 목록으로 둔다.
+    """
+    cleaned = _CODE_FENCE.sub("", text or "").strip()
+    start, end = cleaned.find("{"), cleaned.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        parsed = json.loads(cleaned[start:end + 1], strict=False)
+    except ValueError:
+        return None
+    if not isinstance(parsed, dict):
+        return None
+
+    extraction = {}
+    for field in EXTRACTION_FIELDS:
+        value = parsed.get(field)
+        if field in _LIST_FIELDS:
+            if isinstance(value, str):
+                value = [line.strip(" -•*") for line in value.splitlines()]
+            elif not isinstance(value, list):
+                # 숫자/불리언/객체 등 목록으로 읽을 수 없는 값은 비어 있는 것으로 봄
+                value = []
+            extraction[field] = [str(item).strip() for item in value if str(item).strip()]
+        else:
+            extraction[field] = str(value).strip() if value else ""
+
+    if not (extraction["problem"] or extraction["solution"] or extraction["key_points"]):
+        return None
+    return extraction
+
+def format_extraction(extraction: Dict) -> str:
+    """스타일 프롬프트에 넣을 추출 정보 블록"""
+    lines = []
+    if extraction["technologies"]:
+        lines.append(f"기술/도구: {', '.join(extraction['technologies'])}")
+    for field, label in (("problem", "문제"), ("solution", "해결 방법"), ("impact", "결과")):
+        if extraction[field]:
+            lines.append(f"{label}: {extraction[field]}")
+    if extraction["key_points"]:
+        lines.append("핵심 내용:")
+        lines.extend(f"- {point}" for point in extraction["key_points"])
+    return "\n".join(lines)
+
+def build_style_prompt(summary_style: str, title: str, extraction: Dict) -> str:
+    instruction = STYLE_PROMPTS.get(summary_style, STYLE_PROMPTS["technical"])
+    return f"{instruction}\n\n제목: {title}\n\n추출 정보:\n{format_extraction(extraction)}"
+
+def render_template(summary_style: str, extraction: Dict) -> str:
+    """LLM 호출 없이 추출 정보를 스타일별 마크다운으로 배치"""
+    technologies = ", ".join(extraction["technologies"])
+    points: List[str] = extraction["key_points"]
+
+    if summary_style == "brief":
+        sentences = [extraction["problem"], extraction["solution"], extraction["impact"]]
+        lines = [sentence for sentence in sentences if sentence]
+        if technologies:
+            lines.append(f"사용 기술: {technologies}")
+        return "\n".join(lines[:4])
+
+    if summary_style == "business":
+        sections = [
+            ("비즈니스 임팩트", extraction["impact"]),
+            ("해결한 문제", extraction["problem"]),
+            ("개선 방법", extraction["solution"]),
+        ]
+    else:
+        sections = [
+            ("사용된 기술/도구", technologies),
+            ("해결한 문제", extraction["problem"]),
+            ("핵심 솔루션", extraction["solution"]),
+            ("결과", extraction["impact"]),
+        ]
+    lines = [f"- **{label}**: {value}" for label, value in sections if value]
+    if points:
+        lines.append("- **중요한 인사이트**")
+        lines.extend(f"  - {point}" for point in points)
+    return "\n".join(lines)
@@ -0,0 +1,175 @@
+import time
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from typing import Iterable, Iterator, List, Optional
+import metrics
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+RSS1_NS = "{http://purl.org/rss/1.0/}"
+RDF_NS = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}"
+CONTENT_NS = "{http://purl.org/rss/1.0/modules/content/}"
+DC_NS = "{http://purl.org/dc/elements/1.1/}"
+
+# 엔트리로 보는 태그와 지원하는 문서 루트 (RSS 2.0, RSS 1.0(RDF), Atom 1.0)
+ENTRY_TAGS = {"item", f"{RSS1_NS}item", f"{ATOM_NS}entry"}
+ROOT_TAGS = {"rss", f"{RDF_NS}RDF", f"{ATOM_NS}feed"}
+
+# Atom type 속성을 feedparser와 같은 MIME 타입으로
+ATOM_CONTENT_TYPES = {"text": "text/plain", "html": "text/html", "xhtml": "application/xhtml+xml"}
+
+# feedparser 엔트리와 같은 속성 이름 (content.type/value, tag.term)
+ContentItem = namedtuple("ContentItem", "type value")
+Tag = namedtuple("Tag", "term")
+
+class FeedParseError(Exception):
+    """스트리밍 파서로 읽을 수 없는 피드 (잘못된 XML, 지원하지 않는 형식/인코딩)"""
+
+class FeedEntry:
+    """feedparser 엔트리와 같은 속성으로 접근하는 가벼운 엔트리
+
+    feedparser처럼 피드에 없던 필드는 속성 자체가 없어서 hasattr로 구분할 수 있다.
+    """
+    __slots__ = ("title", "link", "id", "published", "updated", "author",
+                 "summary", "description", "content", "tags")
+
+    def __repr__(self) -> str:
+        return f"FeedEntry(title={getattr(self, 'title', '')!r}, link={getattr(self, 'link', '')!r})"
+
+def iter_entries(chunks: Iterable[bytes], max_entries: Optional[int] = None) -> Iterator[FeedEntry]:
+    """XML 바이트 청크를 받는 대로 파싱해 엔트리를 하나씩 yield
+
+    max_entries개를 내보내면 나머지 문서는 읽지도 파싱하지도 않는다. 처리한 엔트리 요소는 바로
+    비워서 수백 개짜리 전체 본문 아카이브도 메모리에 문서 전체를 올리지 않는다.
+    XML 오류나 지원하지 않는 루트/인코딩이면 FeedParseError를 던진다 (호출하는 쪽에서 feedparser로 대체).
+    """
+    if max_entries is not None and max_entries <= 0:
+        return
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root_checked = False
+    count = 0
+    parse_time = 0.0
+    try:
+        for chunk in chunks:
+            start_time = time.perf_counter()
+            try:
+                parser.feed(chunk)
+                events = list(parser.read_events())
+            except (ET.ParseError, ValueError, LookupError) as e:
+                # expat이 모르는 인코딩(EUC-KR 등)은 ValueError/LookupError로 나옴
+                raise FeedParseError(str(e)) from e
+            parse_time += time.perf_counter() - start_time
+
+            for event, element in events:
+                if event == "start":
+                    if not root_checked:
+                        if element.tag not in ROOT_TAGS:
+                            raise FeedParseError(f"unsupported feed root: {element.tag}")
+                        root_checked = True
+                    continue
+                if element.tag not in ENTRY_TAGS:
+                    continue
+
+                start_time = time.perf_counter()
+                entry = _atom_entry(element) if element.tag == f"{ATOM_NS}entry" else _rss_entry(element)
+                element.clear()
+                parse_time += time.perf_counter() - start_time
+                yield entry
+                count += 1
+                if max_entries is not None and count >= max_entries:
+                    return
+
+        try:
+            parser.close()
+        except ET.ParseError as e:
+            # 엔트리를 다 읽은 뒤 문서 끝이 잘린 경우는 읽은 것까지 사용
+            if not count:
+                raise FeedParseError(str(e)) from e
+        if not root_checked:
+            raise FeedParseError("empty feed document")
+    finally:
+        metrics.observe("pipeline_stage_seconds", parse_time, stage="feed_parse")
+
+def _rss_entry(element: ET.Element) -> FeedEntry:
+    entry = FeedEntry()
+    content = []
+    tags = []
+    for child in element:
+        tag = child.tag
+        if tag in ("title", f"{RSS1_NS}title"):
+            entry.title = _text(child)
+        elif tag in ("link", f"{RSS1_NS}link"):
+            entry.link = _text(child).strip()
+        elif tag == "guid":
+            entry.id = _text(child).strip()
+        elif tag == "pubDate":
+            entry.published = _text(child).strip()
+        elif tag in (f"{DC_NS}date", f"{ATOM_NS}updated"):
+            entry.updated = _text(child).strip()
+        elif tag == "author" or (tag == f"{DC_NS}creator" and not hasattr(entry, "author")):
+            entry.author = _text(child).strip()
+        elif tag in ("description", f"{RSS1_NS}description"):
+            # feedparser처럼 description을 summary로도 제공
+            entry.summary = entry.description = _text(child)
+        elif tag == f"{CONTENT_NS}encoded":
+            content.append(ContentItem("text/html", _text(child)))
+        elif tag in ("category", f"{DC_NS}subject"):
+            tags.append(Tag(_text(child).strip()))
+
+    if not hasattr(entry, "id"):
+        about = element.get(f"{RDF_NS}about")
+        if about:
+            entry.id = about
+    # feedparser처럼 updated가 없으면 발행일을 그대로 사용
+    if not hasattr(entry, "updated") and hasattr(entry, "published"):
+        entry.updated = entry.published
+    # 링크가 없고 guid가 URL이면 feedparser와 같이 guid를 링크로 사용
+    if not hasattr(entry, "link") and getattr(entry, "id", "").startswith(("http://", "https://")):
+        entry.link = entry.id
+    if content:
+        entry.content = content
+    if tags:
+        entry.tags = tags
+    return entry
+
+def _atom_entry(element: ET.Element) -> FeedEntry:
+    entry = FeedEntry()
+    content = []
+    tags = []
+    for child in element:
+        tag = child.tag
+        if tag == f"{ATOM_NS}title":
+            entry.title = _text(child)
+        elif tag == f"{ATOM_NS}link":
+            # rel이 없거나 alternate인 첫 링크가 글 주소
+            if child.get("rel", "alternate") == "alternate" and not hasattr(entry, "link"):
+                entry.link = child.get("href", "").strip()
+        elif tag == f"{ATOM_NS}id":
+            entry.id = _text(child).strip()
+        elif tag == f"{ATOM_NS}published":
+            entry.published = _text(child).strip()
+        elif tag == f"{ATOM_NS}updated":
+            entry.updated = _text(child).strip()
+        elif tag == f"{ATOM_NS}author":
+            name = child.find(f"{ATOM_NS}name")
+            entry.author = _text(name).strip() if name is not None else ""
+        elif tag == f"{ATOM_NS}summary":
+            entry.summary = entry.description = _text(child)
+        elif tag == f"{ATOM_NS}content":
+            content_type = ATOM_CONTENT_TYPES.get(child.get("type", "text"), child.get("type"))
+            content.append(ContentItem(content_type, _text(child)))
+        elif tag == f"{ATOM_NS}category":
+            tags.append(Tag(child.get("term", "")))
+
+    if content:
+        entry.content = content
+    if tags:
+        entry.tags = tags
+    return entry
+
+def _text(element: ET.Element) -> str:
+    """요소의 텍스트 (Atom xhtml처럼 자식 태그가 있으면 마크업째 이어 붙임)"""
+    if len(element) == 0:
+        return element.text or ""
+    parts: List[str] = [element.text or ""]
+    parts.extend(ET.tostring(child, encoding="unicode") for child in element)
+    return "".join(parts)
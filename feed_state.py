@@ -0,0 +1,51 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+class FeedStateStore:
+    """피드별 ETag / Last-Modified / 마지막으로 본 엔트리 ID를 저장하는 JSON 저장소"""
+    # 피드당 기억할 엔트리 ID 최대 개수
+    MAX_ENTRY_IDS = 500
+
+    def __init__(self, state_file: str = "rss_feed_state.json"):
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self._states = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save(self):
+        # 저장 도중 중단되어도 기존 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self._states, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+    def get(self, rss_url: str) -> Dict:
+        with self._lock:
+            return dict(self._states.get(rss_url, {}))
+
+    def update(self, rss_url: str, etag: Optional[str] = None, modified: Optional[str] = None,
+               content_hash: Optional[str] = None, entry_ids: Optional[List[str]] = None):
+        """피드 상태 갱신 후 파일에 저장"""
+        with self._lock:
+            state = self._states.setdefault(rss_url, {})
+            state["etag"] = etag
+            state["modified"] = modified
+            if content_hash is not None:
+                state["content_hash"] = content_hash
+            if entry_ids is not None:
+                seen = list(dict.fromkeys(entry_ids + state.get("entry_ids", [])))
+                state["entry_ids"] = seen[:self.MAX_ENTRY_IDS]
+            self._save()
+
+    def remove(self, rss_url: str):
+        with self._lock:
+            if self._states.pop(rss_url, None) is not None:
+                self._save()
@@ -0,0 +1,51 @@
+import html
+import re
+from typing import Iterable
+
+# 내용째 버려야 하는 블록 (스크립트, 스타일, 주석)
+_INVISIBLE_PATTERN = re.compile(
+    r"<(script|style)\b[^>]*>.*?</\1\s*>|<!--.*?-->",
+    re.IGNORECASE | re.DOTALL
+)
+_TAG_PATTERN = re.compile(r"<[^>]*>")
+# 발췌 끝에 붙는 생략 표시 (…, ..., [...], [&hellip;]가 디코딩된 […], (…))
+_TRAILING_ELLIPSIS = re.compile(r"(?:\[\s*(?:\.{3}|…)\s*\]|\(\s*(?:\.{3}|…)\s*\)|\.{3,}|…)$")
+
+def clean_html(text: str) -> str:
+    """HTML 조각을 일반 텍스트로 변환
+
+    스크립트/스타일/주석을 버리고 태그를 공백으로 바꾼 뒤(문단끼리 붙지 않도록)
+    HTML 엔티티를 디코딩하고 공백을 하나로 합친다. 모두 C로 구현된 연산만 사용한다.
+    """
+    if not text:
+        return ""
+    if "<" in text:
+        text = _INVISIBLE_PATTERN.sub(" ", text)
+        text = _TAG_PATTERN.sub(" ", text)
+    if "&" in text:
+        text = html.unescape(text)
+    return " ".join(text.split())
+
+def _strip_ellipsis(fragment: str) -> str:
+    """끝의 생략 표시를 뗀 조각 (없으면 같은 객체). 긴 조각 전체를 훑지 않도록 끝부분만 검사"""
+    match = _TRAILING_ELLIPSIS.search(fragment, max(0, len(fragment) - 16))
+    return fragment[:match.start()].rstrip() if match else fragment
+
+def merge_unique(fragments: Iterable[str]) -> str:
+    """정제된 텍스트 조각들을 중복 없이 합치기
+
+    RSS의 summary/content/description은 같은 글이거나 한쪽이 다른 쪽에
+    포함된 경우가 많으므로, 이미 남긴 더 긴 조각에 포함된 조각은 버린다.
+    본문 앞부분을 잘라 "…", "[...]"를 붙인 발췌(단어 중간에서 잘린 경우 포함)도
+    끝의 생략 표시를 떼고 비교하므로 본문과 함께 있으면 버려진다.
+    """
+    unique = list(dict.fromkeys(fragment for fragment in fragments if fragment))
+    kept = []
+    for fragment in sorted(unique, key=len, reverse=True):
+        core = _strip_ellipsis(fragment)
+        if not any(fragment in longer or (core is not fragment and core in longer) for longer in kept):
+            kept.append(fragment)
+
+    # 원래 순서 유지
+    kept_set = set(kept)
+    return " ".join(fragment for fragment in unique if fragment in kept_set)
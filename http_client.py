@@ -0,0 +1,66 @@
+import time
+from typing import Iterator, Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "ollama-summary-bot/1.0 (+https://github.com/Seung-IL-Bang/ollama-summary-bot)"
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    """keep-alive 연결을 재사용하는 requests 세션 생성"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+class ResponseTooLarge(Exception):
+    """응답 본문이 허용 크기를 넘었을 때"""
+
+def read_body(response: requests.Response, timeout: Optional[float] = None,
+              max_bytes: Optional[int] = None, chunk_size: int = 64 * 1024) -> bytes:
+    """stream=True 응답 본문을 전체 시간 제한/크기 제한을 지키며 읽기
+
+    requests의 timeout은 소켓 단위라 조금씩 흘러나오는 느린 서버를 막지 못하므로
+    청크마다 지금까지 본문을 기다린 시간의 합을 확인한다.
+    """
+    return b"".join(iter_body(response, timeout, max_bytes, chunk_size))
+
+def iter_body(response: requests.Response, timeout: Optional[float] = None,
+              max_bytes: Optional[int] = None, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """read_body와 같은 제한을 지키며 도착한 청크를 바로 yield
+
+    소비하는 쪽이 필요한 만큼만 읽고 멈추면(제너레이터를 닫으면) 나머지는 받지 않고 연결을 닫는다.
+    시간 제한은 본문을 기다린 시간에만 적용한다. 소비하는 쪽이 청크 사이에 다른 일(요약 등)을
+    하는 동안은 세지 않으므로 천천히 소비해도 다운로드가 시간 초과로 끊기지 않는다.
+    """
+    chunks = _iter_available(response, chunk_size)
+    waited = 0.0
+    size = 0
+    try:
+        while True:
+            started = time.monotonic()
+            chunk = next(chunks, None)
+            waited += time.monotonic() - started
+            if chunk is None:
+                break
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise ResponseTooLarge(f"response exceeded {max_bytes} bytes")
+            if timeout is not None and waited > timeout:
+                raise requests.Timeout(f"response not completed within {timeout:.0f}s")
+            yield chunk
+    finally:
+        response.close()
+
+def _iter_available(response: requests.Response, chunk_size: int) -> Iterator[bytes]:
+    """도착한 만큼씩 본문을 읽기 (iter_content는 chunk_size가 찰 때까지 블록됨)"""
+    raw = response.raw
+    if not hasattr(raw, "read1"):
+        yield from response.iter_content(chunk_size)
+        return
+    while True:
+        chunk = raw.read1(chunk_size, decode_content=True)
+        if not chunk:
+            break
+        yield chunk
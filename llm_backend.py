@@ -0,0 +1,414 @@
+import asyncio
+import hashlib
+import random
+import re
+import threading
+import time
+from functools import partial
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
+import metrics
+from concurrency import propagate_context
+from llm_scheduler import JobCancelledError, LLMJob, LLMScheduler, current_job_context, get_scheduler
+from ollama_pool import OllamaHostPool
+from prompt_builder import estimate_tokens
+
+# langchain Ollama는 HTTP 오류를 상태 코드만 메시지에 담은 ValueError로 올림
+_OLLAMA_STATUS = re.compile(r"Ollama call failed with status code (\d{3})")
+
+def http_status(error: BaseException) -> Optional[int]:
+    """예외에 담긴 HTTP 상태 코드 (SDK의 status_code, requests/httpx의 response, langchain Ollama 오류). 없으면 None"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is None and isinstance(error, ValueError):
+        match = _OLLAMA_STATUS.match(str(error))
+        if match:
+            status = int(match.group(1))
+    return status if isinstance(status, int) else None
+
+class LLMError(Exception):
+    """LLM 백엔드 호출 실패"""
+
+class LLMTimeoutError(LLMError):
+    """요청별 제한 시간 초과"""
+
+class CircuitOpenError(LLMError):
+    """연속 실패로 엔드포인트 회로가 열려 요청을 보내지 않음"""
+
+class CircuitBreaker:
+    """엔드포인트별 회로 차단기 (closed → open → half-open)
+
+    재시도 가능한 실패가 failure_threshold번 연속되면 reset_timeout초 동안 요청을 바로 거절하고,
+    그 뒤에는 시험 요청 하나만 통과시켜 성공하면 닫고 실패하면 다시 연다.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"🚧 회로 차단: 연속 {self.failures}회 실패, {self.reset_timeout:.0f}초 동안 요청 중단")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def cancel_trial(self):
+        """시험 요청이 결과 없이 취소됐을 때 다음 요청이 시험을 맡을 수 있게 함"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        """열린 회로가 시험 요청을 받기까지 남은 시간 (초)"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(endpoint: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> CircuitBreaker:
+    """엔드포인트마다 프로세스 전체에서 하나의 회로 차단기를 공유"""
+    with _breakers_lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker(failure_threshold, reset_timeout)
+        return _breakers[endpoint]
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 호출을 하나로 합침
+
+    먼저 온 호출(리더)만 fn을 실행하고, 그동안 같은 키로 들어온 호출은 리더의 결과나 예외를 그대로 받는다.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Dict]) -> Tuple[Dict, bool]:
+        """(결과, 다른 호출의 결과를 공유했는지) 반환"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+# 요약기 인스턴스가 달라도(Streamlit 세션마다 따로 만들어도) 같은 프롬프트는 한 번만 생성
+_single_flight = SingleFlight()
+
+class LLMBackend:
+    """요약기들이 공유하는 LLM 호출 계층
+
+    요청별 제한 시간, 지터를 넣은 지수 백오프 재시도, 엔드포인트별 회로 차단,
+    같은 프롬프트 동시 요청 합치기(single-flight)와 호출 메트릭 기록을 맡는다.
+    scheduler가 있으면 시도마다 우선순위 스케줄러의 슬롯을 받아 실행하고, 취소 표시가 붙으면
+    다음 토큰에서 멈춘다 (취소는 재시도/회로 차단 집계에 넣지 않음).
+    하위 클래스는 _stream()으로 텍스트 조각(str)과 사용량 정보(dict)만 내보내면 된다.
+    """
+    name = "llm"
+
+    # 이 표시가 있는 오류는 일시적인 것으로 보고 재시도/회로 차단 집계에 포함
+    RETRYABLE_MARKERS = ("timeout", "timed out", "429", "500", "502", "503", "504",
+                         "overloaded", "rate limit", "connection", "refused", "temporarily")
+
+    def __init__(self, model_name: str, endpoint: str, timeout: float = 120.0,
+                 max_retries: int = 2, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.model_name = model_name
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = get_breaker(endpoint, failure_threshold, reset_timeout)
+        # 동시 실행 슬롯을 나눠 줄 스케줄러 (None이면 제한 없이 바로 호출)
+        self.scheduler: Optional[LLMScheduler] = None
+
+    def generate(self, prompt: str, on_token: Optional[Callable[[str], None]] = None) -> Dict:
+        """프롬프트 하나를 생성해 텍스트와 시간/토큰 지표를 dict로 반환
+
+        on_token을 주면 토큰이 도착할 때마다 호출한다. 같은 프롬프트가 이미 생성 중이면
+        새 요청을 보내지 않고 그 결과를 기다렸다가 전체 텍스트로 on_token을 한 번 호출한다.
+        """
+        key = hashlib.sha256(
+            "\x1f".join((self.name, self.endpoint, self.model_name, prompt)).encode("utf-8")
+        ).hexdigest()
+        try:
+            result, shared = _single_flight.do(key, lambda: self._generate_with_retry(prompt, on_token))
+        except JobCancelledError as e:
+            # 같은 프롬프트를 먼저 보낸 다른 세션의 작업이 취소됐으면 이 호출은 직접 다시 생성
+            if e.owner == current_job_context().owner:
+                raise
+            result, shared = self._generate_with_retry(prompt, on_token), False
+        if not shared:
+            return result
+        metrics.inc("llm_coalesced_total", backend=self.name, model=self.model_name)
+        if on_token is not None and result["text"]:
+            on_token(result["text"])
+        return {**result, "coalesced": True}
+
+    async def agenerate(self, prompt: str, on_token: Optional[Callable[[str], None]] = None) -> Dict:
+        """generate의 비동기 버전 (스레드 풀에서 실행하므로 이벤트 루프를 막지 않음)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, propagate_context(partial(self.generate, prompt, on_token)))
+
+    def complete(self, prompt: str) -> str:
+        """텍스트만 필요한 호출용 (묶음 요약, 청크 요약, 다이제스트)"""
+        return self.generate(prompt)["text"]
+
+    def is_retryable(self, error: BaseException) -> bool:
+        if isinstance(error, LLMTimeoutError):
+            return True
+        if isinstance(error, LLMError):
+            return False
+        if isinstance(error, (TimeoutError, ConnectionError)):
+            return True
+        message = f"{type(error).__name__} {error}".lower()
+        return any(marker in message for marker in self.RETRYABLE_MARKERS)
+
+    def _generate_with_retry(self, prompt: str, on_token: Optional[Callable[[str], None]]) -> Dict:
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                error = CircuitOpenError(
+                    f"circuit open: {self.endpoint} 연속 실패로 요청 중단 "
+                    f"({self.breaker.retry_after():.0f}초 후 재시도)"
+                )
+                metrics.record_llm_error(self.name, self.model_name, error)
+                raise error
+
+            emitted = []
+
+            def forward(token: str):
+                emitted.append(token)
+                if on_token is not None:
+                    on_token(token)
+
+            try:
+                if self.scheduler is None:
+                    result = self._generate_once(prompt, forward)
+                else:
+                    with self.scheduler.slot() as job:
+                        result = self._generate_once(prompt, forward, job)
+            except JobCancelledError:
+                # 취소는 엔드포인트 상태와 무관하므로 성공/실패로 집계하지 않음
+                self.breaker.cancel_trial()
+                raise
+            except Exception as e:
+                retryable = self.is_retryable(e)
+                if retryable:
+                    self.breaker.record_failure()
+                else:
+                    # 잘못된 요청 등은 서버가 응답은 한 것이므로 엔드포인트는 정상으로 봄
+                    self.breaker.record_success()
+                # 이미 일부 토큰을 내보냈으면 재시도 시 화면에 중복 출력되므로 그대로 실패 처리
+                if not retryable or emitted or attempt >= self.max_retries:
+                    metrics.record_llm_error(self.name, self.model_name, e)
+                    raise
+                # full jitter: 여러 요청이 같은 순간에 다시 몰리지 않도록 0 ~ 상한 사이 임의 대기
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                attempt += 1
+                metrics.inc("llm_retries_total", backend=self.name, model=self.model_name)
+                print(f"🔁 LLM 호출 재시도 {attempt}/{self.max_retries} ({delay:.1f}초 후): {str(e)[:80]}")
+                time.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            result["retries"] = attempt
+            return result
+
+    def _generate_once(self, prompt: str, on_token: Callable[[str], None], job: Optional[LLMJob] = None) -> Dict:
+        start_time = time.time()
+        deadline = start_time + self.timeout
+        first_token_time = None
+        parts = []
+        usage = {}
+
+        stream = self._stream(prompt)
+        try:
+            for piece in stream:
+                # 중단 사유를 스트림 안으로 던져 _stream이 원인을 알고 정리하게 함 (연결이 끊겨 서버도 생성을 멈춤)
+                if job is not None and job.cancelled:
+                    stream.throw(JobCancelledError(job.owner))
+                if time.time() > deadline:
+                    stream.throw(LLMTimeoutError(f"LLM 응답 timeout ({self.timeout:.0f}초 초과)"))
+                if isinstance(piece, dict):
+                    usage.update({key: value for key, value in piece.items() if value})
+                    continue
+                if not piece:
+                    continue
+                if first_token_time is None:
+                    first_token_time = time.time()
+                parts.append(piece)
+                on_token(piece)
+        finally:
+            stream.close()
+
+        end_time = time.time()
+        # 백엔드가 토큰 수를 알려주지 않으면 입력은 추정치, 출력은 스트림 청크 수를 사용
+        prompt_tokens = usage.get("input_tokens") or estimate_tokens(prompt)
+        completion_tokens = usage.get("output_tokens") or len(parts)
+        time_to_first_token = first_token_time - start_time if first_token_time is not None else None
+        generation_time = end_time - first_token_time if first_token_time is not None else None
+        metrics.record_llm_call(
+            self.name, self.model_name, prompt_tokens, completion_tokens,
+            time_to_first_token=time_to_first_token, generation_time=generation_time,
+            total_time=end_time - start_time
+        )
+        return {
+            "text": "".join(parts),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "time_to_first_token": time_to_first_token,
+            "generation_time": generation_time,
+            "total_time": end_time - start_time,
+        }
+
+    def _stream(self, prompt: str) -> Iterator[Union[str, Dict]]:
+        raise NotImplementedError
+
+class OllamaBackend(LLMBackend):
+    """Ollama 서버 하나, 또는 pool을 주면 여러 서버에 나눠 호출하는 백엔드
+
+    풀을 쓰면 회로 차단/스케줄러는 풀 전체 단위이고, 호스트별 실패는 풀이 호스트를 빼는 데 쓴다.
+    재시도는 다시 호스트를 고르므로 보통 다른 호스트로 간다.
+    """
+    name = "ollama"
+
+    def __init__(self, model_name: str, base_url: str, num_ctx: int, max_output_tokens: int,
+                 keep_alive: Optional[str] = "30m", timeout: float = 300.0,
+                 pool: Optional[OllamaHostPool] = None, **kwargs):
+        # 로컬 모델은 첫 로딩과 긴 글 생성이 느리므로 기본 제한 시간을 넉넉하게 둠
+        endpoint = pool.endpoint if pool is not None else base_url.rstrip("/")
+        super().__init__(model_name, endpoint, timeout=timeout, **kwargs)
+        self.pool = pool
+        self._client_options = dict(num_ctx=num_ctx, num_predict=max_output_tokens, keep_alive=keep_alive,
+                                    timeout=int(timeout))
+        self._clients: Dict[str, object] = {}
+        self._clients_lock = threading.Lock()
+        if pool is None:
+            self.llm = self._client(self.endpoint)
+            # 같은 Ollama 서버를 쓰는 모든 요약기/세션이 하나의 스케줄러로 슬롯을 나눠 씀
+            self.scheduler = get_scheduler(self.endpoint)
+        else:
+            pool.use_model(model_name)
+            self.scheduler = pool.scheduler
+
+    def _client(self, base_url: str):
+        """호스트별 langchain Ollama 클라이언트 (처음 쓸 때 생성)"""
+        with self._clients_lock:
+            client = self._clients.get(base_url)
+            if client is None:
+                # langchain은 임포트만 1초 가까이 걸리므로 실제로 백엔드를 만들 때 불러옴
+                from langchain_community.llms import Ollama
+                options = self._client_options
+                client = self._clients[base_url] = Ollama(
+                    model=self.model_name,
+                    base_url=base_url,
+                    temperature=0.1,
+                    num_ctx=options["num_ctx"],
+                    num_predict=options["num_predict"],
+                    # 요청 사이에도 모델을 메모리에 유지해 매번 로딩 비용을 내지 않도록 함
+                    keep_alive=options["keep_alive"],
+                    # 연결/읽기 단위 제한 시간 (스트림 전체 제한은 _generate_once에서 확인)
+                    timeout=options["timeout"]
+                )
+            return client
+
+    def _stream(self, prompt: str) -> Iterator[Union[str, Dict]]:
+        # Ollama는 스트림 청크 하나가 토큰 하나에 해당
+        if self.pool is None:
+            yield from self.llm.stream(prompt)
+            return
+
+        host = self.pool.acquire(self.model_name)
+        completed = False
+        failure = None
+        try:
+            yield from self._client(host.base_url).stream(prompt)
+            completed = True
+        except Exception as e:
+            # _generate_once가 던져 넣은 제한 시간 초과도 호스트 실패로 집계하고,
+            # 취소나 잘못된 요청 등 재시도할 수 없는 오류는 호스트 상태와 무관
+            if self.is_retryable(e) and not isinstance(e, JobCancelledError):
+                failure = e
+            raise
+        finally:
+            self.pool.release(host, failure, completed)
+
+class AnthropicBackend(LLMBackend):
+    name = "anthropic"
+
+    def __init__(self, model_name: str, max_output_tokens: int, timeout: float = 60.0, **kwargs):
+        super().__init__(model_name, "anthropic", timeout=timeout, **kwargs)
+        from langchain_anthropic import ChatAnthropic
+        self.llm = ChatAnthropic(
+            model_name=model_name,
+            temperature=0.1,
+            max_tokens=max_output_tokens,
+            timeout=timeout,
+            # 재시도는 이 계층에서 하므로 SDK 재시도는 끔 (겹치면 재시도 폭주)
+            max_retries=0,
+            stop=None
+        )
+
+    def _stream(self, prompt: str) -> Iterator[Union[str, Dict]]:
+        from langchain.schema import HumanMessage
+        for chunk in self.llm.stream([HumanMessage(content=prompt)]):
+            # 첫 청크에 입력 토큰 수, 마지막 청크에 실제 출력 토큰 수가 실려 옴
+            usage = getattr(chunk, "usage_metadata", None)
+            if usage:
+                yield {"input_tokens": usage.get("input_tokens"), "output_tokens": usage.get("output_tokens")}
+            yield chunk.content if isinstance(chunk.content, str) else ""
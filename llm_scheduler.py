@@ -0,0 +1,257 @@
+import contextvars
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+import metrics
+
+# 우선순위 (작을수록 먼저): 사용자가 기다리는 요약 > 다이제스트 > 야간 배치
+INTERACTIVE = 0
+DIGEST = 1
+BACKGROUND = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", DIGEST: "digest", BACKGROUND: "background"}
+
+class JobCancelledError(Exception):
+    """작업을 요청한 세션이 사라지거나 새 실행으로 바뀌어 취소된 LLM 작업"""
+    def __init__(self, owner: Optional[str]):
+        super().__init__(f"LLM 작업 취소됨 (owner={owner})")
+        self.owner = owner
+
+class JobContext(NamedTuple):
+    priority: int = INTERACTIVE
+    # 취소 단위 (Streamlit 세션 ID 등)
+    owner: Optional[str] = None
+    # 같은 우선순위 안에서 돌아가며 처리할 단위 (사용자, 피드 이름 등). 없으면 owner
+    fair_key: Optional[str] = None
+
+_job_context: contextvars.ContextVar = contextvars.ContextVar("llm_job_context", default=JobContext())
+
+@contextmanager
+def job_context(priority: int = INTERACTIVE, owner: Optional[str] = None,
+                fair_key: Optional[str] = None) -> Iterator[JobContext]:
+    """이 블록(과 propagate_context로 넘긴 작업 스레드)에서 나가는 LLM 호출의 우선순위/소유자 지정"""
+    context = JobContext(priority, owner, fair_key)
+    token = _job_context.set(context)
+    try:
+        yield context
+    finally:
+        _job_context.reset(token)
+
+def current_job_context() -> JobContext:
+    return _job_context.get()
+
+class LLMJob:
+    __slots__ = ("priority", "owner", "fair_key", "enqueued_at", "started_at", "granted", "cancelled")
+
+    def __init__(self, context: JobContext):
+        self.priority = context.priority
+        self.owner = context.owner
+        self.fair_key = context.fair_key or context.owner or ""
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.granted = threading.Event()
+        self.cancelled = False
+
+class LLMScheduler:
+    """한 LLM 엔드포인트의 동시 실행 슬롯을 우선순위 순서로 나눠 주는 스케줄러
+
+    - 빈 슬롯은 항상 가장 높은 우선순위의 대기 작업에 먼저 준다 (실행 중인 생성은 끊지 않음)
+    - 같은 우선순위 안에서는 fair_key(사용자, 피드)별 대기열을 돌아가며 하나씩 꺼낸다
+    - 배치 작업은 background_limit개 슬롯까지만 써서 포화 상태에서도 사용자 요청이 바로 시작할 자리를 남긴다
+    - cancel_owner로 세션의 대기 작업을 빼고, 실행 중인 작업은 다음 토큰에서 멈추도록 표시한다
+    max_concurrent는 서버가 실제로 동시에 생성하는 수(OLLAMA_NUM_PARALLEL)와 맞춰야 서버 쪽에서
+    다시 줄을 서지 않는다.
+    """
+    def __init__(self, max_concurrent: int = 4, background_limit: Optional[int] = None, name: str = ""):
+        self.max_concurrent = max(1, max_concurrent)
+        if background_limit is None:
+            background_limit = self.max_concurrent - 1
+        self.background_limit = max(1, min(background_limit, self.max_concurrent))
+        self.name = name
+        self._lock = threading.Lock()
+        self._queues: Dict[int, "OrderedDict[str, deque]"] = {priority: OrderedDict() for priority in PRIORITY_NAMES}
+        self._running: List[LLMJob] = []
+        self._running_count = Counter()
+        self._completed = Counter()
+        self._cancelled = Counter()
+        # 최근 대기 시간 (stats의 p50/p95용)
+        self._wait_times = {priority: deque(maxlen=500) for priority in PRIORITY_NAMES}
+        self._watcher: Optional[threading.Thread] = None
+
+    def resize(self, max_concurrent: int):
+        """동시 실행 수 변경 (호스트 풀에서 호스트가 빠지거나 돌아올 때). 배치 몫은 한 칸 비운 크기로 맞춤"""
+        with self._lock:
+            self.max_concurrent = max(1, max_concurrent)
+            self.background_limit = max(1, self.max_concurrent - 1)
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, context: Optional[JobContext] = None) -> Iterator[LLMJob]:
+        job = self.acquire(context)
+        try:
+            yield job
+        finally:
+            self.release(job)
+
+    def acquire(self, context: Optional[JobContext] = None) -> LLMJob:
+        """차례가 올 때까지 기다렸다가 슬롯을 받음 (기다리는 중 취소되면 JobCancelledError)"""
+        job = LLMJob(context or current_job_context())
+        with self._lock:
+            self._queues[job.priority].setdefault(job.fair_key, deque()).append(job)
+            self._dispatch()
+        job.granted.wait()
+        if job.cancelled:
+            if job.started_at is not None:
+                # 슬롯을 받은 직후 깨어나기 전에 취소됨 → 받은 슬롯을 돌려줘야 다른 작업이 쓸 수 있음
+                self.release(job)
+            raise JobCancelledError(job.owner)
+
+        wait_time = job.started_at - job.enqueued_at
+        self._wait_times[job.priority].append(wait_time)
+        metrics.observe("llm_queue_wait_seconds", wait_time, priority=PRIORITY_NAMES[job.priority])
+        return job
+
+    def release(self, job: LLMJob):
+        with self._lock:
+            self._running.remove(job)
+            self._running_count[job.priority] -= 1
+            if job.cancelled:
+                self._cancelled[job.priority] += 1
+            else:
+                self._completed[job.priority] += 1
+            self._dispatch()
+        metrics.inc("llm_jobs_total", priority=PRIORITY_NAMES[job.priority],
+                    outcome="cancelled" if job.cancelled else "done")
+
+    def cancel_owner(self, owner: str) -> int:
+        """owner의 대기 작업을 대기열에서 빼고 실행 중인 작업에 취소 표시 (취소한 작업 수 반환)"""
+        dequeued = []
+        running = 0
+        with self._lock:
+            for priority, queue in self._queues.items():
+                for fair_key in list(queue):
+                    kept = deque()
+                    for job in queue[fair_key]:
+                        if job.owner == owner:
+                            job.cancelled = True
+                            job.granted.set()
+                            self._cancelled[priority] += 1
+                            dequeued.append(job)
+                        else:
+                            kept.append(job)
+                    if kept:
+                        queue[fair_key] = kept
+                    else:
+                        del queue[fair_key]
+            for job in self._running:
+                if job.owner == owner and not job.cancelled:
+                    job.cancelled = True
+                    running += 1
+        # 실행 중이던 작업은 release에서 집계
+        for job in dequeued:
+            metrics.inc("llm_jobs_total", priority=PRIORITY_NAMES[job.priority], outcome="cancelled")
+        cancelled = len(dequeued) + running
+        if cancelled:
+            print(f"🛑 세션 {owner}의 LLM 작업 {cancelled}개 취소")
+        return cancelled
+
+    def watch_owners(self, is_active: Callable[[str], bool], interval: float = 5.0):
+        """interval초마다 작업 소유자가 살아 있는지 확인해 사라진 세션의 작업을 취소 (한 번만 시작)"""
+        with self._lock:
+            if self._watcher is not None:
+                return
+
+            def watch():
+                while True:
+                    time.sleep(interval)
+                    for owner in self._owners():
+                        try:
+                            alive = is_active(owner)
+                        except Exception:
+                            alive = True
+                        if not alive:
+                            self.cancel_owner(owner)
+
+            self._watcher = threading.Thread(target=watch, name=f"llm-scheduler-watch-{self.name}", daemon=True)
+            self._watcher.start()
+
+    def stats(self) -> Dict:
+        """우선순위별 대기/실행/완료/취소 수와 최근 대기 시간 p50/p95 (초)"""
+        with self._lock:
+            classes = []
+            for priority, name in PRIORITY_NAMES.items():
+                waits = sorted(self._wait_times[priority])
+                classes.append({
+                    "priority": name,
+                    "queued": sum(len(jobs) for jobs in self._queues[priority].values()),
+                    "running": self._running_count[priority],
+                    "completed": self._completed[priority],
+                    "cancelled": self._cancelled[priority],
+                    "fair_keys": len(self._queues[priority]),
+                    "wait_p50_sec": round(waits[len(waits) // 2], 3) if waits else None,
+                    "wait_p95_sec": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3) if waits else None,
+                })
+            return {
+                "endpoint": self.name,
+                "max_concurrent": self.max_concurrent,
+                "background_limit": self.background_limit,
+                "queue_depth": sum(row["queued"] for row in classes),
+                "classes": classes,
+            }
+
+    def _owners(self) -> List[str]:
+        with self._lock:
+            owners = {job.owner for job in self._running}
+            for queue in self._queues.values():
+                for jobs in queue.values():
+                    owners.update(job.owner for job in jobs)
+        owners.discard(None)
+        return list(owners)
+
+    def _dispatch(self):
+        """빈 슬롯에 다음 작업 배정 (lock을 잡은 상태에서 호출)"""
+        while len(self._running) < self.max_concurrent:
+            job = self._next_job()
+            if job is None:
+                return
+            job.started_at = time.monotonic()
+            self._running.append(job)
+            self._running_count[job.priority] += 1
+            job.granted.set()
+
+    def _next_job(self) -> Optional[LLMJob]:
+        for priority, queue in self._queues.items():
+            if not queue:
+                continue
+            if priority == BACKGROUND and self._running_count[BACKGROUND] >= self.background_limit:
+                continue
+            # 맨 앞 fair_key에서 하나 꺼내고 그 키는 맨 뒤로 (라운드 로빈)
+            fair_key, jobs = next(iter(queue.items()))
+            job = jobs.popleft()
+            if jobs:
+                queue.move_to_end(fair_key)
+            else:
+                del queue[fair_key]
+            return job
+        return None
+
+_schedulers: Dict[str, LLMScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+def get_scheduler(endpoint: str, max_concurrent: Optional[int] = None) -> LLMScheduler:
+    """엔드포인트마다 프로세스 전체에서 하나의 스케줄러를 공유
+
+    동시 실행 수는 처음 만들 때 max_concurrent, 없으면 OLLAMA_NUM_PARALLEL 환경 변수(기본 4)로 정한다.
+    """
+    with _schedulers_lock:
+        if endpoint not in _schedulers:
+            if max_concurrent is None:
+                max_concurrent = int(os.getenv("OLLAMA_NUM_PARALLEL") or 4)
+            _schedulers[endpoint] = LLMScheduler(max_concurrent, name=endpoint)
+        return _schedulers[endpoint]
+
+def all_schedulers() -> List[LLMScheduler]:
+    with _schedulers_lock:
+        return list(_schedulers.values())
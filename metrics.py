@@ -0,0 +1,266 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 초 단위 히스토그램 버킷 (피드 수집 수십 ms ~ 로컬 LLM 생성 수 분)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def quantile(self, q: float) -> Optional[float]:
+        """버킷 상한 기준 근사 분위수 (마지막 버킷을 넘으면 inf)"""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+class MetricsRegistry:
+    """Prometheus 스타일 카운터/히스토그램 저장소 (스레드 안전)
+
+    이름과 라벨 조합마다 값을 따로 모으며, Prometheus 텍스트 형식이나 JSON으로 내보낼 수 있다.
+    """
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self.started_at = time.time()
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        key = self._label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = self._label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """블록 실행 시간을 히스토그램에 기록 (예외가 나도 기록)"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start_time, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    def to_dict(self) -> Dict:
+        """JSON으로 덤프하기 좋은 형태 (히스토그램은 count/sum/p50/p95 포함)"""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "count": histogram.count,
+                        "sum": round(histogram.sum, 6),
+                        "p50": _json_number(histogram.quantile(0.5)),
+                        "p95": _json_number(histogram.quantile(0.95)),
+                        "buckets": dict(zip(map(str, histogram.buckets), histogram.counts)),
+                    }
+                    for key, histogram in series.items()
+                ]
+                for name, series in self._histograms.items()
+            }
+        return {"started_at": self.started_at, "counters": counters, "histograms": histograms}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식 (버킷은 누적 값)"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                self._header(lines, name, "counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{self._format_labels(key)} {value}")
+
+            for name, series in sorted(self._histograms.items()):
+                self._header(lines, name, "histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{self._format_labels(key, le=str(bound))} {cumulative}")
+                    lines.append(f"{name}_bucket{self._format_labels(key, le='+Inf')} {histogram.count}")
+                    lines.append(f"{name}_sum{self._format_labels(key)} {histogram.sum}")
+                    lines.append(f"{name}_count{self._format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def stage_summary(self, name: str = "pipeline_stage_seconds") -> List[Dict]:
+        """단계별 호출 수/총 시간/평균/p95 (사이드바 표시용, 총 시간 큰 순)"""
+        with self._lock:
+            series = dict(self._histograms.get(name, {}))
+            rows = [
+                {
+                    "stage": dict(key).get("stage", ""),
+                    "count": histogram.count,
+                    "total_sec": round(histogram.sum, 2),
+                    "avg_sec": round(histogram.sum / histogram.count, 3) if histogram.count else 0.0,
+                    "p95_sec": histogram.quantile(0.95),
+                }
+                for key, histogram in series.items()
+            ]
+        return sorted(rows, key=lambda row: row["total_sec"], reverse=True)
+
+    def counter_total(self, name: str, **labels: str) -> float:
+        """라벨 조건에 맞는 시계열 값의 합"""
+        with self._lock:
+            series = self._counters.get(name, {})
+            return sum(
+                value for key, value in series.items()
+                if all(dict(key).get(label) == wanted for label, wanted in labels.items())
+            )
+
+    def _header(self, lines: List[str], name: str, metric_type: str):
+        if name in self._help:
+            lines.append(f"# HELP {name} {self._help[name]}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    @staticmethod
+    def _label_key(labels: Dict[str, str]) -> LabelKey:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    @staticmethod
+    def _format_labels(key: LabelKey, **extra: str) -> str:
+        pairs = list(key) + list(extra.items())
+        if not pairs:
+            return ""
+        escaped = (
+            label + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+            for label, value in pairs
+        )
+        return "{" + ",".join(escaped) + "}"
+
+def _json_number(value: Optional[float]):
+    """inf는 JSON 표준이 아니므로 Prometheus 표기 문자열로"""
+    return "+Inf" if value == float("inf") else value
+
+def error_class(error) -> str:
+    """예외/오류 메시지를 집계용 분류로 변환"""
+    message = str(error).lower()
+    if "timeout" in message or "timed out" in message:
+        return "timeout"
+    if any(marker in message for marker in ("503", "429", "overloaded", "rate limit")):
+        return "overloaded"
+    if "connection" in message or "refused" in message:
+        return "connection"
+    if isinstance(error, BaseException):
+        return type(error).__name__
+    return "other"
+
+# 앱 전체에서 공유하는 기본 저장소
+registry = MetricsRegistry()
+registry.describe("pipeline_stage_seconds", "Time spent per pipeline stage")
+registry.describe("feed_fetch_total", "Feed fetches by result")
+registry.describe("llm_requests_total", "LLM summary requests by backend, model and outcome")
+registry.describe("llm_errors_total", "LLM errors by backend and error class")
+registry.describe("llm_prompt_tokens_total", "Prompt tokens sent (estimated when the backend does not report them)")
+registry.describe("llm_completion_tokens_total", "Completion tokens generated")
+registry.describe("llm_retries_total", "LLM calls retried after a transient error")
+registry.describe("llm_coalesced_total", "LLM calls served by an identical in-flight request")
+registry.describe("llm_queue_wait_seconds", "Time LLM calls waited for a scheduler slot by priority class")
+registry.describe("llm_jobs_total", "LLM scheduler jobs by priority class and outcome")
+registry.describe("ollama_host_requests_total", "Requests routed to each Ollama host in a pool by outcome")
+registry.describe("ollama_host_drains_total", "Times an Ollama host was taken out of a pool after failures")
+
+inc = registry.inc
+observe = registry.observe
+timer = registry.timer
+
+def record_llm_call(backend: str, model: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+                    time_to_first_token: Optional[float] = None, generation_time: Optional[float] = None,
+                    total_time: Optional[float] = None):
+    """LLM 호출 한 번의 토큰 수와 단계별 시간을 기록"""
+    registry.inc("llm_requests_total", backend=backend, model=model, outcome="ok")
+    registry.inc("llm_prompt_tokens_total", prompt_tokens, backend=backend, model=model)
+    registry.inc("llm_completion_tokens_total", completion_tokens, backend=backend, model=model)
+    if time_to_first_token is not None:
+        registry.observe("pipeline_stage_seconds", time_to_first_token, stage="llm_time_to_first_token")
+    if generation_time is not None:
+        registry.observe("pipeline_stage_seconds", generation_time, stage="llm_generation")
+    if total_time is not None:
+        registry.observe("pipeline_stage_seconds", total_time, stage="llm_call")
+
+def record_llm_error(backend: str, model: str, error):
+    registry.inc("llm_requests_total", backend=backend, model=model, outcome="error")
+    registry.inc("llm_errors_total", backend=backend, error_class=error_class(error))
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = registry
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path == "/metrics":
+            body = self.registry.render_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/metrics.json":
+            body = self.registry.to_json().encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_metrics(port: int = 9108, host: str = "127.0.0.1",
+                  metrics_registry: Optional[MetricsRegistry] = None) -> ThreadingHTTPServer:
+    """/metrics(Prometheus 텍스트)와 /metrics.json을 제공하는 서버를 백그라운드로 시작"""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": metrics_registry or registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📈 메트릭 서버 시작: http://{host}:{server.server_port}/metrics")
+    return server
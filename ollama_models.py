@@ -0,0 +1,65 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import requests
+
+DEFAULT_OLLAMA_URL = "http://localhost:11434"
+
+# 모델 목록 캐시 유지 시간 (초). 서버가 죽어 있을 때는 복구를 빨리 알아채도록 짧게 유지
+MODEL_LIST_TTL = 30.0
+FAILURE_TTL = 3.0
+
+_cache: Dict[str, Tuple[float, Optional[List[str]]]] = {}
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+def list_models(base_url: str = DEFAULT_OLLAMA_URL, ttl: float = MODEL_LIST_TTL,
+                timeout: float = 2.0) -> Optional[List[str]]:
+    """/api/tags로 설치된 모델 이름 목록 조회 (서버가 응답하지 않으면 None)
+
+    결과는 ttl초 동안 캐시되어 Streamlit이 위젯 조작마다 스크립트를 다시 실행해도
+    프로세스 생성이나 HTTP 요청 없이 바로 반환된다. 같은 서버에 대한 동시 조회는 한 번만 보낸다.
+    """
+    base_url = base_url.rstrip("/")
+    cached = _cache.get(base_url)
+    if cached is not None and _is_fresh(cached, ttl):
+        return cached[1]
+
+    with _lock_for(base_url):
+        # 기다리는 동안 다른 스레드가 이미 조회했을 수 있음
+        cached = _cache.get(base_url)
+        if cached is not None and _is_fresh(cached, ttl):
+            return cached[1]
+
+        try:
+            response = requests.get(f"{base_url}/api/tags", timeout=timeout)
+            response.raise_for_status()
+            models = [model["name"] for model in response.json().get("models", [])]
+        except (requests.RequestException, ValueError, KeyError):
+            models = None
+        _cache[base_url] = (time.monotonic(), models)
+        return models
+
+def is_model_installed(model_name: str, models: Optional[List[str]]) -> bool:
+    """태그 없는 이름은 ':latest'로 설치된 모델과도 일치"""
+    if not models:
+        return False
+    return model_name in models or f"{model_name}:latest" in models
+
+def invalidate(base_url: Optional[str] = None):
+    """모델을 새로 받았을 때 등 캐시를 비움 (base_url이 없으면 전체)"""
+    if base_url is None:
+        _cache.clear()
+    else:
+        _cache.pop(base_url.rstrip("/"), None)
+
+def _is_fresh(cached: Tuple[float, Optional[List[str]]], ttl: float) -> bool:
+    fetched_at, models = cached
+    max_age = ttl if models is not None else min(ttl, FAILURE_TTL)
+    return time.monotonic() - fetched_at < max_age
+
+def _lock_for(base_url: str) -> threading.Lock:
+    with _locks_guard:
+        if base_url not in _locks:
+            _locks[base_url] = threading.Lock()
+        return _locks[base_url]
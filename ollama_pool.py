@@ -0,0 +1,230 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import metrics
+from llm_scheduler import LLMScheduler, get_scheduler
+from ollama_models import DEFAULT_OLLAMA_URL, is_model_installed, list_models
+
+class NoHostAvailableError(ConnectionError):
+    """모델이 설치된 정상 호스트가 하나도 없음 (연결 오류로 보고 재시도/회로 차단에 포함)"""
+
+def configured_hosts(value: Optional[str] = None) -> List[str]:
+    """쉼표로 구분한 Ollama 주소 목록 (없으면 OLLAMA_HOSTS 환경 변수, 그것도 없으면 기본 주소 하나)"""
+    value = value if value is not None else os.getenv("OLLAMA_HOSTS", "")
+    hosts = []
+    for url in value.split(","):
+        url = url.strip().rstrip("/")
+        if url and url not in hosts:
+            hosts.append(url)
+    return hosts or [DEFAULT_OLLAMA_URL]
+
+class OllamaHost:
+    __slots__ = ("base_url", "models", "outstanding", "draining", "failures", "requests", "last_error")
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        # 마지막 상태 확인에서 받은 설치 모델 목록 (확인 전에는 None)
+        self.models: Optional[List[str]] = None
+        self.outstanding = 0
+        self.draining = False
+        self.failures = 0
+        self.requests = 0
+        self.last_error = ""
+
+class OllamaHostPool:
+    """여러 Ollama 서버에 요청을 나눠 보내는 호스트 풀
+
+    - 모델이 설치된(/api/tags) 호스트 중 진행 중인 요청이 가장 적은 곳으로 보낸다 (같으면 요청을 덜 받은 곳)
+    - 재시도 가능한 실패가 failure_threshold번 연속되거나 상태 확인에 실패한 호스트는 새 요청에서 빼고(drain)
+      진행 중인 요청만 끝까지 처리한다
+    - health_interval초마다 모든 호스트의 /api/tags를 조회해 모델 목록을 갱신하고, 응답하는 호스트는 다시 넣는다.
+      다시 넣은 호스트는 한 번만 더 실패해도 바로 빠진다
+    풀 전체가 하나의 LLM 스케줄러를 쓰며 동시 실행 수는 (빠지지 않았고 이 풀로 보내는 모델(use_model)이
+    하나라도 설치된 호스트 수 × parallel_per_host)로 맞춘다. 모델이 없는 호스트 몫까지 슬롯을 주면 받을 곳 없는
+    슬롯이 모델이 있는 몇 대로 몰리기 때문이다. 여러 모델이 서로 다른 호스트에만 있으면 모델별로 나누지 않고
+    합쳐서 세므로 한쪽 모델 요청이 몰릴 때는 그 모델 호스트가 잠시 과하게 받을 수 있다.
+    """
+    def __init__(self, base_urls: List[str], parallel_per_host: Optional[int] = None,
+                 failure_threshold: int = 3, health_interval: float = 15.0, health_timeout: float = 2.0):
+        self.hosts = [OllamaHost(url.rstrip("/")) for url in base_urls]
+        self.endpoint = ",".join(host.base_url for host in self.hosts)
+        self.parallel_per_host = parallel_per_host or int(os.getenv("OLLAMA_NUM_PARALLEL") or 4)
+        self.failure_threshold = failure_threshold
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self._lock = threading.Lock()
+        self._health_thread: Optional[threading.Thread] = None
+        self._models_in_use: List[str] = []
+        # 첫 상태 확인이 끝나기 전에는 설치 모델을 몰라 요청을 보낼 수 없으므로 끝날 때까지 기다리게 함
+        self._checked = threading.Event()
+        self.scheduler: LLMScheduler = get_scheduler(self.endpoint, self.parallel_per_host * len(self.hosts))
+
+    def use_model(self, model_name: str):
+        """이 풀로 보낼 모델 등록 (스케줄러 슬롯 수를 이 모델이 있는 호스트 기준으로 맞춤)"""
+        with self._lock:
+            if model_name in self._models_in_use:
+                return
+            self._models_in_use.append(model_name)
+        self._resize_scheduler()
+
+    def wait_until_checked(self, timeout: Optional[float] = None) -> bool:
+        return self._checked.wait(timeout)
+
+    def acquire(self, model_name: str) -> OllamaHost:
+        """요청을 보낼 호스트를 골라 진행 중 요청 수를 올림 (끝나면 release 호출)"""
+        with self._lock:
+            candidates = [
+                host for host in self.hosts
+                if not host.draining and is_model_installed(model_name, host.models)
+            ]
+            if not candidates:
+                raise NoHostAvailableError(
+                    f"모델 '{model_name}'이 설치된 정상 Ollama 호스트가 없습니다 ({self.endpoint})"
+                )
+            host = min(candidates, key=lambda candidate: (candidate.outstanding, candidate.requests))
+            host.outstanding += 1
+            host.requests += 1
+            return host
+
+    def release(self, host: OllamaHost, error: Optional[BaseException] = None, completed: bool = True):
+        """요청 종료 보고
+
+        error는 호스트 탓으로 볼 재시도 가능한 실패(제한 시간 초과 포함)일 때만 넘긴다.
+        error 없이 끝까지 받지 못한 요청(취소 등)은 연속 실패 수를 건드리지 않는다.
+        """
+        drained = False
+        with self._lock:
+            host.outstanding -= 1
+            if error is None:
+                if completed:
+                    host.failures = 0
+            else:
+                host.failures += 1
+                host.last_error = str(error)[:200]
+                if host.failures >= self.failure_threshold and not host.draining:
+                    host.draining = drained = True
+        outcome = "error" if error else ("ok" if completed else "cancelled")
+        metrics.inc("ollama_host_requests_total", host=host.base_url, outcome=outcome)
+        if drained:
+            self._on_drain(host, f"연속 {host.failures}회 실패")
+
+    def check_health(self) -> Dict[str, bool]:
+        """모든 호스트의 모델 목록을 새로 조회하고 빼기/복귀 반영 ({주소: 응답 여부})"""
+        try:
+            return self._check_hosts()
+        finally:
+            self._checked.set()
+
+    def _check_hosts(self) -> Dict[str, bool]:
+        results = {}
+        for host in self.hosts:
+            models = list_models(host.base_url, ttl=0, timeout=self.health_timeout)
+            results[host.base_url] = models is not None
+            restored = drained = False
+            with self._lock:
+                if models is None:
+                    host.last_error = "상태 확인 실패 (/api/tags)"
+                    if not host.draining:
+                        host.draining = drained = True
+                else:
+                    host.models = models
+                    if host.draining:
+                        host.draining = False
+                        # 복귀 직후 한 번만 더 실패해도 바로 다시 빠지도록 함
+                        host.failures = self.failure_threshold - 1
+                        restored = True
+            if drained:
+                self._on_drain(host, "상태 확인 실패")
+            if restored:
+                print(f"✅ Ollama 호스트 복귀: {host.base_url}")
+        # 빠지거나 돌아온 호스트뿐 아니라 설치 모델이 바뀐 호스트도 슬롯 수에 반영
+        self._resize_scheduler()
+        return results
+
+    def start_health_checks(self):
+        """health_interval초마다 check_health를 실행하는 데몬 스레드 시작 (한 번만)"""
+        with self._lock:
+            if self._health_thread is not None:
+                return
+
+            def run():
+                while True:
+                    time.sleep(self.health_interval)
+                    try:
+                        self.check_health()
+                    except Exception as e:
+                        print(f"⚠️ Ollama 호스트 상태 확인 오류: {str(e)}")
+
+            self._health_thread = threading.Thread(target=run, name="ollama-pool-health", daemon=True)
+            self._health_thread.start()
+
+    def hosts_with_model(self, model_name: str) -> List[str]:
+        """모델이 설치되어 있고 빠지지 않은 호스트 주소 목록"""
+        with self._lock:
+            return [host.base_url for host in self.hosts
+                    if not host.draining and is_model_installed(model_name, host.models)]
+
+    def installed_models(self) -> List[str]:
+        """정상 호스트 중 한 곳 이상에 설치된 모델 이름 (중복 제거, 처음 나온 순서)"""
+        with self._lock:
+            models = []
+            for host in self.hosts:
+                if not host.draining:
+                    models.extend(name for name in host.models or [] if name not in models)
+            return models
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            return [
+                {
+                    "host": host.base_url,
+                    "state": "draining" if host.draining else "active",
+                    "outstanding": host.outstanding,
+                    "requests": host.requests,
+                    "failures": host.failures,
+                    "models": len(host.models or []),
+                    "last_error": host.last_error,
+                }
+                for host in self.hosts
+            ]
+
+    def _on_drain(self, host: OllamaHost, reason: str):
+        print(f"🚰 Ollama 호스트 제외: {host.base_url} ({reason}, 진행 중 {host.outstanding}개는 마저 처리)")
+        metrics.inc("ollama_host_drains_total", host=host.base_url)
+        self._resize_scheduler()
+
+    def _resize_scheduler(self):
+        with self._lock:
+            active = [host for host in self.hosts if not host.draining]
+            if self._models_in_use:
+                active = [host for host in active
+                          if any(is_model_installed(model, host.models) for model in self._models_in_use)]
+            count = len(active)
+        self.scheduler.resize(max(1, count) * self.parallel_per_host)
+
+_pools: Dict[Tuple[str, ...], OllamaHostPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(base_urls: List[str], **kwargs) -> OllamaHostPool:
+    """같은 호스트 목록이면 프로세스 전체에서 하나의 풀을 공유 (처음 만들 때 상태 확인 후 주기 확인 시작)
+
+    상태 확인은 호스트마다 /api/tags를 기다리므로 전역 잠금 밖에서 한다. 풀을 만든 호출이 확인하는 동안
+    같은 풀을 받은 다른 호출은 그 확인이 끝나기를 기다리고, 다른 풀과 all_pools는 막히지 않는다.
+    """
+    key = tuple(url.rstrip("/") for url in base_urls)
+    with _pools_lock:
+        pool = _pools.get(key)
+        created = pool is None
+        if created:
+            pool = _pools[key] = OllamaHostPool(list(key), **kwargs)
+    if created:
+        pool.check_health()
+        pool.start_health_checks()
+    else:
+        pool.wait_until_checked()
+    return pool
+
+def all_pools() -> List[OllamaHostPool]:
+    with _pools_lock:
+        return list(_pools.values())
@@ -1,25 +1,60 @@
+from typing import Callable, List, Dict, Optional
 import os
-from langchain_community.llms import Ollama
-from langchain.schema import BaseMessage
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from typing import List, Dict
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrency import AdaptiveLimiter, propagate_context
+from summary_cache import SummaryCache
+from article_store import ArticleStore
+from base_summarizer import BaseSummarizer
+from digest import tree_digest
+from llm_backend import CircuitOpenError, LLMTimeoutError, OllamaBackend, http_status
+from prompt_builder import DEFAULT_OLLAMA_NUM_CTX, PromptBuilder, context_window
+import requests
+import metrics
+from ollama_models import DEFAULT_OLLAMA_URL, is_model_installed, list_models
+from ollama_pool import configured_hosts, get_pool
 
-class OllamaSummarizer:
+class OllamaSummarizer(BaseSummarizer):
     """Ollama를 사용한 완전 무료 기술 블로그 요약 클래스"""
-    def __init__(self, model_name: str = "llama3.2"):
+    error_prefix = "Ollama 요약 실패"
+
+    def __init__(self, model_name: str = "llama3.2", cache: Optional[SummaryCache] = None,
+                 store: Optional[ArticleStore] = None,
+                 base_url: str = DEFAULT_OLLAMA_URL, keep_alive: Optional[str] = "30m",
+                 preload: bool = False, num_ctx: int = DEFAULT_OLLAMA_NUM_CTX,
+                 max_output_tokens: int = 1024, request_timeout: float = 300.0,
+                 max_retries: int = 2, hosts: Optional[List[str]] = None):
         print(f"🦙 Ollama 모델 '{model_name}' 초기화 중...")
+        # Ollama는 긴 텍스트 처리가 느릴 수 있음
+        super().__init__(model_name, cache, store, chunk_size=2000, chunk_overlap=100)
+        self.base_url = base_url.rstrip("/")
+        # hosts(없으면 OLLAMA_HOSTS 환경 변수)에 주소가 두 개 이상이면 호스트 풀로 요청을 나눠 보냄
+        if hosts is None and os.getenv("OLLAMA_HOSTS"):
+            hosts = configured_hosts()
+        # 주소가 하나뿐이면 풀 없이 그 서버로 바로 보냄
+        self.pool = get_pool(hosts) if hosts and len(hosts) > 1 else None
+        if hosts and self.pool is None:
+            self.base_url = hosts[0].rstrip("/")
+        self.keep_alive = keep_alive
+        # Ollama는 num_ctx 만큼만 컨텍스트를 쓰므로 모델 최대치와 num_ctx 중 작은 값이 실제 예산
+        self.prompt_builder = PromptBuilder(
+            model_name,
+            context_tokens=min(context_window(model_name), num_ctx),
+            max_output_tokens=max_output_tokens
+        )
         
         try:
-            self.llm = Ollama(
-                model=model_name,
-                temperature=0.1
-                # Ollama는 로컬 실행이므로 타임아웃을 길게 설정
-                # request_timeout=60.0
+            # Ollama는 로컬 실행이므로 타임아웃을 길게 설정
+            self.backend = OllamaBackend(
+                model_name, self.base_url, num_ctx, max_output_tokens,
+                keep_alive=keep_alive, timeout=request_timeout, max_retries=max_retries, pool=self.pool
             )
             
-            # 모델 테스트
-            test_response = self.llm("안녕하세요!")
+            # 생성 요청 대신 가벼운 모델 목록 조회로 서버/모델 상태 확인
+            self.check_health()
+            if preload:
+                self.preload()
             print(f"✅ Ollama 모델 '{model_name}' 준비 완료!")
             
         except Exception as e:
@@ -28,129 +63,136 @@ class OllamaSummarizer:
             print("1. 'ollama serve' 명령어로 Ollama 서버가 실행 중인지 확인")
             print(f"2. 'ollama pull {model_name}' 명령어로 모델이 설치되었는지 확인")
             raise e
-        
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=2000,  # Ollama는 긴 텍스트 처리가 느릴 수 있음
-            chunk_overlap=100,
-            length_function=len
+
+    def summarize_multiple_articles(self, articles: List[Dict], summary_style: str = "technical",
+                                    max_workers: int = 1, long_document: bool = False,
+                                    on_complete: Optional[Callable[[int, Dict], None]] = None,
+                                    new_only: bool = False, pack_short: bool = False,
+                                    extraction_mode: Optional[str] = None) -> List[Dict]:
+        """여러 기사를 요약 (입력 순서 유지)
+
+        max_workers > 1이면 Ollama의 병렬 슬롯(OLLAMA_NUM_PARALLEL)을 활용해 동시에 요약한다.
+        실제 동시 실행 수는 응답 지연과 타임아웃/503 오류를 보고 1부터 max_workers 사이에서 조절된다.
+        on_complete를 주면 기사 하나가 끝날 때마다 (입력 인덱스, 결과)로 호출한다.
+        new_only=True면 저장소에 같은 모델/스타일 요약이 이미 있는 기사는 빼고 요약한다.
+        중복 기사(같은 정규화 URL 또는 duplicate_of 표시)는 대표 기사 하나만 요약한다.
+        pack_short=True면 본문이 짧은 기사 여러 개를 한 프롬프트로 묶어 요약해 호출 수를 줄인다.
+        extraction_mode는 summarize_single_article 참고 (추출 기반 요약에서는 묶음 요약을 쓰지 않음).
+        """
+        return self._summarize_many(
+            articles, summary_style, new_only, on_complete,
+            lambda batch, callback: self._summarize_batch(
+                batch, summary_style, max_workers, long_document, callback, pack_short, extraction_mode
+            )
         )
-    
-    def summarize_single_article(self, article: Dict, summary_style: str = "technical") -> Dict:
-        """단일 기사 요약 (Ollama 버전)"""
-        try:
-            if "error" in article:
-                return article
-            
-            # 요약할 텍스트 준비 (짧게 유지)
-            content = article.get('content', article.get('summary', ''))
-            if len(content) > 2000:
-                content = content[:2000] + "..."
-            
-            text_to_summarize = f"""
-            제목: {article['title']}
-            작성자: {article['author']}
-            
-            내용:
-            {content}
-            """
-            
-            # Ollama에 맞는 프롬프트 (한국어/영어 혼용)
-            prompts = {
-                "technical": """
-                다음 기술 블로그 글을 기술적 관점에서 요약해주세요:
-                - 사용된 기술/도구
-                - 해결한 문제
-                - 핵심 솔루션
-                - 중요한 인사이트
-                """,
-                "business": """
-                다음 기술 블로그 글을 비즈니스 관점에서 요약해주세요:
-                - 비즈니스 임팩트
-                - 성능 개선 사항
-                - 비용 절감 효과
-                - 사용자 경험 개선
-                """,
-                "brief": """
-                다음 기술 블로그 글을 3-4줄로 간단히 요약해주세요:
-                - 핵심 내용만 추출
-                - 기술적 용어는 간단히 설명
-                """
-            }
-            
-            prompt = prompts.get(summary_style, prompts["technical"])
-            full_prompt = f"{prompt}\n\n{text_to_summarize}"
-            
-            print(f"🤖 '{article['title'][:30]}...' 요약 중...")
-            
-            # Ollama 실행 (시간이 좀 걸릴 수 있음)
+
+    def _summarize_batch(self, articles: List[Dict], summary_style: str, max_workers: int,
+                         long_document: bool, on_complete: Optional[Callable[[int, Dict], None]],
+                         pack_short: bool = False, extraction_mode: Optional[str] = None) -> List[Dict]:
+        """적응형 동시성 제한 아래에서 기사들을 병렬 요약 (입력 순서 유지)"""
+        summaries = [None] * len(articles)
+        limiter = AdaptiveLimiter(max_limit=max_workers)
+        completed = 0
+        progress_lock = threading.Lock()
+
+        print(f"📚 총 {len(articles)}개 기사 요약 시작... (최대 동시 {max_workers}개)")
+
+        pending = list(range(len(articles)))
+        if pack_short and not extraction_mode:
+            for index, summary in self._summarize_packed(articles, summary_style, max_workers).items():
+                summaries[index] = summary
+                completed += 1
+                if on_complete is not None:
+                    on_complete(index, summary)
+            # 묶음에 안 들어갔거나 응답에서 빠진 기사만 개별 요약
+            pending = [index for index in pending if summaries[index] is None]
+
+        def summarize_at(index: int):
+            nonlocal completed
+            article = articles[index]
+            with metrics.timer("pipeline_stage_seconds", stage="llm_queue_wait"):
+                limiter.acquire()
             start_time = time.time()
-            summary = self.llm(full_prompt)
+            error = None
+            try:
+                # 과부하 판단에 예외 자체가 필요하므로 오류 결과로 바꾸기 전 단계를 직접 호출
+                summary = self._summarize_article(
+                    article, summary_style, long_document=long_document, extraction_mode=extraction_mode
+                )
+            except Exception as e:
+                print(f"❌ 요약 실패: {str(e)}")
+                error = e
+                summary = self._error_result(article, e)
             elapsed_time = time.time() - start_time
-            
-            print(f"✅ 요약 완료 ({elapsed_time:.1f}초)")
-            
-            return {
-                "title": article["title"],
-                "link": article["link"],
-                "author": article["author"],
-                "published": article["published"] or article["updated"] or '',
-                "summary": summary,
-                "summary_style": summary_style,
-                "processing_time": f"{elapsed_time:.1f}초"
-            }
-            
-        except Exception as e:
-            print(f"❌ 요약 실패: {str(e)}")
-            return {
-                "title": article.get("title", "알 수 없는 제목"),
-                "error": f"Ollama 요약 실패: {str(e)}"
-            }
-
-    def summarize_multiple_articles(self, articles: List[Dict], summary_style: str = "technical") -> List[Dict]:
-        """여러 기사를 순차적으로 요약"""
-        summaries = []
-        
-        print(f"📚 총 {len(articles)}개 기사 요약 시작...")
-        
-        for i, article in enumerate(articles, 1):
-            print(f"\n🔄 진행상황: {i}/{len(articles)}")
-            summary = self.summarize_single_article(article, summary_style)
-            summaries.append(summary)
-            
-            # 로컬 모델이므로 과부하 방지를 위한 짧은 대기
-            if i < len(articles):
-                time.sleep(1)
-        
+
+            if error is not None:
+                limiter.release(overloaded=self._is_overload_error(error))
+            elif summary is article or summary.get("cached"):
+                # 입력 오류 통과나 캐시 히트는 서버 부하와 무관하므로 한도 조절에 쓰지 않음
+                limiter.release()
+            else:
+                limiter.release(elapsed_time)
+
+            summaries[index] = summary
+            with progress_lock:
+                completed += 1
+                print(f"\n🔄 진행상황: {completed}/{len(articles)} (동시 실행 한도 {limiter.limit})")
+                if on_complete is not None:
+                    on_complete(index, summary)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            list(executor.map(propagate_context(summarize_at), pending))
+
         print(f"\n🎉 모든 요약 완료!")
         return summaries
 
-    def create_digest(self, summaries: List[Dict], blog_name: str) -> str:
-        """여러 요약을 하나의 다이제스트로 통합"""
+    # 서버가 바쁘거나 일시적으로 처리하지 못한다는 HTTP 상태
+    OVERLOAD_STATUSES = {429, 500, 502, 503, 504}
+
+    def _is_overload_error(self, error: BaseException) -> bool:
+        """제한 시간 초과/회로 차단/연결 실패이거나 과부하 HTTP 상태(429, 5xx)인지 예외 종류와 상태 코드로 판단
+
+        오류 메시지 문구는 보지 않으므로 잘못된 요청이나 취소처럼 서버 부하와 무관한 오류는
+        메시지에 "timeout", "connection" 같은 말이 있어도 동시 실행 한도를 줄이지 않는다.
+        """
+        if isinstance(error, (LLMTimeoutError, CircuitOpenError, TimeoutError, ConnectionError,
+                              requests.Timeout, requests.ConnectionError)):
+            return True
+        return http_status(error) in self.OVERLOAD_STATUSES
+
+    def create_digest(self, summaries: List[Dict], blog_name: str, max_workers: int = 4) -> str:
+        """여러 요약을 하나의 다이제스트로 통합
+
+        요약이 많아 한 프롬프트에 다 들어가지 않으면 묶음별 중간 다이제스트를 병렬로 만든 뒤
+        다시 합치는 트리 방식으로 모든 요약을 반영한다. 중간 결과는 캐시되어
+        기사 하나가 추가되면 그 기사가 속한 묶음과 최종 단계만 다시 계산한다.
+        """
         try:
             valid_summaries = [s for s in summaries if "error" not in s]
             
             if not valid_summaries:
                 return "요약할 수 있는 기사가 없습니다."
             
-            # 요약들을 간단히 결합
-            articles_text = ""
-            for i, summary in enumerate(valid_summaries[:3], 1):  # 최대 3개만 사용
-                articles_text += f"\n{i}. {summary['title']}\n요약: {summary['summary']}\n"
-            
-            digest_prompt = f"""아래는 {blog_name}의 최신 기술 블로그 요약들입니다.
+            instruction = f"""아래는 {blog_name}의 최신 기술 블로그 요약들입니다.
                 이들을 종합하여 다음과 같은 다이제스트를 작성해주세요:
                 1. 전체적인 기술 트렌드 (2-3문장)
-                2. 주요 혁신 사항들 (2-3문장)  
+                2. 주요 혁신 사항들 (2-3문장)
                 3. 개발자들이 주목할 점들 (2-3문장)
 
                 간결하고 실용적으로 작성해주세요.
 
                 기사 요약들:
-                {articles_text}
                 """
-            
-            print("📰 전체 다이제스트 생성 중...")
-            digest = self.llm(digest_prompt)
+
+            # 번호를 붙이면 기사 추가 시 모든 항목이 바뀌어 중간 캐시가 무효화되므로 제목만 사용
+            items = [f"- {summary['title']}\n요약: {summary['summary']}" for summary in valid_summaries]
+
+            print(f"📰 전체 다이제스트 생성 중... ({len(items)}개 요약)")
+            with metrics.timer("pipeline_stage_seconds", stage="digest"):
+                digest, self.last_digest_budget = tree_digest(
+                    items, instruction, self.prompt_builder, self.backend.complete, cache=self.cache,
+                    cache_parts=(self.model_name, self.PROMPT_VERSION), max_workers=max_workers
+                )
             print("✅ 다이제스트 생성 완료!")
             
             return digest
@@ -158,15 +200,41 @@ class OllamaSummarizer:
         except Exception as e:
             return f"다이제스트 생성 실패: {str(e)}"
 
+    def check_health(self, timeout: float = 5.0):
+        """/api/tags 조회로 서버가 살아 있고 모델이 설치되어 있는지 확인 (생성 호출 없음)
+
+        호스트 풀이면 모든 호스트를 다시 확인하고, 모델이 설치된 정상 호스트가 하나라도 있으면 통과한다.
+        """
+        if self.pool is not None:
+            if not any(self.pool.check_health().values()):
+                raise ConnectionError(f"Ollama 서버({self.pool.endpoint})에 연결할 수 없습니다")
+            hosts = self.pool.hosts_with_model(self.model_name)
+            if not hosts:
+                raise ValueError(f"모델 '{self.model_name}'이 설치된 Ollama 호스트가 없습니다")
+            print(f"🖧 '{self.model_name}' 사용 가능 호스트 {len(hosts)}/{len(self.pool.hosts)}개")
+            return
+
+        models = list_models(self.base_url, timeout=timeout)
+        if not is_model_installed(self.model_name, models):
+            # 캐시된 목록이 모델 설치 전 것일 수 있으므로 한 번 새로 조회
+            models = list_models(self.base_url, ttl=0, timeout=timeout)
+        if models is None:
+            raise ConnectionError(f"Ollama 서버({self.base_url})에 연결할 수 없습니다")
+        if not is_model_installed(self.model_name, models):
+            raise ValueError(f"모델 '{self.model_name}'이 설치되어 있지 않습니다")
+
+    def preload(self, timeout: float = 300.0):
+        """프롬프트 없는 생성 요청으로 모델을 메모리에 미리 올려둠 (토큰 생성 없음, 풀이면 모델이 있는 호스트 전부)"""
+        payload = {"model": self.model_name}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        base_urls = self.pool.hosts_with_model(self.model_name) if self.pool is not None else [self.base_url]
+        for base_url in base_urls:
+            response = requests.post(f"{base_url}/api/generate", json=payload, timeout=timeout)
+            response.raise_for_status()
+
     def get_available_models(self) -> List[str]:
-        """사용 가능한 Ollama 모델 목록 반환"""
-        try:
-            import subprocess
-            result = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')[1:]  # 헤더 제외
-                models = [line.split()[0] for line in lines if line.strip()]
-                return models
-            return []
-        except:
-            return ["empty"]  # 기본값
\ No newline at end of file
+        """사용 가능한 Ollama 모델 목록 반환 (캐시된 /api/tags 조회, 풀이면 정상 호스트들의 합집합)"""
+        if self.pool is not None:
+            return self.pool.installed_models()
+        return list_models(self.base_url) or []
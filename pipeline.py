@@ -0,0 +1,116 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from concurrency import propagate_context
+from dedup import DuplicateIndex, canonicalize_url, copy_summary, mark_duplicates
+
+# 이벤트 종류: 파이프라인에 들어온 기사 / 생성 중인 토큰 / 완료된 요약
+ARTICLE = "article"
+TOKEN = "token"
+SUMMARY = "summary"
+
+Summarize = Callable[[Dict, Optional[Callable[[str], None]]], Dict]
+
+def stream_summaries(articles: Iterable[Dict], summarize: Summarize, max_in_flight: int = 1,
+                     prepare: Optional[Callable[[Dict], Dict]] = None, stream_tokens: bool = False,
+                     duplicate_index: Optional[DuplicateIndex] = None) -> Iterator[Dict]:
+    """기사 이터러블을 받아 들어오는 대로 요약하며 진행 이벤트를 발생 순서대로 yield
+
+    이벤트는 {"type", "index", ...} 형태다.
+    - article: 기사가 파이프라인에 들어옴 ("article")
+    - token: stream_tokens=True일 때 생성된 토큰 ("token")
+    - summary: 요약 완료 ("article", "summary", "completed", "total")
+      total은 입력을 끝까지 읽기 전에는 None이다.
+
+    동시에 처리 중인 기사는 max_in_flight개 이하이고 자리가 날 때만 입력을 더 읽으므로,
+    피드가 커도 메모리에 올라가는 기사 수가 일정하고 첫 요약은 LLM 호출 한 번 만에 나온다.
+    summarize와 prepare(원문 수집 등)는 워커 스레드에서 실행되고, 토큰을 포함한 모든 이벤트는
+    이 제너레이터를 소비하는 스레드에서 받으므로 Streamlit 위젯을 바로 갱신해도 된다.
+    duplicate_index를 주면 앞서 본 글과 겹치는 기사는 대표 기사의 요약을 복사해 쓴다.
+    """
+    events: "queue.Queue[Dict]" = queue.Queue()
+    source = iter(articles)
+    executor = ThreadPoolExecutor(max_workers=max(1, max_in_flight))
+    in_flight = 0
+    seen = 0
+    completed = 0
+    exhausted = False
+    index_by_link: Dict[str, int] = {}
+    # 중복 처리에 필요한 것만 남김 (기사 본문은 요약이 끝나면 들고 있지 않음)
+    waiting: Dict[int, List[Tuple[int, Dict]]] = {}
+    done: Dict[int, Dict] = {}
+    link_of: Dict[int, str] = {}
+
+    def work(index: int, article: Dict):
+        on_token = None
+        if stream_tokens:
+            on_token = lambda token: events.put({"type": TOKEN, "index": index, "token": token})
+        try:
+            if prepare is not None:
+                article = prepare(article)
+            summary = summarize(article, on_token)
+        except Exception as e:
+            summary = {"title": article.get("title", "알 수 없는 제목"), "error": str(e)}
+        events.put({"type": SUMMARY, "index": index, "article": article, "summary": summary})
+
+    def finish(event: Dict) -> Dict:
+        nonlocal completed
+        completed += 1
+        return {**event, "completed": completed, "total": seen if exhausted else None}
+
+    try:
+        while True:
+            while not exhausted and in_flight < max_in_flight:
+                article = next(source, None)
+                if article is None:
+                    exhausted = True
+                    break
+                index = seen
+                seen += 1
+                if duplicate_index is not None:
+                    article = mark_duplicates([article], duplicate_index)[0]
+                yield {"type": ARTICLE, "index": index, "article": article}
+
+                target = _representative(article, index_by_link)
+                if target is None:
+                    link = link_of[index] = article.get("link", "")
+                    for key in (link, article.get("canonical_link") or canonicalize_url(link)):
+                        if key and "error" not in article:
+                            index_by_link.setdefault(key, index)
+                    # 생성기를 소비하는 쪽의 작업 컨텍스트(우선순위/세션)를 그대로 넘김
+                    executor.submit(propagate_context(work), index, article)
+                    in_flight += 1
+                elif target in done:
+                    summary = copy_summary(done[target], article, link_of[target])
+                    yield finish({"type": SUMMARY, "index": index, "article": article, "summary": summary})
+                else:
+                    # 대표 기사가 아직 요약 중이면 끝날 때 함께 결과를 냄
+                    waiting.setdefault(target, []).append((index, article))
+
+            if in_flight == 0:
+                break
+
+            event = events.get()
+            if event["type"] == SUMMARY:
+                in_flight -= 1
+                done[event["index"]] = event["summary"]
+                yield finish(event)
+                for duplicate, article in waiting.pop(event["index"], []):
+                    summary = copy_summary(event["summary"], article, link_of[event["index"]])
+                    yield finish({"type": SUMMARY, "index": duplicate, "article": article, "summary": summary})
+            else:
+                yield event
+    finally:
+        # 소비하는 쪽이 중간에 멈추면 아직 시작하지 않은 작업은 취소
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _representative(article: Dict, index_by_link: Dict[str, int]) -> Optional[int]:
+    """이번 실행에서 먼저 들어온 같은 글(정규화 URL 또는 duplicate_of)의 인덱스"""
+    if "error" in article:
+        return None
+    canonical = article.get("canonical_link") or canonicalize_url(article.get("link", ""))
+    target = index_by_link.get(canonical)
+    original = article.get("duplicate_of")
+    if target is None and original:
+        target = index_by_link.get(original, index_by_link.get(canonicalize_url(original)))
+    return target
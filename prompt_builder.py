@@ -0,0 +1,130 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# 모델별 최대 컨텍스트 길이 (토큰). 이름은 앞부분만 맞으면 적용 (예: "qwen2.5:7b" → "qwen2.5")
+MODEL_CONTEXT_WINDOWS = {
+    "llama3.2": 131072,
+    "llama3.1": 131072,
+    "llama3": 8192,
+    "qwen2.5": 32768,
+    "mistral": 32768,
+    "gemma2": 8192,
+    "phi3": 4096,
+    "claude-3": 200000,
+}
+DEFAULT_CONTEXT_WINDOW = 4096
+
+# Ollama는 모델 최대치와 상관없이 num_ctx 만큼만 컨텍스트를 잡음
+DEFAULT_OLLAMA_NUM_CTX = 4096
+
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+")
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 빠르게 토큰 수 추정 (다소 넉넉하게)
+
+    영문/코드는 약 4자당 1토큰, 한글 등 비ASCII 문자는 글자당 약 1토큰으로 본다.
+    비ASCII 글자 수는 UTF-8 바이트 길이 차이로 구해 문자 단위 반복 없이 계산한다.
+    """
+    if not text:
+        return 0
+    extra_bytes = len(text.encode("utf-8")) - len(text)
+    # 한글/한자는 3바이트(추가 2바이트), 그 외 비ASCII도 대부분 2~3바이트
+    non_ascii = extra_bytes // 2
+    ascii_chars = len(text) - non_ascii
+    return non_ascii + ascii_chars // 4 + 1
+
+def context_window(model_name: str) -> int:
+    """모델 이름으로 컨텍스트 길이 조회 (가장 길게 일치하는 접두사 우선)"""
+    name = model_name.lower()
+    for prefix in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+        if name.startswith(prefix):
+            return MODEL_CONTEXT_WINDOWS[prefix]
+    return DEFAULT_CONTEXT_WINDOW
+
+class PromptBuilder:
+    """모델 컨텍스트와 토큰 예산에 맞춰 요약 프롬프트를 만드는 클래스
+
+    지시문/제목/메타데이터는 그대로 두고, 본문만 남은 예산에 맞게 줄인다.
+    본문이 넘칠 때는 앞부분(도입/문제 정의)과 끝부분(결론)을 문장 단위로 남기고
+    가운데를 생략한다.
+    """
+    TRUNCATION_MARKER = "\n...(중략)...\n"
+
+    def __init__(self, model_name: str, context_tokens: Optional[int] = None,
+                 max_output_tokens: int = 1024, head_ratio: float = 0.7):
+        self.model_name = model_name
+        self.context_tokens = context_tokens or context_window(model_name)
+        self.max_output_tokens = max_output_tokens
+        self.head_ratio = head_ratio
+
+    @property
+    def input_budget(self) -> int:
+        """출력용 토큰을 뺀 입력 프롬프트 예산"""
+        return max(0, self.context_tokens - self.max_output_tokens)
+
+    def build(self, instruction: str, title: str, content: str,
+              metadata: Optional[Dict[str, str]] = None, content_label: str = "내용") -> Tuple[str, Dict]:
+        """(프롬프트, 예산 정보) 반환"""
+        header_lines = [instruction.strip(), "", f"제목: {title}"]
+        for key, value in (metadata or {}).items():
+            if value:
+                header_lines.append(f"{key}: {value}")
+        header = "\n".join(header_lines) + f"\n\n{content_label}:\n"
+
+        header_tokens = estimate_tokens(header)
+        content_budget = max(0, self.input_budget - header_tokens)
+        fitted_content, truncated = self.fit_text(content, content_budget)
+        prompt = header + fitted_content
+
+        return prompt, self._budget(estimate_tokens(prompt), content_budget, truncated)
+
+    def fit_text(self, text: str, budget_tokens: int) -> Tuple[str, bool]:
+        """예산을 넘으면 앞/뒤 문장을 남기고 가운데를 생략 (생략 여부 함께 반환)"""
+        text_tokens = estimate_tokens(text)
+        if text_tokens <= budget_tokens:
+            return text, False
+        if budget_tokens <= estimate_tokens(self.TRUNCATION_MARKER):
+            return "", True
+
+        # 토큰 예산을 이 텍스트의 글자/토큰 비율로 글자 수로 환산
+        allowed_chars = int(len(text) * (budget_tokens - estimate_tokens(self.TRUNCATION_MARKER)) / text_tokens)
+        head_chars = int(allowed_chars * self.head_ratio)
+        tail_chars = allowed_chars - head_chars
+
+        head = self._cut_at_sentence(text[:head_chars], from_end=True)
+        tail = self._cut_at_sentence(text[len(text) - tail_chars:], from_end=False) if tail_chars > 0 else ""
+        return head + self.TRUNCATION_MARKER + tail, True
+
+    def fit_items(self, fixed_text: str, items: List[str], separator: str = "\n") -> Tuple[List[str], Dict]:
+        """고정 부분을 뺀 예산 안에 들어가는 만큼 앞에서부터 항목을 고름"""
+        budget = max(0, self.input_budget - estimate_tokens(fixed_text))
+        selected = []
+        used = 0
+        for item in items:
+            item_tokens = estimate_tokens(item + separator)
+            if used + item_tokens > budget:
+                break
+            selected.append(item)
+            used += item_tokens
+        total_tokens = estimate_tokens(fixed_text) + used
+        return selected, self._budget(total_tokens, budget, len(selected) < len(items))
+
+    def _budget(self, prompt_tokens: int, content_budget: int, truncated: bool) -> Dict:
+        return {
+            "model": self.model_name,
+            "context_tokens": self.context_tokens,
+            "max_output_tokens": self.max_output_tokens,
+            "content_budget_tokens": content_budget,
+            "prompt_tokens": prompt_tokens,
+            "truncated": truncated
+        }
+
+    @staticmethod
+    def _cut_at_sentence(text: str, from_end: bool) -> str:
+        """잘린 문장 조각을 버리고 문장 경계에서 자르기 (경계가 없으면 그대로)"""
+        boundaries = [match.end() for match in _SENTENCE_END.finditer(text)]
+        if not boundaries:
+            return text
+        if from_end:
+            return text[:boundaries[-1]].rstrip()
+        return text[boundaries[0]:].lstrip()
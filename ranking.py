@@ -0,0 +1,200 @@
+import json
+import math
+import os
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable, List, Optional
+import metrics
+
+# 관심 주제별 키워드 (topic_profiles.json이 있으면 그 내용으로 대체)
+DEFAULT_PROFILES = {
+    "AI": ["ai", "llm", "gpt", "ml", "rag", "인공지능", "머신러닝", "딥러닝", "모델", "추론", "학습",
+           "임베딩", "embedding", "transformer", "생성형", "에이전트", "agent", "프롬프트", "prompt"],
+    "Cloud": ["cloud", "클라우드", "aws", "gcp", "azure", "kubernetes", "k8s", "쿠버네티스", "docker",
+              "컨테이너", "serverless", "서버리스", "terraform", "인프라", "lambda", "eks"],
+    "DB": ["database", "데이터베이스", "db", "sql", "mysql", "postgresql", "postgres", "redis", "mongodb",
+           "쿼리", "query", "인덱스", "index", "샤딩", "sharding", "트랜잭션", "transaction", "캐시", "cache"],
+    "Frontend": ["frontend", "프론트엔드", "react", "vue", "nextjs", "javascript", "typescript", "css",
+                 "브라우저", "browser", "웹뷰", "렌더링", "rendering", "ui", "컴포넌트", "component"],
+    "DevOps": ["devops", "ci", "cd", "배포", "deploy", "deployment", "모니터링", "monitoring", "observability",
+               "로그", "logging", "장애", "incident", "sre", "알림", "파이프라인", "pipeline"],
+}
+
+# ASCII 구두점/기호를 공백으로 바꾸는 바이트 변환표. UTF-8 바이트열에 translate + split을 쓰면
+# 한글이 섞인 str에 정규식/str.translate를 쓰는 것보다 토큰화가 2배 이상 빠름 (한글 바이트는 0x80 이상이라 그대로)
+_PUNCTUATION = bytes(32 if chr(byte) in "!\"#$%&'()*+,-./:;<=>?@[\\]^`{|}~" else byte for byte in range(256))
+# 키워드 뒤에 붙어 한 토큰이 되는 조사/영어 복수형 ("쿠버네티스를", "llm으로", "databases")
+_SUFFIXES = ("은", "는", "이", "가", "을", "를", "의", "에", "에서", "에서는", "에는", "으로", "로",
+             "과", "와", "도", "만", "까지", "부터", "처럼", "보다", "s", "es")
+
+def load_topic_profiles(path: str = "topic_profiles.json") -> Dict[str, List[str]]:
+    """{"주제": ["키워드", ...]} 형식의 주제 프로필 (파일이 없거나 읽을 수 없으면 기본값)"""
+    if not os.path.exists(path):
+        return dict(DEFAULT_PROFILES)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            profiles = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ 주제 프로필 로드 실패 ({e}), 기본값 사용")
+        return dict(DEFAULT_PROFILES)
+    return {name: list(keywords) for name, keywords in profiles.items() if keywords}
+
+def tokenize(text: str) -> List[bytes]:
+    """소문자 UTF-8 바이트 토큰 목록 (랭킹 내부에서만 비교하므로 디코딩하지 않음)"""
+    return text.lower().encode("utf-8").translate(_PUNCTUATION).split()
+
+def expand_terms(keywords: Iterable[str]) -> Dict[bytes, str]:
+    """키워드를 토큰으로 나누고 조사/복수형이 붙은 형태까지 {토큰 형태: 기본 키워드}로 펼침"""
+    variants = {}
+    for keyword in keywords:
+        for term in tokenize(keyword):
+            for suffix in ("",) + _SUFFIXES:
+                variants.setdefault(term + suffix.encode("utf-8"), term.decode("utf-8"))
+    return variants
+
+def parse_date(value: str) -> Optional[datetime]:
+    """RSS(RFC 822)/Atom(ISO 8601) 날짜 문자열을 UTC 기준 datetime으로 (읽지 못하면 None)"""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.strip())
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+def estimate_llm_seconds(default: float = 30.0) -> float:
+    """지금까지 기록된 기사당 LLM 호출 평균 시간 (기록이 없으면 default)"""
+    for row in metrics.registry.stage_summary():
+        if row["stage"] == "llm_call" and row["count"]:
+            return row["avg_sec"]
+    return default
+
+class RelevanceRanker:
+    """LLM에 보내기 전에 주제 프로필과의 BM25 점수와 최신성으로 기사를 고르는 랭커
+
+    기사마다 제목(가중치 title_weight배)과 본문 앞 max_chars자만 토큰화하고, 프로필 키워드에 대해서만
+    단어 빈도를 모은다. 조사가 붙은 형태는 형태소 분석 대신 키워드 쪽을 미리 펼쳐 두고 집합 교집합으로 찾는다.
+    문서 빈도/길이 정규화는 이번 후보 집합 기준이다.
+    최종 점수 = (1 - recency_weight) × 정규화 관련도 + recency_weight × 0.5^(경과 시간 / half_life_hours)
+    """
+    def __init__(self, profiles: Optional[Dict[str, List[str]]] = None, k1: float = 1.2, b: float = 0.75,
+                 title_weight: int = 3, max_chars: int = 3000, recency_weight: float = 0.3,
+                 half_life_hours: float = 72.0):
+        self.profiles = profiles if profiles is not None else load_topic_profiles()
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self.max_chars = max_chars
+        self.recency_weight = recency_weight
+        self.half_life_hours = half_life_hours
+
+    def rank(self, articles: Iterable[Dict], topics: Optional[List[str]] = None,
+             now: Optional[datetime] = None) -> List[Dict]:
+        """기사를 점수 높은 순으로 정렬해 반환
+
+        각 항목은 {"article", "score", "relevance", "recency", "topic", "topic_scores", "matched"} 형태다.
+        topic은 가장 점수가 높은 주제, matched는 본문에서 찾은 키워드(많이 나온 순)다.
+        수집 오류 항목은 제외한다.
+        """
+        start_time = time.perf_counter()
+        articles = [article for article in articles if "error" not in article]
+        topics = [topic for topic in (topics or list(self.profiles)) if topic in self.profiles]
+        variants = expand_terms(keyword for topic in topics for keyword in self.profiles[topic])
+        # 키워드 → 그 키워드가 들어 있는 주제들
+        term_topics: Dict[str, List[str]] = {}
+        for topic in topics:
+            for term in set(expand_terms(self.profiles[topic]).values()):
+                term_topics.setdefault(term, []).append(topic)
+
+        # 문서별로 프로필 키워드의 빈도만 남김 (교집합은 C 레벨 집합 연산)
+        term_counts = []
+        lengths = []
+        document_frequency = Counter()
+        for article in articles:
+            tokens = tokenize(
+                f"{article.get('title', '')} " * self.title_weight
+                + article.get("content", article.get("summary", ""))[:self.max_chars]
+            )
+            counts = Counter(tokens)
+            matched = Counter()
+            for token in variants.keys() & counts.keys():
+                matched[variants[token]] += counts[token]
+            term_counts.append(matched)
+            lengths.append(len(tokens))
+            document_frequency.update(matched.keys())
+
+        total = len(articles)
+        average_length = (sum(lengths) / total) if total else 0.0
+        idf = {
+            term: math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        }
+
+        now = now or datetime.now(timezone.utc)
+        ranked = []
+        for article, matched, length in zip(articles, term_counts, lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / average_length) if average_length else self.k1
+            topic_scores = dict.fromkeys(topics, 0.0)
+            for term, tf in matched.items():
+                term_score = idf[term] * tf * (self.k1 + 1) / (tf + norm)
+                for topic in term_topics[term]:
+                    topic_scores[topic] += term_score
+            topic_scores = {topic: round(score, 3) for topic, score in topic_scores.items()}
+            best_topic = max(topic_scores, key=topic_scores.get) if topic_scores else ""
+            ranked.append({
+                "article": article,
+                "relevance": topic_scores.get(best_topic, 0.0),
+                "recency": self._recency(article, now),
+                "topic": best_topic if topic_scores.get(best_topic) else "",
+                "topic_scores": topic_scores,
+                "matched": sorted(matched, key=matched.get, reverse=True),
+            })
+
+        max_relevance = max((item["relevance"] for item in ranked), default=0.0)
+        for item in ranked:
+            relevance = item["relevance"] / max_relevance if max_relevance else 0.0
+            item["score"] = round((1 - self.recency_weight) * relevance + self.recency_weight * item["recency"], 4)
+        ranked.sort(key=lambda item: item["score"], reverse=True)
+
+        metrics.observe("pipeline_stage_seconds", time.perf_counter() - start_time, stage="rank")
+        return ranked
+
+    def _recency(self, article: Dict, now: datetime) -> float:
+        published = parse_date(article.get("published") or article.get("updated") or "")
+        if published is None:
+            return 0.0
+        age_hours = max(0.0, (now - published).total_seconds() / 3600)
+        return round(0.5 ** (age_hours / self.half_life_hours), 4)
+
+def select_within_budget(ranked: List[Dict], top_k: int, time_budget: Optional[float] = None,
+                         estimate_seconds: Optional[Callable[[Dict], float]] = None,
+                         min_score: float = 0.0) -> List[Dict]:
+    """점수 순으로 최대 top_k개를 고르되 예상 LLM 시간 합이 time_budget(초)을 넘지 않게 선택
+
+    중복 표시(duplicate_of)된 기사는 대표 기사가 요약되므로 건너뛴다.
+    예상 시간이 예산보다 긴 기사는 건너뛰고 다음 순위로 넘어간다.
+    """
+    if estimate_seconds is None:
+        per_article = estimate_llm_seconds()
+        estimate_seconds = lambda article: per_article
+
+    selected = []
+    spent = 0.0
+    for item in ranked:
+        if len(selected) >= top_k or item["score"] < min_score:
+            break
+        if item["article"].get("duplicate_of"):
+            continue
+        cost = estimate_seconds(item["article"])
+        if time_budget is not None and spent + cost > time_budget:
+            continue
+        spent += cost
+        selected.append(item)
+    return selected
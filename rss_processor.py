@@ -1,23 +1,57 @@
-import feedparser
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
-from typing import List, Dict
-import re
+from typing import Callable, Iterable, Iterator, List, Dict, Optional
+from functools import partial
+from urllib.parse import urlparse
+import hashlib
+import os
 import json
+from feed_state import FeedStateStore
+from http_client import create_session, iter_body, read_body
+from concurrency import run_bounded
+from html_cleaner import clean_html, merge_unique
+from article_fetcher import ArticleFetcher
+from article_store import ArticleStore
+from dedup import DuplicateIndex, mark_duplicates
+from article import Article
+from feed_parser import FeedParseError, iter_entries
+import metrics
 
 class RSSProcessor:
     """RSS 피드를 처리하고 기사 내용을 추출하는 클래스"""
-    def __init__(self, rss_file: str = "rss_blogs.json"):
+    def __init__(self, rss_file: str = "rss_blogs.json", store: Optional[ArticleStore] = None,
+                 streaming_parse: bool = True):
         self.rss_file = rss_file
+        self.store = store
+        # True면 앞쪽 max_entries개 엔트리까지만 읽고 멈추는 스트리밍 파서 사용 (읽지 못하면 feedparser)
+        self.streaming_parse = streaming_parse
         self.tech_blogs = self._load_blogs()
+        # 조건부 GET을 위한 피드 상태는 rss_blogs.json 옆에 저장
+        state_file = os.path.join(os.path.dirname(os.path.abspath(rss_file)), "rss_feed_state.json")
+        self.feed_state = FeedStateStore(state_file)
+        self.session = create_session(pool_size=32)
+        self.article_fetcher = ArticleFetcher(self.session)
 
     def _load_blogs(self) -> Dict[str, str]:
+        if self.store is not None:
+            # 저장소를 쓰는 경우 JSON 목록은 처음 한 번만 옮겨 옴 (이후 피드를 모두 지워도 다시 가져오지 않음)
+            if self.store.get_meta("feeds_imported"):
+                return self.store.get_feeds()
+            blogs = self.store.get_feeds()
+            if blogs:
+                # 표시가 생기기 전에 이미 옮겨 온 저장소
+                self.store.set_meta("feeds_imported", "1")
+                return blogs
+
         try:
             with open(self.rss_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+                blogs = json.load(f)
         except FileNotFoundError:
-            return {}
+            blogs = {}
+
+        if self.store is not None:
+            for name, url in blogs.items():
+                self.store.upsert_feed(name, url)
+            self.store.set_meta("feeds_imported", "1")
+        return blogs
 
     def _save_blogs(self):
         with open(self.rss_file, "w", encoding="utf-8") as f:
@@ -29,70 +63,285 @@ class RSSProcessor:
 
     def add_blog(self, name: str, url: str):
         self.tech_blogs[name] = url
-        self._save_blogs()
+        if self.store is not None:
+            self.store.upsert_feed(name, url)
+        else:
+            self._save_blogs()
 
     def delete_blog(self, name: str):
         if name in self.tech_blogs:
+            self.feed_state.remove(self.tech_blogs[name])
             del self.tech_blogs[name]
-            self._save_blogs()
+            if self.store is not None:
+                self.store.delete_feed(name)
+            else:
+                self._save_blogs()
+
+    def fetch_rss_feed(self, rss_url: str, max_entries: int = 10, new_only: bool = False,
+                       timeout: float = 30.0) -> List[Dict]:
+        """RSS 피드를 가져오고 최대 max_entries개의 항목을 반환
 
-    def fetch_rss_feed(self, rss_url: str, max_entries: int = 10) -> List[Dict]:
-        """RSS 피드를 가져오고 최대 max_entries개의 항목을 반환"""
+        new_only=True면 저장된 ETag/Last-Modified로 조건부 요청을 보내고
+        이전에 본 적 없는 엔트리만 반환한다. 변경이 없으면 빈 리스트를 반환.
+        timeout은 응답을 기다린 시간의 상한(초)으로, 본문은 청크를 기다린 시간을 합산해 확인한다
+        (느리게 조금씩 보내는 서버도 이 합이 넘으면 중단).
+        """
+        return list(self.iter_rss_feed(rss_url, max_entries, new_only, timeout))
+
+    def iter_rss_feed(self, rss_url: str, max_entries: int = 10, new_only: bool = False,
+                      timeout: float = 30.0) -> Iterator[Dict]:
+        """fetch_rss_feed의 스트리밍 버전: HTML 정제가 끝난 기사부터 하나씩 yield
+
+        실패하면 {"error": ...} 하나를 yield 하고 끝난다. 피드는 앞쪽 max_entries개 엔트리까지만 받아
+        파싱한 뒤 연결을 닫고, HTML 정제는 소비하는 쪽이 다음 기사를 요청할 때 하므로
+        뒤쪽 기사를 기다리지 않고 첫 기사부터 바로 요약을 시작할 수 있다.
+        """
         try:
-            # RSS 피드 파싱
-            feed = feedparser.parse(rss_url)
-
-            if feed.bozo:
-                return [{"error": f"Failed to parse RSS feed: {feed.bozo_exception}"}]
-            
-            articles = []
-            for entry in feed.entries[:max_entries]:
-                article = {
-                    "title": getattr(entry, "title", ""),
-                    "link": getattr(entry, "link", ""),
-                    "published": getattr(entry, "published", ""),
-                    "summary": self._clean_html_tags(getattr(entry, "summary", "")),
-                    "content": self._extract_rss_content(entry),  # entry 전체를 넘김
-                    "description": self._clean_html_tags(getattr(entry, "description", "")),
-                    "author": getattr(entry, "author", ""),
-                    "updated": getattr(entry, "updated", ""),
-                    "tags": self._extract_tags(entry)
-                }
-                articles.append(article)
-
-            return articles
+            if rss_url.startswith(("http://", "https://")):
+                entries = self._fetch_http_entries(rss_url, max_entries, new_only, timeout)
+            elif self.streaming_parse and os.path.isfile(rss_url):
+                entries = self._stream_entries(_iter_file(rss_url), {}, max_entries)
+            else:
+                # 그 밖의 입력은 feedparser가 직접 읽도록 함
+                entries = self._parse_entries(rss_url, {}, max_entries)
+            if isinstance(entries, dict):
+                yield entries
+                return
+
+            for entry in entries:
+                if isinstance(entry, dict) and "error" in entry:
+                    # 스트리밍 파서와 feedparser 모두 읽지 못한 경우의 오류
+                    yield entry
+                    return
+                with metrics.timer("pipeline_stage_seconds", stage="html_clean"):
+                    article = self._build_article(entry)
+                if self.store is not None and rss_url.startswith(("http://", "https://")):
+                    self.store.save_articles(rss_url, [article])
+                yield article
         except Exception as e:
-            return [{"error": f"Failed to fetch RSS feed: {str(e)}"}]
+            metrics.inc("feed_fetch_total", status="error")
+            yield {"error": f"Failed to fetch RSS feed: {str(e)}"}
+
+    def _parse_entries(self, source, response_headers: Dict[str, str], max_entries: int):
+        """feedparser로 파싱해 앞쪽 max_entries개 엔트리 반환 (파싱 실패면 오류 dict)"""
+        import feedparser  # 첫 수집 때만 실제로 로드됨 (앱 시작 시간 단축)
+        with metrics.timer("pipeline_stage_seconds", stage="feed_parse"):
+            feed = feedparser.parse(source, response_headers=response_headers)
+        if feed.bozo:
+            metrics.inc("feed_fetch_total", status="parse_error")
+            return {"error": f"Failed to parse RSS feed: {feed.bozo_exception}"}
+        metrics.inc("feed_fetch_total", status="ok")
+        return feed.entries[:max_entries]
+
+    def _stream_entries(self, chunks: Iterable[bytes], response_headers: Dict[str, str],
+                        max_entries: int) -> Iterator:
+        """XML 청크를 받는 대로 파싱해 앞쪽 max_entries개 엔트리만 yield (나머지는 받지 않음)
+
+        첫 엔트리가 나오기 전에 XML 오류나 지원하지 않는 형식/인코딩이면 받은 본문 전체를
+        feedparser로 다시 파싱하고, 그것도 실패하면 오류 dict를 yield 한다.
+        """
+        chunks = iter(chunks)
+        received = []
+
+        def recorded() -> Iterator[bytes]:
+            for chunk in chunks:
+                received.append(chunk)
+                yield chunk
+
+        count = 0
+        try:
+            for entry in iter_entries(recorded(), max_entries):
+                if not count:
+                    metrics.inc("feed_fetch_total", status="ok")
+                count += 1
+                # 대체 파싱은 첫 엔트리 전에만 필요하므로 받은 청크를 계속 들고 있지 않음
+                received.clear()
+                yield entry
+            if not count:
+                metrics.inc("feed_fetch_total", status="ok")
+        except FeedParseError:
+            if count:
+                # 앞쪽 엔트리는 이미 내보냈으므로 뒤쪽이 깨진 피드는 읽은 데까지만 사용
+                return
+            body = b"".join(received) + b"".join(chunks)
+            entries = self._parse_entries(body, response_headers, max_entries)
+            if isinstance(entries, dict):
+                yield entries
+                return
+            yield from entries
+
+    def _fetch_http_entries(self, rss_url: str, max_entries: int, new_only: bool, timeout: float):
+        """공유 세션으로 피드를 내려받아 파싱한 엔트리 반환 (new_only면 조건부 GET + 새 엔트리만)"""
+        state = self.feed_state.get(rss_url) if new_only else {}
+
+        headers = {}
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("modified"):
+            headers["If-Modified-Since"] = state["modified"]
+
+        with metrics.timer("pipeline_stage_seconds", stage="feed_fetch"):
+            response = self.session.get(rss_url, headers=headers, timeout=timeout, stream=True)
+
+            # 304: 서버가 변경 없음을 알려줌 → 다운로드/파싱 없이 종료
+            if response.status_code == 304:
+                response.close()
+                metrics.inc("feed_fetch_total", status="not_modified")
+                return []
+            if response.status_code >= 400:
+                response.close()
+                response.raise_for_status()
+
+            response_headers = {key.lower(): value for key, value in response.headers.items()}
+            if self.streaming_parse and not new_only:
+                # 본문 해시나 엔트리 비교가 필요 없으면 다운로드와 파싱을 겹쳐 앞쪽 엔트리까지만 받음.
+                # 요약이 오래 걸리는 동안 연결을 열어 두면 서버/프록시가 끊을 수 있으므로
+                # 필요한 엔트리를 바로 다 파싱하고 응답을 닫은 뒤 넘긴다 (나머지 본문은 받지 않음)
+                chunks = iter_body(response, timeout=timeout)
+                try:
+                    entries = list(self._stream_entries(chunks, response_headers, max_entries))
+                finally:
+                    chunks.close()
+                if entries and isinstance(entries[-1], dict) and "error" in entries[-1]:
+                    return entries[-1]
+                return entries
+
+            body = read_body(response, timeout=timeout)
+        etag = response.headers.get("ETag")
+        modified = response.headers.get("Last-Modified")
 
-    def _extract_rss_content(self, entry) -> str:
-        """RSS 엔트리에서 사용 가능한 모든 텍스트 추출"""
+        # 검증자를 지원하지 않는 서버라도 본문이 같으면 파싱을 생략
+        content_hash = hashlib.sha256(body).hexdigest()
+        if new_only and content_hash == state.get("content_hash"):
+            self.feed_state.update(rss_url, etag, modified)
+            metrics.inc("feed_fetch_total", status="unchanged")
+            return []
+
+        if self.streaming_parse:
+            entries = list(self._stream_entries([body], response_headers, max_entries))
+            if entries and isinstance(entries[-1], dict) and "error" in entries[-1]:
+                return entries[-1]
+        else:
+            entries = self._parse_entries(body, response_headers, max_entries)
+            if isinstance(entries, dict):
+                return entries
+
+        if new_only:
+            entry_ids = [self._entry_id(entry) for entry in entries]
+            if self.store is not None:
+                # 저장소가 있으면 본 적 있는 기사 여부는 저장소 인덱스로 판단
+                unseen_ids = self.store.unseen_ids(rss_url, entry_ids)
+                self.feed_state.update(rss_url, etag, modified, content_hash)
+            else:
+                unseen_ids = set(entry_ids) - set(state.get("entry_ids", []))
+                self.feed_state.update(rss_url, etag, modified, content_hash, entry_ids)
+            entries = [entry for entry, entry_id in zip(entries, entry_ids) if entry_id in unseen_ids]
+        return entries
+
+    def iter_all_feeds(self, feeds: Optional[Dict[str, str]] = None, max_entries: int = 10,
+                       new_only: bool = False, max_workers: int = 16, per_host: int = 2,
+                       timeout: float = 30.0, dedupe: bool = False) -> Iterator[Dict]:
+        """여러 피드를 동시에 가져오며 끝나는 순서대로 결과를 yield
+
+        전체 동시 요청은 max_workers, 같은 호스트로의 동시 요청은 per_host로 제한한다.
+        각 결과는 {"name", "url", "articles", "elapsed"} 형태이며 elapsed는 피드별 소요 시간(초).
+        dedupe=True면 먼저 도착한 피드의 기사와 겹치는 기사에 duplicate_of를 표시한다.
+        중복 인덱스는 호출마다 새로 만들므로 이전 수집에서 본 기사는 중복으로 보지 않는다.
+        """
+        feeds = self.tech_blogs if feeds is None else feeds
+        names = list(feeds.keys())
+        duplicate_index = DuplicateIndex() if dedupe else None
+
+        tasks = [
+            (urlparse(feeds[name]).netloc or feeds[name],
+             partial(self.fetch_rss_feed, feeds[name], max_entries, new_only, timeout))
+            for name in names
+        ]
+
+        for index, articles, elapsed in run_bounded(tasks, max_workers=max_workers, per_key=per_host):
+            if isinstance(articles, Exception):
+                articles = [{"error": f"Failed to fetch RSS feed: {str(articles)}"}]
+            elif dedupe:
+                articles = self.mark_duplicates(articles, duplicate_index)
+            yield {
+                "name": names[index],
+                "url": feeds[names[index]],
+                "articles": articles,
+                "elapsed": elapsed
+            }
+
+    def fetch_all_feeds(self, feeds: Optional[Dict[str, str]] = None, max_entries: int = 10,
+                        new_only: bool = False, max_workers: int = 16, per_host: int = 2,
+                        timeout: float = 30.0, dedupe: bool = False) -> Dict[str, Dict]:
+        """모든 피드를 동시에 가져와 블로그 이름별 결과로 반환"""
+        return {
+            result["name"]: result
+            for result in self.iter_all_feeds(feeds, max_entries, new_only, max_workers, per_host, timeout, dedupe)
+        }
+
+    def mark_duplicates(self, articles: List[Dict], index: Optional[DuplicateIndex] = None) -> List[Dict]:
+        """URL/내용이 겹치는 기사에 duplicate_of 표시 (index를 넘기면 같은 인덱스로 본 기사들과도 비교)"""
+        return mark_duplicates(articles, index)
+
+    def fetch_full_articles(self, articles: List[Dict], max_workers: int = 8, per_host: int = 2) -> List[Dict]:
+        """기사 링크에서 원문 본문을 가져와 content를 채움 (연결 재사용, 호스트별 동시 요청 제한)"""
+        return self.article_fetcher.fetch_full_articles(articles, max_workers=max_workers, per_host=per_host)
+
+    def fetch_full_article(self, article: Dict) -> Dict:
+        """기사 하나의 원문 본문을 가져와 content를 채움 (스트리밍 파이프라인용)"""
+        return self.article_fetcher.fetch_full_article(article)
+
+    def _entry_id(self, entry) -> str:
+        """엔트리 식별자 (guid가 없으면 링크 사용)"""
+        return getattr(entry, "id", "") or getattr(entry, "link", "")
+
+    def _build_article(self, entry) -> Article:
+        # summary/description/content는 같은 원문인 경우가 많으므로 원문별로 한 번만 정제
+        cleaned = {}
+        def clean(raw: str) -> str:
+            if raw not in cleaned:
+                cleaned[raw] = clean_html(raw)
+            return cleaned[raw]
+
+        # 본문은 content 하나만 저장하고 summary/description은 그 안의 위치로 보관
+        return Article(
+            guid=self._entry_id(entry),
+            title=getattr(entry, "title", ""),
+            link=getattr(entry, "link", ""),
+            published=getattr(entry, "published", ""),
+            summary=clean(getattr(entry, "summary", "")),
+            content=self._extract_rss_content(entry, clean),  # entry 전체를 넘김
+            description=clean(getattr(entry, "description", "")),
+            author=getattr(entry, "author", ""),
+            updated=getattr(entry, "updated", ""),
+            tags=self._extract_tags(entry)
+        )
+
+    def _extract_rss_content(self, entry, clean: Optional[Callable[[str], str]] = None) -> str:
+        """RSS 엔트리에서 사용 가능한 모든 텍스트 추출 (겹치는 조각은 한 번만)"""
+        clean = clean or clean_html
         content_parts = []
         
         # 1. summary (대부분의 RSS에 포함)
         if hasattr(entry, 'summary'):
-            content_parts.append(entry.summary)
+            content_parts.append(clean(entry.summary))
         
         # 2. content (일부 RSS에 전체 내용 포함)
         if hasattr(entry, 'content'):
             for content in entry.content:
                 if content.type in ['text/html', 'text/plain']:
-                    content_parts.append(content.value)
+                    content_parts.append(clean(content.value))
         
         # 3. description (추가 설명)
         if hasattr(entry, 'description'):
-            content_parts.append(entry.description)
+            content_parts.append(clean(entry.description))
         
-        # HTML 태그 제거
-        full_content = " ".join(content_parts)
-        return self._clean_html_tags(full_content)
+        # summary가 content 앞부분과 같은 경우 등 중복 제거 후 결합
+        return merge_unique(content_parts)
     
     def _clean_html_tags(self, text: str) -> str:
-        """간단한 HTML 태그 제거"""
-        # 기본적인 HTML 태그 제거
-        clean_text = re.sub(r'<[^>]+>', '', text)
-        # 여러 공백을 하나로
-        clean_text = re.sub(r'\s+', ' ', clean_text)
-        return clean_text.strip()
+        """HTML 태그/스크립트 제거 및 엔티티 디코딩"""
+        return clean_html(text)
         
     def _extract_tags(self, entry) -> List[str]:
         """RSS 엔트리에서 태그/카테고리 추출"""
@@ -100,15 +349,19 @@ class RSSProcessor:
         if hasattr(entry, 'tags'):
             tags = [tag.term for tag in entry.tags]
         return tags
-    
-    
+
+def _iter_file(path: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
 if __name__ == "__main__":
     processor = RSSProcessor()
-    blogs = processor.get_available_blogs()
-    for name, url in blogs.items():
-        print(f"블로그: {name}")
-        articles = processor.fetch_rss_feed(url, max_entries=3)
-        for article in articles:
-            print(article)  
-    
-    
\ No newline at end of file
+    # 먼저 끝난 피드부터 바로 출력
+    for result in processor.iter_all_feeds(max_entries=3):
+        print(f"블로그: {result['name']} ({result['elapsed']:.2f}초)")
+        for article in result["articles"]:
+            print(article)
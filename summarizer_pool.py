@@ -0,0 +1,52 @@
+import threading
+from typing import Dict, List, Optional
+from ollama_summarizer import OllamaSummarizer
+from summary_cache import SummaryCache
+from article_store import ArticleStore
+
+# 프로세스 전체에서 공유하는 모델별 요약기 (Streamlit 세션 간에도 공유됨)
+_summarizers: Dict[str, OllamaSummarizer] = {}
+_model_locks: Dict[str, threading.Lock] = {}
+_lock = threading.Lock()
+
+def get_summarizer(model_name: str, cache: Optional[SummaryCache] = None,
+                   preload: bool = True, store: Optional[ArticleStore] = None,
+                   hosts: Optional[List[str]] = None) -> OllamaSummarizer:
+    """모델별로 하나만 만들어 재사용하는 OllamaSummarizer 반환
+
+    처음 요청될 때만 생성(상태 확인 + 선택적 모델 사전 로딩)하고 이후에는 즉시 반환한다.
+    hosts(Ollama 주소 목록)도 처음 만들 때만 반영된다.
+    """
+    # 모델 로딩이 오래 걸려도 다른 모델 요청은 막지 않도록 모델별 락 사용
+    with _lock:
+        model_lock = _model_locks.setdefault(model_name, threading.Lock())
+
+    with model_lock:
+        summarizer = _summarizers.get(model_name)
+        if summarizer is None:
+            summarizer = OllamaSummarizer(model_name, cache=cache, store=store, preload=preload, hosts=hosts)
+            _summarizers[model_name] = summarizer
+        else:
+            if summarizer.cache is None and cache is not None:
+                summarizer.cache = cache
+            if summarizer.store is None and store is not None:
+                summarizer.store = store
+        return summarizer
+
+def warm_up(model_name: str, cache: Optional[SummaryCache] = None, store: Optional[ArticleStore] = None):
+    """백그라운드에서 요약기를 만들고 모델을 미리 올려둠 (모델 선택 직후 호출용)"""
+    if model_name in _summarizers:
+        return
+
+    def _warm():
+        try:
+            get_summarizer(model_name, cache=cache, preload=True, store=store)
+        except Exception as e:
+            print(f"⚠️ 모델 '{model_name}' 사전 로딩 실패: {str(e)}")
+
+    threading.Thread(target=_warm, daemon=True).start()
+
+def remove_summarizer(model_name: str):
+    """풀에서 요약기 제거 (다음 요청 때 새로 생성)"""
+    with _lock:
+        _summarizers.pop(model_name, None)
@@ -0,0 +1,121 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+class SummaryCache:
+    """SQLite 기반 요약 결과 디스크 캐시
+
+    링크, 정제된 본문, 모델명, 요약 스타일, 프롬프트 버전을 해시한 키로
+    요약 결과를 저장한다. 오래된 항목과 개수 초과분은 자동으로 제거된다.
+    """
+    def __init__(self, db_path: str = "summary_cache.db",
+                 max_entries: int = 5000,
+                 max_age_seconds: Optional[float] = 7 * 24 * 3600):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+
+        # Streamlit은 세션마다 다른 스레드에서 실행되므로 연결을 공유하고 락으로 보호
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_summaries_accessed ON summaries (accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """캐시 키 생성 (각 구성요소를 구분자와 함께 해시)"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part or "").encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """캐시된 값 반환 (없거나 만료되면 None)"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.max_age_seconds is not None and now - created_at > self.max_age_seconds:
+                self._conn.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE summaries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str):
+        """값 저장 후 필요하면 오래된 항목 정리"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """만료된 항목과 최대 개수를 넘는 항목(가장 오래 안 쓰인 순) 삭제"""
+        if self.max_age_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM summaries WHERE created_at < ?",
+                (now - self.max_age_seconds,)
+            )
+
+        count = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM summaries WHERE key IN ("
+                "SELECT key FROM summaries ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM summaries")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """히트/미스 통계 반환"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": size
+        }
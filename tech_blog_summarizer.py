@@ -1,94 +1,69 @@
-import os
 from dotenv import load_dotenv
-from langchain_anthropic import ChatAnthropic
-from langchain.schema import HumanMessage
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
+from summary_cache import SummaryCache
+from article_store import ArticleStore
+from base_summarizer import BaseSummarizer
+from llm_backend import AnthropicBackend
+from prompt_builder import PromptBuilder
 
 load_dotenv()
 
-class TechBlogSummarizer:
-    def __init__(self):
-        self.llm = ChatAnthropic(
-            model_name="claude-3-haiku-20240307",  # 모델명
-            temperature=0.1,
-            timeout=60,  # 예시값, 필요에 따라 조정
-            stop=None    # 또는 적절한 stop 시퀀스
+class TechBlogSummarizer(BaseSummarizer):
+    content_label = "본문"
+
+    def __init__(self, model_name: str = "claude-3-haiku-20240307", cache: Optional[SummaryCache] = None,
+                 store: Optional[ArticleStore] = None, max_output_tokens: int = 1024,
+                 request_timeout: float = 60.0, max_retries: int = 2):
+        # RSS 기사는 보통 더 짧으므로 청크 크기 축소
+        super().__init__(model_name, cache, store, chunk_size=3000, chunk_overlap=150)
+        self.prompt_builder = PromptBuilder(model_name, max_output_tokens=max_output_tokens)
+        self.backend = AnthropicBackend(
+            model_name, max_output_tokens, timeout=request_timeout, max_retries=max_retries
         )
-        
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=3000,  # RSS 기사는 보통 더 짧으므로 청크 크기 축소
-            chunk_overlap=150,
-            length_function=len
+
+    def _metadata(self, article: Dict) -> Dict[str, str]:
+        published = article.get('published') or article.get('updated', '')
+        return {"작성자": article['author'], "발행일": published}
+
+    def summarize_multiple_articles(self, articles: List[Dict], summary_style: str = "technical",
+                                    long_document: bool = False,
+                                    on_complete: Optional[Callable[[int, Dict], None]] = None,
+                                    new_only: bool = False, pack_short: bool = False,
+                                    extraction_mode: Optional[str] = None) -> List[Dict]:
+        """여러 기사를 한 번에 요약 (on_complete는 기사마다 (인덱스, 결과)로 호출)
+
+        new_only=True면 저장소에 같은 모델/스타일 요약이 이미 있는 기사는 빼고 요약한다.
+        중복 기사(같은 정규화 URL 또는 duplicate_of 표시)는 대표 기사 하나만 요약한다.
+        pack_short=True면 본문이 짧은 기사 여러 개를 한 프롬프트로 묶어 요약해 호출 수를 줄인다.
+        extraction_mode는 summarize_single_article 참고 (추출 기반 요약에서는 묶음 요약을 쓰지 않음).
+        """
+        return self._summarize_many(
+            articles, summary_style, new_only, on_complete,
+            lambda batch, callback: self._summarize_batch(
+                batch, summary_style, long_document, callback, pack_short, extraction_mode
+            )
         )
 
-    def summarize_single_article(self, article: Dict, summary_style: str = "technical") -> Dict:
-        """단일 기사 요약"""
-        try:
-            if "error" in article:
-                return article
-            
-            # 요약할 텍스트 준비
-            published = article.get('published') or article.get('updated', '')
-            text_to_summarize = f"""
-            제목: {article['title']}
-            작성자: {article['author']}
-            발행일: {published}
-            
-            본문:
-            {article.get('content', article.get('summary', ''))}
-            """
-            
-            # 스타일별 프롬프트
-            prompts = {
-                "technical": """
-                다음 기술 블로그 글을 기술적 관점에서 요약해주세요:
-                - 사용된 기술/도구
-                - 해결한 문제
-                - 핵심 솔루션
-                - 중요한 인사이트
-                """,
-                "business": """
-                다음 기술 블로그 글을 비즈니스 관점에서 요약해주세요:
-                - 비즈니스 임팩트
-                - 성능 개선 사항
-                - 비용 절감 효과
-                - 사용자 경험 개선
-                """,
-                "brief": """
-                다음 기술 블로그 글을 3-4줄로 간단히 요약해주세요:
-                - 핵심 내용만 추출
-                - 기술적 용어는 간단히 설명
-                """
-            }
-            
-            prompt = prompts.get(summary_style, prompts["technical"])
-            message = HumanMessage(content=f"{prompt}\n\n{text_to_summarize}")
-            
-            response = self.llm([message])
-            
-            return {
-                "title": article["title"],
-                "link": article["link"],
-                "author": article["author"],
-                "published": article["published"],
-                "summary": response.content,
-                "summary_style": summary_style
-            }
-            
-        except Exception as e:
-            return {
-                "title": article.get("title", "알 수 없는 제목"),
-                "error": f"요약 실패: {str(e)}"
-            }
+    def _summarize_batch(self, articles: List[Dict], summary_style: str, long_document: bool,
+                         on_complete: Optional[Callable[[int, Dict], None]],
+                         pack_short: bool = False, extraction_mode: Optional[str] = None) -> List[Dict]:
+        summaries = [None] * len(articles)
 
-    def summarize_multiple_articles(self, articles: List[Dict], summary_style: str = "technical") -> List[Dict]:
-        """여러 기사를 한 번에 요약"""
-        summaries = []
+        if pack_short and not extraction_mode:
+            for index, summary in self._summarize_packed(articles, summary_style).items():
+                summaries[index] = summary
+                if on_complete is not None:
+                    on_complete(index, summary)
         
         for i, article in enumerate(articles, 1):
+            if summaries[i - 1] is not None:
+                continue
             print(f"📝 {i}/{len(articles)} 기사 요약 중...")
-            summary = self.summarize_single_article(article, summary_style)
-            summaries.append(summary)
+            summary = self.summarize_single_article(
+                article, summary_style, long_document=long_document, extraction_mode=extraction_mode
+            )
+            summaries[i - 1] = summary
+            if on_complete is not None:
+                on_complete(i - 1, summary)
         
         return summaries
@@ -0,0 +1,25 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction import parse_extraction
+
+def test_parses_fenced_json_and_splits_string_lists():
+    text = '```json\n{"technologies": "- Kafka\\n- Redis", "problem": "지연", "solution": "캐시", ' \
+           '"impact": "", "key_points": ["p99 30% 감소"]}\n```'
+    extraction = parse_extraction(text)
+    assert extraction["technologies"] == ["Kafka", "Redis"]
+    assert extraction["key_points"] == ["p99 30% 감소"]
+
+def test_non_list_values_in_list_fields_become_empty():
+    text = '{"technologies": 3, "problem": "지연", "solution": "캐시", "impact": "", "key_points": true}'
+    extraction = parse_extraction(text)
+    assert extraction["technologies"] == []
+    assert extraction["key_points"] == []
+    assert extraction["problem"] == "지연"
+
+def test_returns_none_without_problem_solution_or_key_points():
+    # None이면 요약기가 원문 요약으로 넘어감
+    assert parse_extraction('{"technologies": ["Go"], "key_points": {"a": 1}}') is None
+    assert parse_extraction("JSON이 아닌 응답") is None
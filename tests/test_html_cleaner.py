@@ -0,0 +1,21 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_cleaner import clean_html, merge_unique
+
+BODY = clean_html("<p>We migrated the queue to Kafka.</p><p>p99 latency dropped by 30% after the change.</p>")
+
+def test_drops_fragment_contained_in_longer_one():
+    assert merge_unique(["We migrated the queue to Kafka.", BODY]) == BODY
+
+def test_drops_truncated_excerpt_with_ellipsis():
+    for excerpt in ("We migrated the queue to Kafka. p99 lat…",
+                    "We migrated the queue to Kafka. p99 latency dropped [...]",
+                    clean_html("We migrated the queue to Kafka. p99 latency [&hellip;]"),
+                    "We migrated the queue to Ka..."):
+        assert merge_unique([excerpt, BODY, excerpt]) == BODY, excerpt
+
+def test_keeps_distinct_fragments_in_original_order():
+    assert merge_unique(["요약 문단…", BODY]) == f"요약 문단… {BODY}"